@@ -0,0 +1,176 @@
+"""
+Scaling benchmark of the automata algorithms: time and peak memory versus the size n
+of seeded random inputs, with a fitted empirical complexity exponent per case.
+
+    python bench/bench_automata.py -o results.json
+    python bench/bench_automata.py --check bench/automata_baseline.json
+    python bench/bench_automata.py --update-baseline bench/automata_baseline.json
+
+Polynomial cases fit t ~ n^k and report k, exponential cases (subset construction
+blowup) fit t ~ b^n and report b. '--check' fails when a fitted value exceeds the
+baseline by more than the tolerance.
+"""
+import os
+import sys
+import math
+import time
+import json
+import random
+import argparse
+import tracemalloc
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from bench_util import environment,write_results
+from automata.DFA import DFA
+from automata.NFA import NFA
+from automata.random_automata import random_dfa,random_regex
+from automata import symbolic
+
+def blowup_regex(n:int)->str:
+    """(a|b)*a(a|b)^n, its minimal DFA has 2^(n+1) states.
+    """
+    return '(a|b)*a' + '(a|b)' * n
+
+def regex_nfa(regex:str)->NFA:
+    n = NFA()
+    n.regex_to_NFA(regex)
+    return n
+
+def counters(k:int,p:int = 4)->list:
+    """k counters mod p, counter i counts its own letter: their product has p^k reachable states,
+    but its reachable set is a small BDD.
+    """
+    letters = [chr(ord('a') + i) for i in range(0,k)]
+    states = [f'r{j}' for j in range(0,p)]
+    return [DFA.from_table(states,letters,'r0',{'r0'},
+                           [[states[(j+1)%p] if letter == own else states[j] for letter in letters] for j in range(0,p)])
+            for own in letters]
+
+# name: (growth, sizes, setup(n, seed) -> args, run(*args))
+cases = {
+    'DFA.minimize':('polynomial',[32,64,128,256],
+                    lambda n,seed: (random_dfa(n,'ab',seed = seed),),
+                    lambda d: d.minimize(new_copy = True)),
+    'NFA.to_DFA':('polynomial',[16,32,64,96],
+                  lambda n,seed: (regex_nfa(random_regex(n,'ab',seed = seed)),),
+                  lambda nfa: nfa.to_DFA()),
+    'NFA.to_DFA.blowup':('exponential',[5,6,7,8,9],
+                         lambda n,seed: (regex_nfa(blowup_regex(n)),),
+                         lambda nfa: nfa.to_DFA()),
+    'DFA.is_equal':('polynomial',[8,12,16,24],
+                    lambda n,seed: (random_dfa(n,'ab',seed = seed),random_dfa(n,'ab',seed = seed+1)),
+                    lambda d1,d2: d1.is_equal(d2)),
+    'DFA.intersection':('polynomial',[4,8,12,16],
+                        lambda n,seed: (random_dfa(n,'ab',seed = seed),random_dfa(n,'ab',seed = seed+1)),
+                        lambda d1,d2: d1.intersection(d2)),
+    'DFA.union':('polynomial',[4,8,12,16],
+                 lambda n,seed: (random_dfa(n,'ab',seed = seed),random_dfa(n,'ab',seed = seed+1)),
+                 lambda d1,d2: d1.union(d2)),
+    'DFA.difference':('polynomial',[4,8,12,16],
+                      lambda n,seed: (random_dfa(n,'ab',seed = seed),random_dfa(n,'ab',seed = seed+1)),
+                      lambda d1,d2: d1.difference(d2)),
+    'DFA.complement':('polynomial',[64,128,256,512],
+                      lambda n,seed: (random_dfa(n,'ab',seed = seed),),
+                      lambda d: d.complement()),
+    'DFA.to_regex':('exponential',[6,8,10,12],
+                    lambda n,seed: (random_dfa(n,'ab',seed = seed),),
+                    lambda d: d.to_regex()),
+    # the same products explored explicitly and symbolically, n counters
+    'DFA.intersect_all.counters':('exponential',[4,5,6,7],
+                                  lambda n,seed: (counters(n),),
+                                  lambda dfas: DFA.intersect_all(dfas,minimize = False)),
+    'symbolic.reachable_count.counters':('polynomial',[4,8,12,16],
+                                         lambda n,seed: (counters(n),),
+                                         lambda dfas: symbolic.reachable_count(dfas)),
+}
+
+def measure(run,args,repeat:int):
+    """Fastest of 'repeat' runs, and the peak traced memory of one more run.
+    """
+    seconds = math.inf
+    for _ in range(0,repeat):
+        start = time.perf_counter()
+        run(*args)
+        seconds = min(seconds,time.perf_counter() - start)
+    tracemalloc.start()
+    run(*args)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds,peak_bytes
+
+def fit_slope(xs:list,ys:list)->float:
+    """Least squares slope of ys over xs.
+    """
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x,y in zip(xs,ys))
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return numerator / denominator
+
+def fit(growth:str,points:list)->float:
+    """Fit the exponent k of t ~ n^k, or the base b of t ~ b^n.
+    """
+    ys = [math.log(max(point['seconds'],1e-9)) for point in points]
+    if growth == 'polynomial':
+        return fit_slope([math.log(point['n']) for point in points],ys)
+    return math.exp(fit_slope([point['n'] for point in points],ys))
+
+def run_case(name:str,seeds:int,repeat:int)->dict:
+    growth,sizes,setup,run = cases[name]
+    points = []
+    for n in sizes:
+        # median over seeds smooths out lucky random instances
+        samples = sorted((measure(run,setup(n,seed),repeat) for seed in range(0,seeds)),key = lambda s: s[0])
+        seconds,peak_bytes = samples[len(samples)//2]
+        points.append({'n':n,'seconds':seconds,'peak_bytes':peak_bytes})
+    return {'case':name,'growth':growth,'fit':fit(growth,points),'points':points}
+
+def check(results:list,baseline_file:str,tolerance:float)->list:
+    """Get the cases whose fitted exponent (or base) regressed against the baseline.
+    """
+    with open(baseline_file) as f:
+        baseline = json.load(f)['fits']
+    regressions = []
+    for result in results:
+        expected = baseline.get(result['case'])
+        if expected is None:
+            continue
+        if result['growth'] == 'polynomial':
+            regressed = result['fit'] > expected + tolerance
+        else:
+            regressed = result['fit'] > expected * (1 + tolerance)
+        if regressed:
+            regressions.append((result['case'],expected,result['fit']))
+    return regressions
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark how the automata algorithms scale.')
+    parser.add_argument('--cases',default = ','.join(cases),help = 'comma separated cases')
+    parser.add_argument('--seeds',type = int,default = 3,help = 'random instances per size')
+    parser.add_argument('--repeat',type = int,default = 3,help = 'runs per instance, the fastest is kept')
+    parser.add_argument('-o','--output',default = None,help = 'JSON output file (default: stdout)')
+    parser.add_argument('--check',default = None,metavar = 'BASELINE',help = 'exit with 1 if a fit regressed')
+    parser.add_argument('--tolerance',type = float,default = 0.5,
+                        help = 'allowed increase: absolute for exponents, relative for bases (default 0.5)')
+    parser.add_argument('--update-baseline',default = None,metavar = 'BASELINE',help = 'write the fits as the new baseline')
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.cases.split(','):
+        result = run_case(name,args.seeds,args.repeat)
+        results.append(result)
+        unit = 'n^k, k' if result['growth'] == 'polynomial' else 'b^n, b'
+        print(f'{name:36}{unit} = {result["fit"]:.2f}',file = sys.stderr)
+    write_results({'benchmark':'automata','environment':environment(),'results':results},args.output)
+
+    if args.update_baseline is not None:
+        write_results({'fits':{result['case']:round(result['fit'],2) for result in results}},args.update_baseline)
+    if args.check is not None:
+        regressions = check(results,args.check,args.tolerance)
+        for name,expected,actual in regressions:
+            print(f'regression: {name} fit {actual:.2f}, baseline {expected:.2f}',file = sys.stderr)
+        if len(regressions) != 0:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
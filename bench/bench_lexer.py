@@ -0,0 +1,172 @@
+"""
+Lexer benchmark: tokens/sec, peak RSS and startup (token DFA compile) time of the
+lexer engines on generated C-- sources.
+
+    python bench/bench_lexer.py --sizes 1K,1M,100M -o results.json
+    python bench/bench_lexer.py --compare old.json new.json
+
+Every measurement runs in a fresh interpreter. The results are JSON, so runs on
+different commits can be diffed or compared with '--compare'.
+"""
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lexer')))
+from bench_util import peak_rss_kb,environment,run_child,write_results,parse_size
+
+engines = ['recognize_token','Lexer','Lexer.fill_token_buffer','MmapLexer','MmapLexer.fill_token_buffer','IncrementalLexer']
+default_sizes = '1K,100K,1M'
+
+def generate_unit(rand:random.Random)->str:
+    """One C-- function using every token class of cmm_token_re_func.
+    """
+    def name():
+        return rand.choice(['a','b','count','_tmp','node','x1','value_2']) + str(rand.randint(0,999))
+    def number():
+        return str(rand.choice([0,rand.randint(1,9),rand.randint(10,99999)]))
+    f,s,a,b,c = name(),name(),name(),name(),name()
+    relop = rand.choice(['>','<','>=','<=','==','!='])
+    lines = [
+        f'struct {s} {{',
+        f'\tint {a};',
+        f'\tint {b}[{number()}];',
+        f'}};',
+        f'/* {name()} is generated,',
+        f'   multiline comment */',
+        f'int {f}(int {a}, float {c}) {{',
+        f'\tstruct {s} {b};',
+        f'\t{b}.{a} = {a} * {number()} / ({number()} - {a}); // {name()}',
+        f'\twhile ({a} {relop} {number()} && !{c} || {b}.{b}[{number()}] == {a}) {{',
+        f'\t\t{a} = {a} + {number()};',
+        f'\t}}',
+        f'\tif ({a} != {c}) return {a};',
+        f'\telse return -{c};',
+        f'}}',
+    ]
+    newline = '\r\n' if rand.random() < 0.1 else '\n'
+    return newline.join(lines) + newline
+
+def generate_source(size:int,seed:int = 0)->str:
+    """Generate about 'size' bytes of C--, at least one unit.
+    """
+    rand = random.Random(seed)
+    chunks = []
+    length = 0
+    while length < size or len(chunks) == 0:
+        unit = generate_unit(rand)
+        chunks.append(unit)
+        length += len(unit)
+    return ''.join(chunks)[:max(size,len(chunks[0]))]
+
+def source_file(size:int,seed:int,corpus_dir:str)->str:
+    file_name = os.path.join(corpus_dir,f'bench_{size}_{seed}.cmm')
+    if not os.path.exists(file_name):
+        source = generate_source(size,seed)
+        # cut at the last newline so no token is split
+        source = source[:source.rfind('\n')+1]
+        with open(file_name,'w',newline = '') as f:
+            f.write(source)
+    return file_name
+
+def measure(engine:str,file_name:str)->dict:
+    """Measure one engine on one file, meant to run in a fresh interpreter.
+    """
+    start = time.perf_counter()
+    from scanner import Lexer,get_token_dfa
+    token_dfa = get_token_dfa()
+    compile_seconds = time.perf_counter() - start
+    rss_before = peak_rss_kb()
+
+    start = time.perf_counter()
+    if engine == 'recognize_token':
+        from lexer import lexer as legacy_lexer
+        text = legacy_lexer.read_src_file(file_name)
+        with open(os.devnull,'w') as devnull,contextlib.redirect_stdout(devnull):
+            tokens = len(legacy_lexer.recognize_token(text))
+    elif engine == 'Lexer':
+        tokens = len(Lexer.from_file(file_name,token_dfa = token_dfa).recognize_token())
+    elif engine == 'Lexer.fill_token_buffer':
+        tokens = len(Lexer.from_file(file_name,token_dfa = token_dfa).fill_token_buffer())
+    elif engine.startswith('MmapLexer'):
+        from mmap_lexer import MmapLexer
+        with MmapLexer(file_name,token_dfa = token_dfa) as mmap_lexer:
+            if engine == 'MmapLexer':
+                tokens = len(mmap_lexer.recognize_token())
+            else:
+                tokens = len(mmap_lexer.fill_token_buffer())
+    elif engine == 'IncrementalLexer':
+        from incremental_lexer import IncrementalLexer
+        with open(file_name) as f:
+            tokens = len(IncrementalLexer(token_dfa = token_dfa).lex(f.read()))
+    else:
+        raise ValueError(f'unknown engine {engine}')
+    seconds = time.perf_counter() - start
+
+    return {
+        'engine':engine,
+        'size_bytes':os.path.getsize(file_name),
+        'tokens':tokens,
+        'seconds':seconds,
+        'tokens_per_sec':tokens / seconds if seconds > 0 else 0.0,
+        'compile_seconds':compile_seconds,
+        'peak_rss_kb':peak_rss_kb(),
+        'rss_before_kb':rss_before,
+    }
+
+def compare(old_file:str,new_file:str):
+    """Print the tokens/sec and peak RSS ratios (new/old) of two result files.
+    """
+    with open(old_file) as f:
+        old = {(r['engine'],r['size_bytes']):r for r in json.load(f)['results']}
+    with open(new_file) as f:
+        new = {(r['engine'],r['size_bytes']):r for r in json.load(f)['results']}
+    print(f'{"engine":30}{"size":>12}{"tokens/sec":>14}{"peak RSS":>12}')
+    for key in sorted(old.keys() & new.keys()):
+        speed = new[key]['tokens_per_sec'] / old[key]['tokens_per_sec']
+        rss = new[key]['peak_rss_kb'] / old[key]['peak_rss_kb']
+        print(f'{key[0]:30}{key[1]:>12}{speed:>13.2f}x{rss:>11.2f}x')
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark the C-- lexers.')
+    parser.add_argument('--sizes',default = default_sizes,help = f'source sizes, e.g. 1K,1M,100M (default {default_sizes})')
+    parser.add_argument('--engines',default = ','.join(engines),help = 'comma separated engines')
+    parser.add_argument('--seed',type = int,default = 0)
+    parser.add_argument('--repeat',type = int,default = 1,help = 'runs per measurement, the fastest is kept')
+    parser.add_argument('--corpus-dir',default = None,help = 'where generated sources are kept (default: a temporary directory)')
+    parser.add_argument('-o','--output',default = None,help = 'JSON output file (default: stdout)')
+    parser.add_argument('--compare',nargs = 2,metavar = ('OLD','NEW'),help = 'compare two result files')
+    parser.add_argument('--measure',nargs = 2,metavar = ('ENGINE','FILE'),help = argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure is not None:
+        print(json.dumps(measure(*args.measure)))
+        return
+    if args.compare is not None:
+        compare(*args.compare)
+        return
+
+    with contextlib.ExitStack() as stack:
+        corpus_dir = args.corpus_dir
+        if corpus_dir is None:
+            corpus_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(corpus_dir,exist_ok = True)
+        results = []
+        for size in [parse_size(size) for size in args.sizes.split(',')]:
+            file_name = source_file(size,args.seed,corpus_dir)
+            for engine in args.engines.split(','):
+                runs = [run_child(__file__,['--measure',engine,file_name]) for _ in range(0,args.repeat)]
+                result = max(runs,key = lambda r: r['tokens_per_sec'])
+                result['peak_rss_kb'] = max(r['peak_rss_kb'] for r in runs)
+                results.append(result)
+                print(f'{engine:30}{result["size_bytes"]:>12}{result["tokens_per_sec"]:>14.0f} tokens/s',file = sys.stderr)
+    write_results({'benchmark':'lexer','environment':environment(),'seed':args.seed,'results':results},args.output)
+
+if __name__ == '__main__':
+    main()
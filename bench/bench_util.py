@@ -0,0 +1,64 @@
+"""
+Helpers shared by the benchmark runners: peak memory, environment and JSON output.
+"""
+import os
+import sys
+import json
+import platform
+import subprocess
+try:
+    import resource
+except ImportError:
+    resource = None
+
+root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def peak_rss_kb()->int:
+    """Peak resident set size of this process in KB, -1 where it is not available.
+    """
+    if resource is None:
+        return -1
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KB on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def git_commit()->str:
+    try:
+        return subprocess.run(['git','rev-parse','HEAD'],cwd = root_path,capture_output = True,
+                              text = True,check = True).stdout.strip()
+    except (OSError,subprocess.CalledProcessError):
+        return ''
+
+def environment()->dict:
+    return {
+        'commit':git_commit(),
+        'python':platform.python_version(),
+        'implementation':platform.python_implementation(),
+        'machine':platform.machine(),
+    }
+
+def run_child(script:str,args)->dict:
+    """Run one measurement in a fresh interpreter, so that compile times and peak RSS are its own.
+
+    The child prints one JSON object on its last line of stdout.
+    """
+    result = subprocess.run([sys.executable,script] + [str(arg) for arg in args],
+                            capture_output = True,text = True,check = True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def write_results(results:dict,output:str = None):
+    text = json.dumps(results,indent = 2,sort_keys = True)
+    if output is None:
+        print(text)
+    else:
+        with open(output,'w') as f:
+            f.write(text + '\n')
+
+def parse_size(size:str)->int:
+    """Parse sizes like '1K', '10M' or '512'.
+    """
+    units = {'K':1 << 10,'M':1 << 20,'G':1 << 30}
+    size = size.strip().upper()
+    if size[-1:] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
@@ -1,10 +1,17 @@
 import sys
 import os
 import copy
-from typing import List,Set,Callable
+import logging
+from array import array
+from typing import List,Set,Dict,Tuple,Callable,Iterable
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from container.multi_key_dict import multi_key_dict
-from automata.myException import LL_1_ConflictingEntry
+from automata.myException import LL_1_ConflictingEntry,LALR_1_ConflictingEntry,AutomatonFormatException
+from automata import tracing
+from automata import serialization
+
+logger = logging.getLogger(__name__)
+
 class CFG_Production:
     def __init__(self,head = None,body = None,action:Callable = None) -> None:
         self._head = head
@@ -53,12 +60,12 @@ class LL1_analysis_table():
     
     def add_entry(self,variable:str,terminal:str,production:CFG_Production):
         try:
-            if (variable,terminal) not in self.__table.keys():
+            if (variable,terminal) not in self.__table:
                 self.__table.set_value((variable,terminal),production)
             else:
                 raise LL_1_ConflictingEntry(variable,
                                             terminal,
-                                            self.__table.get_value((variable,terminal))[0].__str__(),
+                                            self.__table.get_value((variable,terminal)).__str__(),
                                             production.__str__())
         except LL_1_ConflictingEntry as e:
             sys.stderr.write(e.__str__()+'\n')
@@ -125,10 +132,270 @@ class CFG:
     def end_symbol(self):
         return self.__end_symbol
 
-    
-    
-    
-    
+    def __get_bodies(self)->Dict[str,List[List[str]]]:
+        """Get production bodies of every variable, an epsilon body is [].
+        """
+        bodies = {var:[] for var in self.__variables}
+        for head,production_list in self.__productions.items():
+            for production in production_list:
+                bodies.setdefault(head,[]).append([elem for elem in production._body if elem != self.__epsilon])
+        return bodies
+
+    def __set_bodies(self,bodies:Dict[str,List[List[str]]]):
+        """Replace the productions, duplicated bodies are dropped.
+
+        An action is kept for a production that has not been changed.
+        """
+        actions = dict()
+        for head,production_list in self.__productions.items():
+            for production in production_list:
+                key = (head,()) if production.is_epsilon() else (head,tuple(production._body))
+                actions.setdefault(key,production._action)
+        self.__variables = set(bodies.keys())
+        self.__productions = dict()
+        for head,body_list in bodies.items():
+            added = set()
+            for body in body_list:
+                key = (head,tuple(body))
+                if key in added:
+                    continue
+                added.add(key)
+                self.add_production(head,body if len(body) != 0 else [self.__epsilon],actions.get(key))
+
+    def __new_variable(self,variables:Set[str],var:str)->str:
+        new_var = var + "'"
+        while new_var in variables or new_var in self.__terminals:
+            new_var += "'"
+        variables.add(new_var)
+        return new_var
+
+    def __transform(self,transform:Callable,new_copy:bool):
+        g = copy.deepcopy(self) if new_copy == True else self
+        g.__set_bodies(transform(g,g.__get_bodies()))
+        return g if new_copy == True else None
+
+    def remove_useless_symbols(self,new_copy = False):
+        """Remove variables that derive no terminal string or are unreachable from the start variable,
+        and terminals no longer used by any production.
+
+        Args:
+            new_copy (bool, optional): If True, return a new CFG without modifying the original one. Defaults to False.
+        """
+        def transform(g,bodies):
+            # generating variables: count the non-generating variables of each body.
+            remaining = []
+            occurrences = dict()
+            flat = []
+            generating = set()
+            worklist = []
+            for head,body_list in bodies.items():
+                for body in body_list:
+                    count = 0
+                    for elem in body:
+                        if elem in bodies:
+                            occurrences.setdefault(elem,[]).append(len(flat))
+                            count += 1
+                    flat.append(head)
+                    remaining.append(count)
+                    if count == 0 and head not in generating:
+                        generating.add(head)
+                        worklist.append(head)
+            while len(worklist) != 0:
+                var = worklist.pop()
+                for i in occurrences.get(var,()):
+                    remaining[i] -= 1
+                    if remaining[i] == 0 and flat[i] not in generating:
+                        generating.add(flat[i])
+                        worklist.append(flat[i])
+
+            # reachable variables, through productions made of generating symbols only.
+            start = g.__start_variable
+            reachable = {start}
+            st = [start]
+            while len(st) != 0:
+                var = st.pop()
+                for body in bodies.get(var,[]):
+                    if all(elem in generating or elem not in bodies for elem in body):
+                        for elem in body:
+                            if elem in bodies and elem not in reachable:
+                                reachable.add(elem)
+                                st.append(elem)
+
+            new_bodies = {start:[]}
+            used_terminals = set()
+            for var in reachable:
+                if var not in generating:
+                    continue
+                new_bodies[var] = [body for body in bodies[var]
+                                   if all(elem in generating or elem not in bodies for elem in body)]
+                for body in new_bodies[var]:
+                    used_terminals |= {elem for elem in body if elem not in bodies}
+            g.__terminals = g.__terminals & used_terminals
+            return new_bodies
+        return self.__transform(transform,new_copy)
+
+    def remove_epsilon_productions(self,new_copy = False):
+        """Remove epsilon productions. If the start variable is nullable, a new start variable S'
+        with productions S' -> S | ε is added, so the language is unchanged.
+
+        A body X1 X2 ... Xn with more than two nullable symbols is first split into the chain
+        A -> X1 A', A' -> X2 A'', ..., so that each body keeps or drops at most two nullable
+        symbols: the result grows linearly with the grammar instead of 2^k per body with k
+        nullable symbols.
+
+        Args:
+            new_copy (bool, optional): If True, return a new CFG without modifying the original one. Defaults to False.
+        """
+        def transform(g,bodies):
+            first_follow = CFG_FIRST_FOLLOW(g)
+            variables = set(bodies.keys())
+            # the new variables of the chains, nullable when the rest of their body is.
+            chain_nullable = dict()
+
+            def is_nullable(elem):
+                if elem in chain_nullable:
+                    return chain_nullable[elem]
+                return elem in bodies and first_follow.is_nullable(elem)
+
+            binarized = {head:[] for head in bodies}
+            for head,body_list in bodies.items():
+                for body in body_list:
+                    if sum(1 for elem in body if is_nullable(elem)) <= 2:
+                        binarized[head].append(body)
+                        continue
+                    var = head
+                    for i in range(0,len(body)-2):
+                        new_var = g.__new_variable(variables,head)
+                        chain_nullable[new_var] = all(is_nullable(elem) for elem in body[i+1:])
+                        binarized[var].append([body[i],new_var])
+                        binarized[new_var] = []
+                        var = new_var
+                    binarized[var].append(body[-2:])
+
+            new_bodies = dict()
+            for head,body_list in binarized.items():
+                new_body_list = []
+                for body in body_list:
+                    # Every combination of keeping or dropping the nullable symbols, at most 4.
+                    combinations = [[]]
+                    for elem in body:
+                        if is_nullable(elem):
+                            combinations = [c + [elem] for c in combinations] + combinations
+                        else:
+                            combinations = [c + [elem] for c in combinations]
+                    new_body_list.extend(c for c in combinations if len(c) != 0)
+                new_bodies[head] = new_body_list
+            start = g.__start_variable
+            if first_follow.is_nullable(start):
+                new_start = g.__new_variable(variables,start)
+                new_bodies[new_start] = [[start],[]]
+                g.__variables.add(new_start)
+                g.__start_variable = new_start
+            return new_bodies
+        return self.__transform(transform,new_copy)
+
+    def remove_unit_productions(self,new_copy = False):
+        """Remove unit productions A -> B, where B is a variable.
+
+        Args:
+            new_copy (bool, optional): If True, return a new CFG without modifying the original one. Defaults to False.
+        """
+        def transform(g,bodies):
+            unit_targets = {var:[body[0] for body in body_list if len(body) == 1 and body[0] in bodies]
+                            for var,body_list in bodies.items()}
+            new_bodies = dict()
+            for var in bodies:
+                # All variables reachable from var through unit productions.
+                reachable = [var]
+                visit = {var}
+                i = 0
+                while i < len(reachable):
+                    for target in unit_targets[reachable[i]]:
+                        if target not in visit:
+                            visit.add(target)
+                            reachable.append(target)
+                    i += 1
+                new_bodies[var] = [body for B in reachable for body in bodies[B]
+                                   if not (len(body) == 1 and body[0] in bodies)]
+            return new_bodies
+        return self.__transform(transform,new_copy)
+
+    def remove_left_recursion(self,new_copy = False):
+        """Remove direct and indirect left recursion.
+
+        Only the variables of left-recursive strongly connected components of the left-corner graph
+        are rewritten (Paull's algorithm inside each component). Left recursion hidden behind nullable
+        variables is not detected, call 'remove_epsilon_productions' first for such grammars.
+
+        Args:
+            new_copy (bool, optional): If True, return a new CFG without modifying the original one. Defaults to False.
+        """
+        def transform(g,bodies):
+            variables = set(bodies.keys())
+            left_corner = {var:{body[0] for body in body_list if len(body) != 0 and body[0] in bodies}
+                           for var,body_list in bodies.items()}
+            for component in _strongly_connected_components(left_corner):
+                if len(component) == 1 and component[0] not in left_corner[component[0]]:
+                    continue
+                order = sorted(component)
+                for i,Ai in enumerate(order):
+                    # Substitute A_j (j < i) at the left of A_i's bodies.
+                    earlier = set(order[:i])
+                    body_list = bodies[Ai]
+                    changed = True
+                    while changed:
+                        changed = False
+                        new_body_list = []
+                        for body in body_list:
+                            if len(body) != 0 and body[0] in earlier:
+                                new_body_list.extend(b + body[1:] for b in bodies[body[0]])
+                                changed = True
+                            else:
+                                new_body_list.append(body)
+                        body_list = new_body_list
+                    # Remove direct left recursion: A -> Aα | β  =>  A -> βA', A' -> αA' | ε
+                    recursive = [body[1:] for body in body_list if len(body) != 0 and body[0] == Ai]
+                    if len(recursive) == 0:
+                        bodies[Ai] = body_list
+                        continue
+                    new_var = g.__new_variable(variables,Ai)
+                    bodies[Ai] = [body + [new_var] for body in body_list if len(body) == 0 or body[0] != Ai]
+                    bodies[new_var] = [alpha + [new_var] for alpha in recursive if len(alpha) != 0] + [[]]
+            return bodies
+        return self.__transform(transform,new_copy)
+
+    def left_factor(self,new_copy = False):
+        """Left factor the grammar: A -> αβ1 | αβ2  =>  A -> αA', A' -> β1 | β2.
+
+        Args:
+            new_copy (bool, optional): If True, return a new CFG without modifying the original one. Defaults to False.
+        """
+        def transform(g,bodies):
+            variables = set(bodies.keys())
+            worklist = list(bodies.keys())
+            while len(worklist) != 0:
+                var = worklist.pop()
+                groups = dict()
+                for body in bodies[var]:
+                    groups.setdefault(body[0] if len(body) != 0 else None,[]).append(body)
+                if all(len(group) == 1 for group in groups.values()):
+                    continue
+                new_body_list = []
+                for first_symbol,group in groups.items():
+                    if first_symbol is None or len(group) == 1:
+                        new_body_list.extend(group)
+                        continue
+                    prefix_len = 1
+                    shortest = min(len(body) for body in group)
+                    while prefix_len < shortest and all(body[prefix_len] == group[0][prefix_len] for body in group):
+                        prefix_len += 1
+                    new_var = g.__new_variable(variables,var)
+                    new_body_list.append(group[0][:prefix_len] + [new_var])
+                    bodies[new_var] = [body[prefix_len:] for body in group]
+                    worklist.append(new_var)
+                bodies[var] = new_body_list
+            return bodies
+        return self.__transform(transform,new_copy)
 
     def __str__(self) -> str:
         s = f'Variables      : {self.__variables}\n'\
@@ -140,173 +407,325 @@ class CFG:
                 s += f'{production}\n'
         return s
 
+class CFG_FIRST_FOLLOW:
+    """FIRST and FOLLOW sets of a CFG.
+
+    Terminals and the end symbol are interned to bit positions and every set is
+    an int bitset. Nullable variables, FIRST and FOLLOW are each computed by a
+    worklist over the dependency graph of the productions, so a variable is only
+    revisited when a set it depends on has grown.
+    """
+    def __init__(self,input_CFG:CFG) -> None:
+        self.__terminals = sorted(input_CFG.terminals()) + [input_CFG.end_symbol()]
+        self.__terminal_bit = {terminal:1 << i for i,terminal in enumerate(self.__terminals)}
+        self.__variables = input_CFG.variables()
+        self.__epsilon = input_CFG.epsilon()
+        self.__nullable = set()
+        self.__first = {var:0 for var in self.__variables}
+        self.__follow = {var:0 for var in self.__variables}
+
+        bodies = []
+        for head,production_list in input_CFG.productions().items():
+            for production in production_list:
+                if production.is_epsilon():
+                    bodies.append((head,[]))
+                else:
+                    bodies.append((head,[elem for elem in production._body if elem != self.__epsilon]))
+        self.__calculate_nullable(bodies)
+        self.__calculate_FIRST(bodies)
+        self.__calculate_FOLLOW(bodies,input_CFG.start_variable(),input_CFG.end_symbol())
+
+    @staticmethod
+    def __propagate(sets:dict,users:dict):
+        """Propagate bitsets along 'users' edges until nothing changes.
+
+        Args:
+            sets (dict): symbol -> bitset, updated in place.
+            users (dict): symbol -> symbols whose set includes the set of symbol.
+        """
+        worklist = [symbol for symbol,bits in sets.items() if bits != 0]
+        queued = set(worklist)
+        while len(worklist) != 0:
+            symbol = worklist.pop()
+            queued.discard(symbol)
+            bits = sets[symbol]
+            for user in users.get(symbol,()):
+                new_bits = sets[user] | bits
+                if new_bits != sets[user]:
+                    sets[user] = new_bits
+                    if user not in queued:
+                        queued.add(user)
+                        worklist.append(user)
+
+    def __calculate_nullable(self,bodies:list):
+        # Count the symbols of each body not known to be nullable yet.
+        remaining = []
+        occurrences = dict()
+        worklist = []
+        for i,(head,body) in enumerate(bodies):
+            if any(elem not in self.__variables for elem in body):
+                remaining.append(-1)
+                continue
+            remaining.append(len(body))
+            for elem in body:
+                occurrences.setdefault(elem,[]).append(i)
+            if len(body) == 0 and head not in self.__nullable:
+                self.__nullable.add(head)
+                worklist.append(head)
+        while len(worklist) != 0:
+            var = worklist.pop()
+            for i in occurrences.get(var,()):
+                remaining[i] -= 1
+                head = bodies[i][0]
+                if remaining[i] == 0 and head not in self.__nullable:
+                    self.__nullable.add(head)
+                    worklist.append(head)
+
+    def __calculate_FIRST(self,bodies:list):
+        users = dict()
+        for head,body in bodies:
+            for elem in body:
+                if elem in self.__variables:
+                    users.setdefault(elem,set()).add(head)
+                    if elem not in self.__nullable:
+                        break
+                else:
+                    self.__first[head] |= self.__terminal_bit.get(elem,0)
+                    break
+        self.__propagate(self.__first,users)
+
+    def __calculate_FOLLOW(self,bodies:list,start_variable:str,end_symbol:str):
+        # FIRST of every body suffix is taken from right to left.
+        users = dict()
+        for head,body in bodies:
+            trailer = 0
+            trailer_nullable = True
+            for elem in reversed(body):
+                if elem in self.__variables:
+                    self.__follow[elem] |= trailer
+                    if trailer_nullable == True:
+                        users.setdefault(head,set()).add(elem)
+                    if elem in self.__nullable:
+                        trailer |= self.__first[elem]
+                    else:
+                        trailer = self.__first[elem]
+                        trailer_nullable = False
+                else:
+                    trailer = self.__terminal_bit.get(elem,0)
+                    trailer_nullable = False
+        if start_variable in self.__follow:
+            self.__follow[start_variable] |= self.__terminal_bit[end_symbol]
+        self.__propagate(self.__follow,users)
+
+    def terminals(self,bits:int)->Set[str]:
+        """Get the terminals of a bitset.
+        """
+        s = set()
+        i = 0
+        while bits:
+            if bits & 1:
+                s.add(self.__terminals[i])
+            bits >>= 1
+            i += 1
+        return s
+
+    def terminal_bit(self,terminal:str)->int:
+        return self.__terminal_bit[terminal]
+
+    def is_nullable(self,symbol:str)->bool:
+        return symbol in self.__nullable or symbol == self.__epsilon
+
+    def first_bits(self,symbol:str)->int:
+        if symbol in self.__variables:
+            return self.__first[symbol]
+        return self.__terminal_bit.get(symbol,0)
+
+    def follow_bits(self,variable:str)->int:
+        return self.__follow[variable]
+
+    def body_first_bits(self,body:List[str])->Tuple[int,bool]:
+        """Get FIRST of a production body.
+
+        Returns:
+            Tuple[int,bool]: (terminals bitset, whether the body is nullable)
+        """
+        bits = 0
+        for elem in body:
+            bits |= self.first_bits(elem)
+            if self.is_nullable(elem) == False:
+                return (bits,False)
+        return (bits,True)
+
+    def first(self,symbol:str)->Set[str]:
+        s = self.terminals(self.first_bits(symbol))
+        if self.is_nullable(symbol):
+            s.add(self.__epsilon)
+        return s
+
+    def follow(self,variable:str)->Set[str]:
+        return self.terminals(self.__follow[variable])
+
+    def __str__(self) -> str:
+        s = ''
+        for var in sorted(self.__variables):
+            s += f'FIRST({var}) = {self.first(var)}, FOLLOW({var}) = {self.follow(var)}\n'
+        return s
+
 class LL_1_parser:
     def __init__(self,input_CFG = None) -> None:
         self.__LL_1_analysis_table = None
+        self.__FIRST_FOLLOW = None
         self.__CFG = input_CFG
+        # dense table for 'parse_tokens'
+        self.__terminal_id = None
+        self.__variable_id = None
+        self.__dense_table = None
+        self.__dense_productions = None
+        self.__reversed_bodies = None
         pass
     def construct_LL_1_analysis_table(self):
-        first = dict()
-        follow = dict()
-
         terminals = self.__CFG.terminals()
-        variables = self.__CFG.variables()
         productions = self.__CFG.productions()
-        epsilon = self.__CFG.epsilon()
-        start_variable = self.__CFG.start_variable()
         end_symbol = self.__CFG.end_symbol()
 
-        def union_set(s1:set,s2:set):
-            if len(s2 - s1) != 0:
-                s1 |= s2
-                return True
-            else:
-                return False
+        self.__FIRST_FOLLOW = CFG_FIRST_FOLLOW(self.__CFG)
+        first_follow = self.__FIRST_FOLLOW
+        self.__LL_1_analysis_table = LL1_analysis_table()
+        for head,production_list in productions.items():
+            for production in production_list:
+                body_first,nullable = first_follow.body_first_bits(production._body)
+                # For a in FIRST(body), add production to M[A,a] if a in 'terminals'.
+                for symbol in first_follow.terminals(body_first):
+                    if symbol in terminals:
+                        self.__LL_1_analysis_table.add_entry(head,symbol,production)
+                if nullable == True:
+                    for symbol in first_follow.follow(head):
+                        if symbol in terminals or symbol == end_symbol:
+                            self.__LL_1_analysis_table.add_entry(head,symbol,production)
+        self.__construct_dense_table()
+        logger.debug('FIRST/FOLLOW:\n%s',first_follow)
+        logger.debug('LL(1) analysis table:\n%s',self.__LL_1_analysis_table)
 
-        def get_FIRST():
-            nonlocal first
-            def update_FIRST(symbol:str)->bool:
-                ret = False
-                if symbol in terminals:
-                    ret |= union_set(first[symbol],{symbol})
+    def __construct_dense_table(self):
+        """Intern the symbols and flatten the analysis table for 'parse_tokens'.
 
-                elif symbol in variables:
-                    for production in productions[symbol]:
-                        if production.is_epsilon():
-                            ret |= union_set(first[symbol],{epsilon})
+        Terminals (end symbol last) get ids [0,T), variables get ids [T,T+V).
+        The table is a flat int array of V*T production indices (-1 for error),
+        and production bodies are kept reversed as id tuples ready to be pushed.
+        """
+        terminals = sorted(self.__CFG.terminals()) + [self.__CFG.end_symbol()]
+        variables = sorted(self.__CFG.variables())
+        terminals_num = len(terminals)
+        self.__terminal_id = {terminal:i for i,terminal in enumerate(terminals)}
+        self.__variable_id = {var:terminals_num+i for i,var in enumerate(variables)}
+        symbol_id = {**self.__terminal_id,**self.__variable_id}
 
-                        else:
-                            all_epsilon = True
-                            for elem in production._body:
-                                if all_epsilon == False:
-                                    break
-                                if elem in terminals:
-                                    ret |= union_set(first[symbol],{elem})
-                                    all_epsilon = False
-
-                                elif elem in variables:
-                                    ret |= union_set(first[symbol],first[elem]-{epsilon})
-                                    if epsilon not in first[elem]:
-                                        all_epsilon = False
-                            if all_epsilon == True:
-                                ret |= union_set(first[symbol],{epsilon})
-                return ret
-            # Initialize
-            for terminal in terminals:
-                first[terminal] = set()
-            for var in variables:
-                first[var] = set()
-            
-            updated = False
-            while True:
-                updated = False
-                for terminal in terminals:
-                    updated |= update_FIRST(terminal)
-                for var in variables:
-                    updated |= update_FIRST(var)
-                if updated == False:
-                    break
-            return
-            
-        def get_FOLLOW():
-            nonlocal first,follow
-            # Initialize
-            def update_FOLLOW():
-                ret = False
-                for head,production_list in productions.items():
-                    for production in production_list:
-                        if production.is_epsilon() == False:
-                            body = production.body()
-                            body_len = len(body)
-                            for i in range(0,body_len):
-                                if i < body_len - 1:
-                                    ret |= union_set(follow[body[i]],first[body[i+1]]-{epsilon})
-                            all_epsilon = True
-                            for i in range(body_len -1,-1,-1):
-                                if all_epsilon == False:
-                                    break
-                                ret |= union_set(follow[body[i]],follow[head])
-                    
-                                if epsilon not in first[body[i]]:
-                                    all_epsilon = False
-                return ret
-                
-            follow = dict()
+        self.__dense_productions = []
+        self.__reversed_bodies = []
+        self.__dense_table = array('i',[-1]*(len(variables)*terminals_num))
+        production_idx = dict()
+        for head,production_list in self.__CFG.productions().items():
+            for production in production_list:
+                production_idx[id(production)] = len(self.__dense_productions)
+                self.__dense_productions.append(production)
+                if production.is_epsilon():
+                    self.__reversed_bodies.append(())
+                else:
+                    self.__reversed_bodies.append(tuple(symbol_id[elem] for elem in reversed(production._body)))
+        for var in variables:
+            row = (self.__variable_id[var] - terminals_num)*terminals_num
             for terminal in terminals:
-                follow[terminal] = set()
-            for var in variables:
-                follow[var] = set()
+                if (var,terminal) in self.__LL_1_analysis_table:
+                    production = self.__LL_1_analysis_table.get_entry(var,terminal)
+                    self.__dense_table[row+self.__terminal_id[terminal]] = production_idx[id(production)]
 
-            follow[start_variable].add('$')
-            updated = False
-            while True:
-                updated = update_FOLLOW()
-                if updated == False:
-                    break
-            return
-        
+    def parse_tokens(self,tokens:Iterable)->bool:
+        """Parse a token stream, the tokens are consumed lazily.
 
-        def get_body_first(body:List[str])->set:
-            nonlocal first
-            s = set()
-            all_epsilon = True
-            for elem in body:
-                if all_epsilon == False:
-                    break
-                if elem == epsilon:
-                    s.add(epsilon)
-                    break
-                s |= (first[elem]-{epsilon})
-                if epsilon not in first[elem]:
-                    all_epsilon = False
-            if all_epsilon == True:
-                s.add(epsilon)
-            return s
+        Args:
+            tokens (Iterable): terminals, or tokens (e.g. 'myToken.Token') whose 'id' is a terminal.
+            The end symbol is appended automatically.
 
-        get_FIRST()
-        get_FOLLOW()
+        Returns:
+            bool: True if the tokens are accepted.
+        """
+        assert self.__LL_1_analysis_table != None
+        table = self.__dense_table
+        terminal_id = self.__terminal_id
+        reversed_bodies = self.__reversed_bodies
+        productions = self.__dense_productions
+        terminals_num = len(terminal_id)
+        end_id = terminals_num - 1
 
-        self.__LL_1_analysis_table = LL1_analysis_table()
-        for head,production_list in productions.items():
-            for production in production_list:
-                body = production.body()
-                body_first = get_body_first(body)
-                # For a in 'body_first', add production to M[A,a] if a in 'terminals'.
-                for symbol in body_first:
-                    if symbol in terminals:
-                        self.__LL_1_analysis_table.add_entry(head,symbol,production)
-                if epsilon in body_first:
-                    for symbol in follow[head]:
-                        if symbol in terminals or symbol == end_symbol:
-                            self.__LL_1_analysis_table.add_entry(head,symbol,production)
-        print(first)
-        print(follow)
-        print(self.__LL_1_analysis_table)
+        it = iter(tokens)
+        token = next(it,None)
+        if token is None:
+            a = end_id
+        else:
+            a = terminal_id.get(token if isinstance(token,str) else token.id,-1)
+            if a == end_id:
+                a = -1
+        symbol_stack = [end_id,self.__variable_id[self.__CFG.start_variable()]]
+        while True:
+            top = symbol_stack.pop()
+            if top < terminals_num:
+                if top != a:
+                    return False
+                if top == end_id:
+                    return True
+                token = next(it,None)
+                if token is None:
+                    a = end_id
+                else:
+                    a = terminal_id.get(token if isinstance(token,str) else token.id,-1)
+                    if a == end_id:
+                        a = -1
+            else:
+                if a < 0:
+                    return False
+                p = table[(top-terminals_num)*terminals_num+a]
+                if p < 0:
+                    return False
+                symbol_stack.extend(reversed_bodies[p])
+                if productions[p]._action is not None:
+                    productions[p]._action()
+
+    def FIRST_FOLLOW(self):
+        return self.__FIRST_FOLLOW
 
-    def parse(self,input:str,verbose = False):
+    def parse(self,input:str,verbose = False,trace = None)->bool:
+        """Parse a string of single character terminals.
+
+        Args:
+            input (str): input string, the end symbol is appended automatically.
+            verbose (bool, optional): Output parsing process. Defaults to False.
+            trace (Callable, optional): called with the 'Step' of each match/expansion, e.g. a tracing.Trace. Defaults to None.
+
+        Returns:
+            bool: True if the input is accepted.
+        """
+        return tracing.drive(self.parse_steps(input),tracing.combine(trace,verbose))
+
+    def parse_steps(self,input:str):
+        """Parse step by step, see 'parse'.
+
+        Yields:
+            Step: (index, stack top before, lookahead, stack top after, symbol stack, action);
+            the generator returns the parsing result.
+        """
         assert self.__LL_1_analysis_table != None
         assert self.__CFG != None
-        def print_identifier():
-            nonlocal input_suffix,input_ptr,symbol_stack,length,action
-            print(f'Matched_Str   : {input_suffix[0:input_ptr]}\n'\
-                  f'Symbol_Stack  : {symbol_stack}\n'\
-                  f'Unmatched_Str : {input_suffix[input_ptr:length]}\n'\
-                  f'Action        : {action}\n')
-        
         end_symbol = self.__CFG.end_symbol()
         start_variable = self.__CFG.start_variable()
         terminals = self.__CFG.terminals()
 
         input_suffix = input + end_symbol
-        length = len(input_suffix)
         symbol_stack = [end_symbol,start_variable]
 
-        action = ''
         # initialize
         input_ptr = 0
+        index = 0
         top = symbol_stack[len(symbol_stack)-1]
-        if verbose == True:
-            print_identifier()
         # analysis
         while top != end_symbol:
             ch = input_suffix[input_ptr]
@@ -324,24 +743,492 @@ class LL_1_parser:
                 symbol_stack.pop()
                 if production.is_epsilon() == False:
                     # reversed
-                    for elem in production.body()[::-1]:
+                    for elem in reversed(production._body):
                         symbol_stack.append(elem)
                 # do production action
                 if production._action is not None:
                     production._action()
 
-            if verbose == True:
-                print_identifier()
+            yield tracing.Step(index,top,ch,symbol_stack[len(symbol_stack)-1],tuple(symbol_stack),action)
+            index += 1
             if action == 'error':
                 return False
             top = symbol_stack[len(symbol_stack)-1]
-        if verbose == True:
-            print(f'Accept input : \'{input}\'\n')
         return True
 
 class LALR_1_parser:
-    def __init__(self) -> None:
+    """LALR(1) parser.
+
+    The LR(0) automaton of the augmented grammar is built first, then the
+    lookaheads of its reduce items are computed with the DeRemer-Pennello
+    relations (reads, includes, lookback), so no canonical LR(1) states are
+    ever created.
+
+    ACTION and GOTO are packed into one row-displacement table over symbol ids
+    (terminals first, then variables): the entry of (state,symbol) is
+    table_next[table_base[state]+symbol] and is valid only if
+    table_check[table_base[state]+symbol] == state.
+    An entry is 'target << 1' for shift/goto and 'production << 1 | 1' for reduce.
+    Reducing by production 0 (the augmented one) means accept.
+    """
+    TABLE_VERSION = 1
+
+    def __init__(self,input_CFG = None) -> None:
+        self.__CFG = input_CFG
+        self.__symbols = None
+        self.__symbol_id = None
+        self.__productions = None
+        self.__production_heads = None
+        self.__production_lens = None
+        self.__table_base = None
+        self.__table_check = None
+        self.__table_next = None
         pass
 
+    def __init_grammar(self):
+        """Intern the symbols and number the productions of the augmented grammar.
+        """
+        terminals = sorted(self.__CFG.terminals())
+        variables = sorted(self.__CFG.variables())
+        start_variable = self.__CFG.start_variable()
+        augmented_start = start_variable + "'"
+        while augmented_start in variables or augmented_start in terminals:
+            augmented_start += "'"
+
+        self.__symbols = terminals + [self.__CFG.end_symbol()] + variables + [augmented_start]
+        self.__symbol_id = {symbol:i for i,symbol in enumerate(self.__symbols)}
+        self.__productions = [CFG_Production(augmented_start,[start_variable])]
+        for production_list in self.__CFG.productions().values():
+            self.__productions.extend(production_list)
+        self.__production_heads = [self.__symbol_id[p.head()] for p in self.__productions]
+        self.__production_lens = [0 if p.is_epsilon() else len(p._body) for p in self.__productions]
+
+    def __signature(self)->list:
+        """Identify the grammar the tables were built for: the table version, then the head,
+        body length and body symbol ids of each production, as u32 arrays over the symbols.
+        """
+        symbol_id = self.__symbol_id
+        bodies = array('I')
+        for p in self.__productions:
+            if not p.is_epsilon():
+                bodies.extend(symbol_id[elem] for elem in p._body)
+        return [array('I',[self.TABLE_VERSION]),array('I',self.__production_heads),
+                array('I',self.__production_lens),bodies]
+
+    def construct_LALR_1_analysis_table(self):
+        assert self.__CFG != None
+        self.__init_grammar()
+        symbol_id = self.__symbol_id
+        terminals_num = len(self.__CFG.terminals()) + 1 # ids below it are terminals (with end symbol)
+        symbols_num = len(self.__symbols)
+        heads = self.__production_heads
+        bodies = [() if p.is_epsilon() else tuple(symbol_id[elem] for elem in p._body)
+                  for p in self.__productions]
+
+        productions_of = [[] for _ in range(symbols_num)]
+        for i,head in enumerate(heads):
+            productions_of[head].append(i)
+
+        first_follow = CFG_FIRST_FOLLOW(self.__CFG)
+        nullable = [first_follow.is_nullable(symbol) for symbol in self.__symbols]
+
+        # Productions added by the closure of an item whose dot is before variable A.
+        closure_of = [None]*symbols_num
+        for A in range(terminals_num,symbols_num):
+            visit = {A}
+            st = [A]
+            closure_productions = []
+            while len(st) != 0:
+                B = st.pop()
+                for p in productions_of[B]:
+                    closure_productions.append(p)
+                    body = bodies[p]
+                    if len(body) > 0 and body[0] >= terminals_num and body[0] not in visit:
+                        visit.add(body[0])
+                        st.append(body[0])
+            closure_of[A] = closure_productions
+
+        # LR(0) item sets, an item is (production,dot).
+        kernels = [((0,0),)]
+        kernel_id = {kernels[0]:0}
+        gotos = [] # gotos[state][symbol] = next state
+        reductions = [] # reductions[state] = productions with complete items
+        state = 0
+        while state < len(kernels):
+            items = list(kernels[state])
+            added = set()
+            for p,dot in kernels[state]:
+                body = bodies[p]
+                if dot < len(body) and body[dot] >= terminals_num:
+                    for q in closure_of[body[dot]]:
+                        if q not in added:
+                            added.add(q)
+                            items.append((q,0))
+            next_kernels = dict()
+            complete = []
+            for p,dot in items:
+                body = bodies[p]
+                if dot < len(body):
+                    next_kernels.setdefault(body[dot],[]).append((p,dot+1))
+                else:
+                    complete.append(p)
+            state_gotos = dict()
+            for symbol,kernel in next_kernels.items():
+                kernel = tuple(sorted(set(kernel)))
+                if kernel not in kernel_id:
+                    kernel_id[kernel] = len(kernels)
+                    kernels.append(kernel)
+                state_gotos[symbol] = kernel_id[kernel]
+            gotos.append(state_gotos)
+            reductions.append(complete)
+            state += 1
+        states_num = len(kernels)
+
+        # DeRemer-Pennello lookaheads, terminal sets are bitsets over terminal ids.
+        transitions = [] # variable transitions (state,variable)
+        transition_id = dict()
+        for p in range(0,states_num):
+            for symbol in gotos[p]:
+                if symbol >= terminals_num:
+                    transition_id[(p,symbol)] = len(transitions)
+                    transitions.append((p,symbol))
+
+        end_id = terminals_num - 1
+        direct_read = []
+        reads = []
+        for p,A in transitions:
+            r = gotos[p][A]
+            bits = 0
+            r_reads = []
+            for symbol in gotos[r]:
+                if symbol < terminals_num:
+                    bits |= 1 << symbol
+                elif nullable[symbol]:
+                    r_reads.append(transition_id[(r,symbol)])
+            if p == 0 and A == bodies[0][0]:
+                bits |= 1 << end_id
+            direct_read.append(bits)
+            reads.append(r_reads)
+        read = _digraph(reads,direct_read)
+
+        includes = [[] for _ in transitions]
+        lookback = dict() # (state,production) -> variable transitions
+        for x,(p_start,B) in enumerate(transitions):
+            for prod in productions_of[B]:
+                body = bodies[prod]
+                p = p_start
+                for i in range(0,len(body)):
+                    symbol = body[i]
+                    if symbol >= terminals_num and all(nullable[s] for s in body[i+1:]):
+                        includes[transition_id[(p,symbol)]].append(x)
+                    p = gotos[p][symbol]
+                lookback.setdefault((p,prod),[]).append(x)
+        follow = _digraph(includes,read)
+
+        # ACTION and GOTO rows
+        rows = []
+        for state in range(0,states_num):
+            row = {symbol:target << 1 for symbol,target in gotos[state].items()}
+            for prod in reductions[state]:
+                if prod == 0:
+                    lookahead = 1 << end_id
+                else:
+                    lookahead = 0
+                    for x in lookback.get((state,prod),[]):
+                        lookahead |= follow[x]
+                symbol = 0
+                while lookahead:
+                    if lookahead & 1:
+                        entry = (prod << 1) | 1
+                        try:
+                            if symbol in row:
+                                raise LALR_1_ConflictingEntry(state,
+                                                              self.__symbols[symbol],
+                                                              self.__entry_str(row[symbol]),
+                                                              self.__entry_str(entry))
+                        except LALR_1_ConflictingEntry as e:
+                            sys.stderr.write(e.__str__()+'\n')
+                            assert 0
+                        row[symbol] = entry
+                    lookahead >>= 1
+                    symbol += 1
+            rows.append(row)
+        self.__pack_table(rows)
+
+    def __pack_table(self,rows:List[dict]):
+        """Pack the table rows with row displacement (first fit, densest rows first).
+        """
+        base = array('i',[0]*len(rows))
+        check = array('i')
+        next = array('i')
+        for state in sorted(range(0,len(rows)),key = lambda s: -len(rows[s])):
+            row = rows[state]
+            if len(row) == 0:
+                continue
+            symbols = sorted(row)
+            b = -symbols[0]
+            while True:
+                fit = True
+                for symbol in symbols:
+                    i = b + symbol
+                    if i < len(check) and check[i] != -1:
+                        fit = False
+                        break
+                if fit == True:
+                    break
+                b += 1
+            top = b + symbols[-1] + 1
+            if top > len(check):
+                check.extend([-1]*(top-len(check)))
+                next.extend([0]*(top-len(next)))
+            for symbol in symbols:
+                check[b+symbol] = state
+                next[b+symbol] = row[symbol]
+            base[state] = b
+        self.__table_base = base
+        self.__table_check = check
+        self.__table_next = next
+
+    def __entry_str(self,entry:int)->str:
+        if entry & 1:
+            return f'reduce {self.__productions[entry >> 1]}'
+        return f'shift {entry >> 1}'
+
+    def __lookup(self,state:int,symbol:int):
+        i = self.__table_base[state] + symbol
+        if 0 <= i < len(self.__table_check) and self.__table_check[i] == state:
+            return self.__table_next[i]
+        return None
+
+    def parse(self,tokens:Iterable,verbose = False,trace = None)->bool:
+        """Parse a token stream.
+
+        Args:
+            tokens (Iterable): terminals, or tokens whose 'id' is a terminal. The end symbol is appended automatically.
+            verbose (bool, optional): Output parsing process. Defaults to False.
+            trace (Callable, optional): called with the 'Step' of each shift/reduce, e.g. a tracing.Trace. Defaults to None.
+
+        Returns:
+            bool: True if the tokens are accepted.
+
+        The '_action' of a production is called when reducing by it.
+        """
+        trace = tracing.combine(trace,verbose)
+        if trace is not None:
+            return tracing.drive(self.parse_steps(tokens),trace)
+        assert self.__table_base != None
+        heads = self.__production_heads
+        lens = self.__production_lens
+        productions = self.__productions
+        lookup = self.__lookup
+        next_symbol = self.__symbol_reader(tokens)
+
+        state_stack = [0]
+        symbol = next_symbol()
+        while True:
+            if symbol == -1:
+                return False
+            entry = lookup(state_stack[-1],symbol)
+            if entry is None:
+                return False
+            if entry & 1 == 0:
+                state_stack.append(entry >> 1)
+                symbol = next_symbol()
+            else:
+                prod = entry >> 1
+                if prod == 0:
+                    return True
+                if lens[prod] > 0:
+                    del state_stack[-lens[prod]:]
+                state_stack.append(lookup(state_stack[-1],heads[prod]) >> 1)
+                if productions[prod]._action is not None:
+                    productions[prod]._action()
+
+    def parse_steps(self,tokens:Iterable):
+        """Parse step by step, see 'parse'.
+
+        Yields:
+            Step: (index, state before, lookahead, state after, state stack, action);
+            the generator returns the parsing result.
+        """
+        assert self.__table_base != None
+        heads = self.__production_heads
+        lens = self.__production_lens
+        productions = self.__productions
+        lookup = self.__lookup
+        symbols = self.__symbols
+        next_symbol = self.__symbol_reader(tokens)
+
+        state_stack = [0]
+        symbol = next_symbol()
+        index = 0
+        while True:
+            if symbol == -1:
+                return False
+            state = state_stack[-1]
+            entry = lookup(state,symbol)
+            if entry is None:
+                yield tracing.Step(index,state,symbols[symbol],None,tuple(state_stack),'error')
+                return False
+            lookahead = symbol
+            if entry & 1 == 0:
+                state_stack.append(entry >> 1)
+                action = f'shift {entry >> 1}'
+                symbol = next_symbol()
+            else:
+                prod = entry >> 1
+                if prod == 0:
+                    yield tracing.Step(index,state,symbols[symbol],state,tuple(state_stack),'accept')
+                    return True
+                if lens[prod] > 0:
+                    del state_stack[-lens[prod]:]
+                state_stack.append(lookup(state_stack[-1],heads[prod]) >> 1)
+                action = f'reduce {productions[prod]}'
+                if productions[prod]._action is not None:
+                    productions[prod]._action()
+            yield tracing.Step(index,state,symbols[lookahead],state_stack[-1],tuple(state_stack),action)
+            index += 1
+
+    def __symbol_reader(self,tokens:Iterable)->Callable[[],int]:
+        """Get a function reading the next terminal id of 'tokens': the end symbol id
+        at the end of the stream, -1 for an unknown terminal.
+        """
+        symbol_id = self.__symbol_id
+        end_id = symbol_id[self.__CFG.end_symbol()]
+        it = iter(tokens)
+        def next_symbol()->int:
+            token = next(it,None)
+            if token is None:
+                return end_id
+            terminal = token if isinstance(token,str) else token.id
+            symbol = symbol_id.get(terminal,-1)
+            return symbol if symbol < end_id else -1
+        return next_symbol
+
+    def save_table(self,file_name:str):
+        """Serialize the analysis table, so it can be loaded instead of rebuilt. The symbols, the
+        grammar signature and the table arrays are written in the format of automata/serialization.py.
+        """
+        assert self.__table_base != None
+        arrays = self.__signature()
+        for table in (self.__table_base,self.__table_check,self.__table_next):
+            arrays.append(array('I',(x & 0xffffffff for x in table)))
+        serialization.write_file(file_name,serialization.encode(serialization.KIND_LALR_1_TABLE,self.__symbols,arrays))
+
+    def load_table(self,file_name:str)->bool:
+        """Load an analysis table saved by 'save_table'.
+
+        Returns:
+            bool: False if the file was saved for another grammar or table version, the table is not loaded then.
+
+        Raises:
+            AutomatonFormatException: the file is not a well-formed table.
+        """
+        assert self.__CFG != None
+        self.__init_grammar()
+        strings,arrays = serialization.decode(serialization.read_file(file_name),serialization.KIND_LALR_1_TABLE)
+        signature = self.__signature()
+        if len(arrays) != len(signature) + 3:
+            raise AutomatonFormatException(f'{len(arrays)} arrays instead of {len(signature) + 3}')
+        if strings != self.__symbols or any(list(a) != list(b) for a,b in zip(arrays,signature)):
+            return False
+        base,check,next = (array('i',a.tobytes()) for a in arrays[len(signature):])
+        if len(check) != len(next):
+            raise AutomatonFormatException('check and next arrays of different lengths')
+        self.__table_base = base
+        self.__table_check = check
+        self.__table_next = next
+        return True
+
+def _strongly_connected_components(graph:Dict[str,Set[str]])->List[List[str]]:
+    """Tarjan's algorithm (iterative), components are listed in reverse topological order.
+    """
+    index = dict()
+    low = dict()
+    on_stack = set()
+    stack = []
+    components = []
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        calls = [(root,iter(graph[root]))]
+        while len(calls) != 0:
+            v,it = calls[-1]
+            w = next(it,None)
+            if w is not None:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    calls.append((w,iter(graph[w])))
+                elif w in on_stack:
+                    low[v] = min(low[v],index[w])
+                continue
+            calls.pop()
+            if len(calls) != 0:
+                parent = calls[-1][0]
+                low[parent] = min(low[parent],low[v])
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+    return components
+
+def _digraph(relation:List[List[int]],base:List[int])->List[int]:
+    """DeRemer-Pennello 'digraph': F(x) = base(x) | union of F(y) for x R* y.
+
+    Args:
+        relation (List[List[int]]): relation[x] lists every y with x R y.
+        base (List[int]): bitsets of each x.
+
+    Returns:
+        List[int]: F, members of a strongly connected component share one set.
+    """
+    n = len(base)
+    F = list(base)
+    N = [0]*n
+    done = n + 1
+    stack = []
+    for x0 in range(0,n):
+        if N[x0] != 0:
+            continue
+        stack.append(x0)
+        N[x0] = len(stack)
+        calls = [(x0,0,N[x0])]
+        while len(calls) != 0:
+            x,i,d = calls[-1]
+            if i < len(relation[x]):
+                calls[-1] = (x,i+1,d)
+                y = relation[x][i]
+                if N[y] == 0:
+                    stack.append(y)
+                    N[y] = len(stack)
+                    calls.append((y,0,N[y]))
+                else:
+                    N[x] = min(N[x],N[y])
+                    F[x] |= F[y]
+                continue
+            calls.pop()
+            if N[x] == d:
+                while True:
+                    top = stack.pop()
+                    N[top] = done
+                    F[top] = F[x]
+                    if top == x:
+                        break
+            if len(calls) != 0:
+                parent = calls[-1][0]
+                N[parent] = min(N[parent],N[x])
+                F[parent] |= F[x]
+    return F
+
 if __name__ == '__main__':
     pass
\ No newline at end of file
@@ -1,19 +1,49 @@
 import os
 import sys
 import copy
-from graphviz import Digraph
+import heapq
+from array import array
 from typing import List,Dict,Tuple
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from automata.config import default_save_path
+from automata import profiling
+from automata import tracing
+from automata import serialization
+from automata import importers
+from automata import render
 from container import disjoint_set as ds
 from automata.myException import DuplicateStateException,NoneexistentStateException,NoneexistentLetterException,\
-    IncorrectLetterlLengthException,NonexistentTransitionRule
-
+    IncorrectLetterlLengthException,NonexistentTransitionRule,AutomatonFormatException,\
+    AutomatonValidationException
+
+def _listed(items,limit:int = 10)->str:
+    items = sorted(map(repr,items))
+    more = f' ... ({len(items)} in all)' if len(items) > limit else ''
+    return ', '.join(items[:limit]) + more
+
+def _part_errors(states:List[str],state_set:set,alphabet:set,q0:str,finish_states:set)->List[str]:
+    """Check the states, alphabet, start and finish states given to a bulk constructor.
+    """
+    errors = []
+    if len(state_set) != len(states):
+        seen = set()
+        duplicates = {q for q in states if q in seen or seen.add(q)}
+        errors.append(f'duplicate states: {_listed(duplicates)}')
+    bad_letters = [letter for letter in alphabet if len(letter) != 1]
+    if len(bad_letters) != 0:
+        errors.append(f'letters of length != 1: {_listed(bad_letters)}')
+    if q0 not in state_set:
+        errors.append(f'nonexistent start state: {q0!r}')
+    unknown = finish_states - state_set
+    if len(unknown) != 0:
+        errors.append(f'nonexistent finish states: {_listed(unknown)}')
+    return errors
 
 class DFA:
     def __init__(self):
         self.__Q = [] # states
+        self.__Q_set = set() # index of __Q
         self.__alphabet = set()
         self.__deltas = dict()
         self.__q0 = '' # start state
@@ -25,10 +55,11 @@ class DFA:
         Add a transition state to DFA.
         '''
         try:
-            if state in self.__Q:
+            if state in self.__Q_set:
                 raise DuplicateStateException(state)
             else:
                 self.__Q.append(state)
+                self.__Q_set.add(state)
         except DuplicateStateException as e:
             sys.stderr.write(e.__str__()+'\n')
             return
@@ -45,7 +76,7 @@ class DFA:
         Set start states for DFA.
         '''
         try:
-            if q0 in self.__Q:
+            if q0 in self.__Q_set:
                 self.__q0 = q0
             else:
                 raise NoneexistentStateException(q0)
@@ -61,7 +92,7 @@ class DFA:
         self.__finish_states.clear()
         for f in finish_states:
             try:
-                if f in self.__Q:
+                if f in self.__Q_set:
                     if f not in self.__finish_states:
                         self.__finish_states.add(f)
                 else:
@@ -93,11 +124,11 @@ class DFA:
         Set transition for DFA.
         '''
         try:
-            if src not in self.__Q:
+            if src not in self.__Q_set:
                 raise NoneexistentStateException(src)
             if letter not in self.__alphabet:
                 raise NoneexistentLetterException(letter)
-            if target not in self.__Q:
+            if target not in self.__Q_set:
                 raise NoneexistentStateException(target)
             
             if src not in self.__deltas:
@@ -147,7 +178,7 @@ class DFA:
             next state / None: error
         """
         try:
-            if s not in self.__Q:
+            if s not in self.__Q_set:
                 raise NoneexistentStateException(s)
             if c not in self.__alphabet:
                 raise NoneexistentLetterException(c)
@@ -181,103 +212,100 @@ class DFA:
 
             else it returns None.
         """
-        if q not in self.__Q or q not in self.__deltas:
+        if q not in self.__Q_set or q not in self.__deltas:
             return None
         for c,p in self.__deltas[q]:
             if c == ch:
                 return p
         return None
 
-    def run(self,input:str,verbose = False)->bool:
+    def __check_input(self,input:str)->bool:
+        try:
+            for c in input:
+                if c not in self.__alphabet:
+                    raise NoneexistentLetterException(c)
+        except NoneexistentLetterException as e:
+            sys.stderr.write(e.__str__()+'\n')
+            return False
+        return True
+
+    def run(self,input:str,verbose = False,trace = None)->bool:
         """Simulate input string on DFA.
 
         Args:
             input (str): input string
             verbose (bool, optional): Output simulation process. Defaults to False.
+            trace (Callable, optional): called with the 'Step' of each character, e.g. a tracing.Trace. Defaults to None.
         Return:
             Simulation result: True/False
         """
-        try:
-            for c in input:
-                if c not in self.__alphabet:
-                    raise NoneexistentLetterException(c)
-        except NoneexistentLetterException as e:
-            sys.stderr.write(e.__str__()+'\n')
+        trace = tracing.combine(trace,verbose)
+        if trace is not None:
+            return tracing.drive(self.steps(input),trace)
+        if self.__check_input(input) == False:
             return False
         
         current_state = self.__q0
         for i in range(0,len(input)):
-            if verbose == True:
-                print(f'Pre    : {current_state}')
-                print(f'Input  : {input}')
-                print(f'Read   : '+i*' '+'^')
             current_state = self.__move(current_state,input[i])
             if current_state is None:
                 return False
-            if verbose == True:
-                print(f'Next   : {current_state}\n')
 
         if current_state in self.__finish_states:
             return True
         else:
             return False
 
-    def draw(self,name = 'DFA',path:str = default_save_path):
+    def steps(self,input:str):
+        """Simulate input string on DFA step by step.
+
+        Yields:
+            Step: (index, state before, character, state after); the generator returns the simulation result.
+        """
+        if self.__check_input(input) == False:
+            return False
+        current_state = self.__q0
+        for i in range(0,len(input)):
+            next_state = self.__move(current_state,input[i])
+            yield tracing.Step(i,current_state,input[i],next_state)
+            if next_state is None:
+                return False
+            current_state = next_state
+        return current_state in self.__finish_states
+
+    def graph(self,name = 'DFA',around:str = None,depth:int = None):
+        """Build the Graphviz Digraph of the DFA, 'around' and 'depth' as in 'draw'.
+        """
+        edges = ((src,target,letter) for src,moves in self.__deltas.items() for letter,target in moves)
+        return render.automaton_graph(name,self.__Q,self.__q0,self.__finish_states,edges,around = around,depth = depth)
+
+    def draw(self,name = 'DFA',path:str = default_save_path,view = True,format = 'pdf',around:str = None,depth:int = None,
+             sink = None):
         """Draw picture for DFA.
 
         Args:
             name (str, optional): dest file name. Defaults to 'DFA'.
             path (str, optional): dest file dir. Defaults to default_save_path.
-        """
+            view (bool, optional): open the picture in a viewer, False for headless use. Defaults to True.
+            format (str, optional): Graphviz output format, 'dot' writes only the DOT source. Defaults to 'pdf'.
+            around (str, optional): draw only the neighborhood of this state, see render.automaton_graph.
+            depth (int, optional): radius of 'around', or draw only the states this close to the start state.
+            sink (optional): where the picture goes, see render.output. Defaults to the directory 'path'.
 
-        G = Digraph(filename=(path+name))
-        for q in self.__Q:
-            if q in self.__finish_states:
-                G.node(q,q,shape = 'doublecircle')
-            else:
-                G.node(q,q,shape = 'circle')
-            if q == self.__q0:
-                G.node('start','start',shape = 'none')
-                G.edge('start',self.__q0)
-
-        # Temporary container for storing edge information.
-        # format of element: [src,target,label]
-        edges_list = []
-        for key,val in self.__deltas.items():
-            for (letter,next) in val:
-                ifFind = False
-                for i in range(0,len(edges_list)):
-                    if edges_list[i][0] == key and edges_list[i][1] == next:
-                        # Add the description to the label
-                        edges_list[i][2] += f',{letter}'
-                        ifFind = True
-                        break
-                if ifFind == False:
-                    # Edge does not exist, add it to the list.
-                    edges_list.append([key,next,letter])
-        # Add edges in the list to the directed graph
-        for src,target,label in edges_list:
-            if len(label)>1:
-                label_list = label.split(',')
-                label_list.sort()
-                label = ''
-                for l in label_list:
-                    if len(label) == 0:
-                        label += l
-                    else:
-                        label += f',{l}'
-            G.edge(src,target,label)
-        G.attr(rankdir = 'LR')
-        G.view()
-        return
+        Returns:
+            the written file name, or what 'sink' returns.
+        """
+        G = self.graph(name,around,depth)
+        return render.output(G,name,format,view,sink,path)
     
-    def __split(self,s1:str,s2:str,table:List[List[int]])->bool:
+    def __split(self,s1:str,s2:str,table:List[List[int]],index:Dict[str,int])->bool:
         """Check whether s1 and s2 can be distinguished.
 
         Args:
             s1 (str): state1
             s2 (str): state2
             table (List[List[int]]): distinction table
+            index (Dict[str,int]): index of each state in the table
 
         Returns:
             bool: True/False
@@ -285,16 +313,18 @@ class DFA:
         for ch in self.__alphabet:
             next1 = None
             next2 = None
-            for (letter,next) in self.__deltas[s1]:
+            for (letter,next) in self.__deltas.get(s1,()):
                 if letter == ch:
                     next1 = next
                     break
-            for (letter,next) in self.__deltas[s2]:
+            for (letter,next) in self.__deltas.get(s2,()):
                 if letter == ch:
                     next2 = next
             if (next1 == None and next2 != None) or (next1 != None and next2 == None):
                 return True
-            if table[self.__Q.index(next1)][self.__Q.index(next2)] == 1 or table[self.__Q.index(next2)][self.__Q.index(next1)] == 1:
+            if next1 == None:
+                continue
+            if table[index[next1]][index[next2]] == 1 or table[index[next2]][index[next1]] == 1:
                 return True
         return False 
 
@@ -314,12 +344,12 @@ class DFA:
             """Remove unreachable states of DFA
             """
             st = []
-            visit = []
+            visit = set()
             st.append(self.__q0)
             while len(st)!= 0:
                 top = st.pop()
                 if top not in visit:
-                    visit.append(top)
+                    visit.add(top)
                 if top in self.__deltas.keys():
                     for (ch,next) in self.__deltas[top]:
                         if next not in visit:
@@ -329,11 +359,16 @@ class DFA:
             for key in list(self.__deltas.keys()):
                 if key not in visit:
                     del self.__deltas[key]
-            self.__Q = sorted(visit.copy())
+            self.__Q = sorted(visit)
+            self.__Q_set = set(self.__Q)
         
+        record = None
+        if profiling.enabled:
+            record = profiling.begin('DFA.minimize',**profiling.dfa_sizes(self.__deltas,len(self.__Q),'before'))
 
         remove_unreachable_states()
         states_num = len(self.__Q)
+        index = {q:i for i,q in enumerate(self.__Q)}
         table = [[0]*states_num for _ in range(states_num)]
         # Initialize
         for i in range(0,len(self.__Q)):
@@ -346,63 +381,46 @@ class DFA:
                         table[k][i] = 1 #x
         
         updated = False
+        rounds = 0
         while 1:
             updated = False
+            rounds += 1
             for j in range(0,states_num-1):
                 for i in range(j+1,states_num):
                     if table[i][j] == 1:
                         continue
                     else:
-                        split = self.__split(self.__Q[i],self.__Q[j],table)
+                        split = self.__split(self.__Q[i],self.__Q[j],table,index)
                         if split == True:
                             table[i][j] = 1
                             updated = True
             if updated == False:
                 break
 
-        d = ds.DisjointSet(self.__Q)
+        d = ds.IntDisjointSet(states_num)
         for j in range(0,states_num-1):
             for i in range(j+1,states_num):
                 if table[i][j] == 0:
-                    d.union(self.__Q[i],self.__Q[j])
-        
-        set_list = d.get_set_list()
-
-        # Redesign DFA
-        new_Q = [f'q{i}'for i in range(0,len(set_list))]
-        new_q0 = ''
-        new_finsih_states = set()
+                    d.union(i,j)
+
+        # Redesign DFA: block of each state, blocks numbered in order of their first state
+        block = [0]*states_num
+        for k,members in enumerate(d.groups().values()):
+            for i in members:
+                block[i] = k
+        new_Q = [f'q{k}' for k in range(0,d.sets_count)]
+        new_q0 = new_Q[block[index[self.__q0]]]
+        new_finsih_states = {new_Q[block[index[f]]] for f in self.__finish_states if f in index}
         new_deltas = {}
-        for l in set_list:
-            if self.__q0 in l:
-                new_q0 = f'q{set_list.index(l)}'
-                break
-        
-        for l in set_list:
-            for f in self.__finish_states:
-                if f in l:
-                    new_finsih_states.add(f'q{set_list.index(l)}')
-        
         for (pre,deltas) in self.__deltas.items():
-            for (letter,next) in deltas:
-                new_pre = None
-                new_next = None
-                for l in set_list:
-                    if pre in l:
-                        new_pre = f'q{set_list.index(l)}'
-                    if next in l:
-                        new_next = f'q{set_list.index(l)}'
-                assert new_pre != None and new_next != None
-                if new_pre not in new_deltas.keys():
-                    new_deltas[new_pre] = []
-                
-                exist = False
-                for (temp_letter,temp_next) in new_deltas[new_pre]:
-                    if temp_letter == letter:
-                        exist = True
-                        break
-                if exist == False:
-                    new_deltas[new_pre].append((letter,new_next))
+            new_pre = new_Q[block[index[pre]]]
+            if new_pre in new_deltas:
+                # equivalent states have the same transitions up to equivalence
+                continue
+            new_deltas[new_pre] = [(letter,new_Q[block[index[next]]]) for (letter,next) in deltas]
+
+        if record is not None:
+            profiling.end(record,refinement_rounds = rounds,**profiling.dfa_sizes(new_deltas,len(new_Q),'after'))
 
         if new_copy == True:
             new_DFA = DFA()
@@ -414,6 +432,7 @@ class DFA:
             return new_DFA
         else:
             self.__Q = new_Q
+            self.__Q_set = set(new_Q)
             self.__q0 = new_q0
             self.__finish_states = new_finsih_states
             self.__deltas = new_deltas
@@ -686,20 +705,19 @@ class DFA:
             
             copy (bool): If true, return a new copy.
         """
-        alphabet_copy = copy.deepcopy(alphabet)
-        old_copy = None
+        alphabet_copy = set(alphabet)
         if new_copy == True:
-            old_copy = copy.deepcopy(a)
-        
-        delta = a.deltas()
+            a = DFA._build(list(a.__Q),set(a.__alphabet),a.__q0,set(a.__finish_states),
+                           {q:list(moves) for q,moves in a.__deltas.items()})
+        delta = a.__deltas
         a.set_alphabet(alphabet_copy)
         states = a.Q()
         dead_state = ''
         for q in states:
-            ch_list = copy.deepcopy(alphabet_copy)
+            ch_list = set(alphabet_copy)
             if q in delta:
                 for ch,p in delta[q]:
-                    ch_list.remove(ch)
+                    ch_list.discard(ch)
             if len(ch_list) != 0:
                 if len(dead_state) == 0:
                     dead_state = 'q_dead'
@@ -710,22 +728,14 @@ class DFA:
                             c,
                             dead_state
                         )
-                for ch in ch_list:
+                for ch in sorted(ch_list):
                     a.add_delta(
                         q,
                         ch,
                         dead_state
                     )
-        if new_copy == True: 
-            # restore the original DFA 'a' and return a new copy
-            ret = copy.deepcopy(a)
-            a.clear()
-            a.set_alphabet(old_copy.alphabet())
-            a.add_states(old_copy.Q())
-            a.set_deltas(old_copy.deltas())
-            a.set_q0(old_copy.q0())
-            a.set_finish_states(old_copy.finish_states())
-            return ret
+        if new_copy == True:
+            return a
         return None
 
     def complement(self):
@@ -785,6 +795,114 @@ class DFA:
         ap.minimize()
         return ap
 
+    @classmethod
+    def intersect_all(cls,dfas,minimize = True,balanced = False):
+        """Caculate the intersection of many DFAs at once.
+
+        The n-ary product is explored from the tuple of start states, only through tuples whose
+        states can all still reach a finish state, so an empty intersection is found without
+        building dead parts of the product.
+
+        Args:
+            dfas (List[DFA]): DFAs, over any alphabets.
+            minimize (bool, optional): minimize the result. Defaults to True.
+            balanced (bool, optional): combine the DFAs two at a time, always the two smallest,
+                minimizing each intermediate result and stopping at the first empty one. Defaults to False.
+        """
+        return cls.__combine_all(list(dfas),True,minimize,balanced)
+
+    @classmethod
+    def union_all(cls,dfas,minimize = True,balanced = False):
+        """Caculate the union of many DFAs at once, see 'intersect_all'.
+        """
+        return cls.__combine_all(list(dfas),False,minimize,balanced)
+
+    @classmethod
+    def __combine_all(cls,dfas,accept_all:bool,minimize:bool,balanced:bool):
+        assert len(dfas) >= 1
+        if balanced == False or len(dfas) == 1:
+            d = cls.__product_all(dfas,accept_all)
+        else:
+            heap = [(len(d.__Q),i,d) for i,d in enumerate(dfas)]
+            heapq.heapify(heap)
+            count = len(heap)
+            while len(heap) > 1:
+                a = heapq.heappop(heap)[2]
+                b = heapq.heappop(heap)[2]
+                d = cls.__product_all([a,b],accept_all)
+                d.minimize()
+                if accept_all and len(d.__finish_states) == 0:
+                    return d
+                heapq.heappush(heap,(len(d.__Q),count,d))
+                count += 1
+            d = heap[0][2]
+        if minimize == True:
+            d.minimize()
+        return d
+
+    def __live_states(self)->set:
+        """States from which a finish state can be reached.
+        """
+        reverse = dict()
+        for q,moves in self.__deltas.items():
+            for letter,p in moves:
+                reverse.setdefault(p,[]).append(q)
+        live = set(self.__finish_states)
+        st = list(live)
+        while len(st) != 0:
+            p = st.pop()
+            for q in reverse.get(p,()):
+                if q not in live:
+                    live.add(q)
+                    st.append(q)
+        return live
+
+    @classmethod
+    def __product_all(cls,dfas,accept_all:bool):
+        """Reachable part of the product of the DFAs, accepting when all (or any) of them accept.
+
+        For an intersection, a tuple with a state that cannot reach a finish state is replaced by
+        a single dead state; for a union, a missing move of a DFA leads to its dead state (None),
+        and the tuple of dead states is the dead state. The result is complete.
+        """
+        alphabet = set().union(*(d.__alphabet for d in dfas))
+        letters = sorted(alphabet)
+        moves = [{(q,letter):p for q,ms in d.__deltas.items() for letter,p in ms} for d in dfas]
+        finals = [d.__finish_states for d in dfas]
+        start = tuple(d.__q0 for d in dfas)
+        if accept_all:
+            live = [d.__live_states() for d in dfas]
+            if not all(q in l for q,l in zip(start,live)):
+                return cls._build(['q0'],alphabet,'q0',set(),{'q0':[(letter,'q0') for letter in letters]})
+        number = {start:0}
+        order = [start]
+        deltas = dict()
+        i = 0
+        while i < len(order):
+            state = order[i]
+            out = []
+            for letter in letters:
+                if state is None:
+                    target = None
+                elif accept_all:
+                    target = tuple(move.get((q,letter)) for q,move in zip(state,moves))
+                    if not all(p in l for p,l in zip(target,live)):
+                        target = None
+                else:
+                    target = tuple(move.get((q,letter)) if q is not None else None for q,move in zip(state,moves))
+                    if all(p is None for p in target):
+                        target = None
+                k = number.get(target)
+                if k is None:
+                    k = number[target] = len(order)
+                    order.append(target)
+                out.append((letter,f'q{k}'))
+            deltas[f'q{i}'] = out
+            i += 1
+        accepts = all if accept_all else any
+        finish_states = {f'q{i}' for i,state in enumerate(order)
+                         if state is not None and accepts(q in f for q,f in zip(state,finals))}
+        return cls._build([f'q{i}' for i in range(0,len(order))],alphabet,'q0',finish_states,deltas)
 
     def __str__(self) -> str:
         return f"States   : {self.__Q} \n"\
@@ -800,7 +918,154 @@ class DFA:
         self.__deltas.clear()
         self.__finish_states.clear()
         self.__Q.clear()
+        self.__Q_set.clear()
         self.__q0 = ''
 
+    @classmethod
+    def _build(cls,states:List[str],alphabet:set,q0:str,finish_states:set,deltas:Dict[str,List[Tuple[str,str]]]):
+        """Build a DFA from trusted parts, without the checks of the 'add_'/'set_' methods.
+
+        The new DFA takes ownership of the given containers.
+        """
+        d = cls()
+        d.__Q = states
+        d.__Q_set = set(states)
+        d.__alphabet = alphabet
+        d.__q0 = q0
+        d.__finish_states = finish_states
+        d.__deltas = deltas
+        return d
+
+    @classmethod
+    def from_table(cls,states:List[str],alphabet,q0:str,finish_states:set,table):
+        """Build a DFA from a transition table, checking everything once instead of per call.
+
+        Args:
+            states (List[str]): states, in order.
+            alphabet: letters. An ordered sequence if the table rows are sequences.
+            q0 (str): start state.
+            finish_states (set): finish states.
+            table: either a dict {state:{letter:target}}, or one row per state (in the order of 'states')
+                with the target of each letter of 'alphabet', None for no transition.
+
+        Raises:
+            AutomatonValidationException: listing all the problems found.
+        """
+        states = list(states)
+        state_set = set(states)
+        alphabet_list = list(alphabet)
+        alphabet_set = set(alphabet_list)
+        finish_states = set(finish_states)
+        errors = _part_errors(states,state_set,alphabet_set,q0,finish_states)
+        deltas = dict()
+        letters = set()
+        targets = set()
+        if isinstance(table,dict):
+            unknown = table.keys() - state_set
+            if len(unknown) != 0:
+                errors.append(f'nonexistent source states: {_listed(unknown)}')
+            for src,row in table.items():
+                if len(row) != 0:
+                    deltas[src] = list(row.items())
+                    letters.update(row.keys())
+                    targets.update(row.values())
+        else:
+            rows = list(table)
+            if len(rows) != len(states):
+                errors.append(f'{len(rows)} table rows for {len(states)} states')
+            bad_rows = []
+            for src,row in zip(states,rows):
+                if len(row) != len(alphabet_list):
+                    bad_rows.append(src)
+                    continue
+                moves = [(letter,p) for letter,p in zip(alphabet_list,row) if p is not None]
+                if len(moves) != 0:
+                    deltas[src] = moves
+                    targets.update(p for letter,p in moves)
+            if len(bad_rows) != 0:
+                errors.append(f'rows without one entry per letter: {_listed(bad_rows)}')
+        unknown = letters - alphabet_set
+        if len(unknown) != 0:
+            errors.append(f'nonexistent letters: {_listed(unknown)}')
+        unknown = targets - state_set
+        if len(unknown) != 0:
+            errors.append(f'nonexistent target states: {_listed(unknown)}')
+        if len(errors) != 0:
+            raise AutomatonValidationException(errors)
+        return cls._build(states,alphabet_set,q0,finish_states,deltas)
+
+    def to_bytes(self)->bytes:
+        """Serialize the DFA, see automata/serialization.py for the format.
+        """
+        table = serialization.StringTable()
+        intern = table.intern
+        transitions = array('I')
+        append = transitions.append
+        for src,moves in self.__deltas.items():
+            src_id = intern(src)
+            for letter,target in moves:
+                append(src_id)
+                append(intern(letter))
+                append(intern(target))
+        arrays = [[intern(self.__q0)],[intern(q) for q in self.__Q],[intern(ch) for ch in sorted(self.__alphabet)],
+                  [intern(q) for q in sorted(self.__finish_states)],transitions]
+        return serialization.encode(serialization.KIND_DFA,table.strings,arrays)
+
+    @classmethod
+    def from_bytes(cls,data:bytes):
+        """Deserialize a DFA written by 'to_bytes'.
+
+        Raises:
+            AutomatonFormatException: if data is not a serialized DFA.
+        """
+        strings,arrays = serialization.decode(data,serialization.KIND_DFA)
+        if len(arrays) != 5 or len(arrays[0]) != 1 or len(arrays[4]) % 3 != 0:
+            raise AutomatonFormatException('bad DFA layout')
+        meta,states,alphabet,finish_states,transitions = arrays
+        strings_of = serialization.strings_of
+        deltas = dict()
+        try:
+            get = strings.__getitem__
+            for src,letter,target in zip(map(get,transitions[0::3]),map(get,transitions[1::3]),map(get,transitions[2::3])):
+                moves = deltas.get(src)
+                if moves is None:
+                    moves = deltas[src] = []
+                moves.append((letter,target))
+        except IndexError:
+            raise AutomatonFormatException('string id out of range')
+        return cls._build(strings_of(strings,states),set(strings_of(strings,alphabet)),strings_of(strings,meta)[0],
+                          set(strings_of(strings,finish_states)),deltas)
+
+    def save(self,file_name:str):
+        serialization.write_file(file_name,self.to_bytes())
+
+    @classmethod
+    def load(cls,file_name:str):
+        return cls.from_bytes(serialization.read_file(file_name))
+
+    @classmethod
+    def from_jflap(cls,source):
+        """Read a JFLAP '.jff' finite automaton, see automata/importers.py.
+
+        Args:
+            source: file name or binary file object.
+
+        Raises:
+            AutomatonFormatException: if the file is malformed or not an automaton of this class.
+        """
+        return importers.read_jflap(source).dfa(cls)
+
+    @classmethod
+    def from_dot(cls,source):
+        """Read an automaton from a Graphviz DOT digraph, e.g. one written by 'draw'.
+        """
+        return importers.read_dot(source).dfa(cls)
+
+    @classmethod
+    def from_hoa(cls,source):
+        """Read an automaton in the Hanoi Omega-Automata format, on finite words.
+        """
+        return importers.read_hoa(source).dfa(cls)
+
 if __name__ == '__main__':
     pass
\ No newline at end of file
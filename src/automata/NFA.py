@@ -1,19 +1,27 @@
 import os
 import sys
 import copy
+from array import array
 from typing import List,Dict,Tuple
-from graphviz import Digraph
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from automata.DFA import DFA
+from automata.DFA import DFA,_listed,_part_errors
 from automata.config import default_save_path
+from automata import profiling
+from automata import tracing
+from automata import serialization
+from automata import importers
+from automata import render
+from automata import antichain
 from automata.myException import DuplicateStateException,NoneexistentStateException,NoneexistentLetterException,\
-    IncorrectLetterlLengthException,NonexistentTransitionRule
+    IncorrectLetterlLengthException,NonexistentTransitionRule,AutomatonFormatException,\
+    AutomatonValidationException
 
 class NFA:
     """NonDeterministic Finite Automata
     """
     def __init__(self):
         self.__Q = [] # states
+        self.__Q_set = set() # index of __Q
         self.__alphabet = set()
         self.__deltas = dict()
         self.__q0 = '' # start state
@@ -26,10 +34,11 @@ class NFA:
         Add a transition state to NFA.
         '''
         try:
-            if state in self.__Q:
+            if state in self.__Q_set:
                 raise DuplicateStateException(state)
             else:
                 self.__Q.append(state)
+                self.__Q_set.add(state)
         except DuplicateStateException as e:
             sys.stderr.write(e.__str__()+'\n')
             return
@@ -46,7 +55,7 @@ class NFA:
         Set start states for NFA.
         '''
         try:
-            if q0 in self.__Q:
+            if q0 in self.__Q_set:
                 self.__q0 = q0
             else:
                 raise NoneexistentStateException(q0)
@@ -61,7 +70,7 @@ class NFA:
         '''
         for f in finish_states:
             try:
-                if f in self.__Q:
+                if f in self.__Q_set:
                     if f not in self.__finish_states:
                         self.__finish_states.add(f)
                 else:
@@ -93,13 +102,13 @@ class NFA:
         Set transition for NFA.
         '''
         try:
-            if src not in self.__Q:
+            if src not in self.__Q_set:
                 raise NoneexistentStateException(src)
             if letter != self.__epsilon and letter not in self.__alphabet:
                 raise NoneexistentLetterException(letter)
             # Check whether each state in target is legal
             for target in targets:
-                if target not in self.__Q:
+                if target not in self.__Q_set:
                     raise NoneexistentStateException(target)
             
             if src not in self.__deltas:
@@ -107,10 +116,12 @@ class NFA:
             # In NFA, delta allow different transfers on one character.
             
             # Find whether the transfer function on letter already exists.
-            for first,second in self.__deltas[src]:
+            moves = self.__deltas[src]
+            for i in range(0,len(moves)):
+                first,second = moves[i]
                 if first == letter:
                     # Add new target state set if it exists.
-                    second = second | targets
+                    moves[i] = (letter,second | targets)
                     return
             
             # If there is no transfer function on letter, set it.
@@ -150,41 +161,65 @@ class NFA:
     def deltas(self):
         return copy.deepcopy(self.__deltas)
 
-    def run(self,input:str,verbose = False)->bool:
+    def __check_input(self,input:str)->bool:
+        try:
+            for c in input:
+                if c not in self.__alphabet:
+                    raise NoneexistentLetterException(c)
+        except NoneexistentLetterException as e:
+            sys.stderr.write(e.__str__()+'\n')
+            return False
+        return True
+
+    def run(self,input:str,verbose = False,trace = None)->bool:
         """Simulate input string on NFA.
 
         Args:
             input (str): input string
             verbose (bool, optional): Output simulation process. Defaults to False.
+            trace (Callable, optional): called with the 'Step' of each character, e.g. a tracing.Trace. Defaults to None.
         Return:
             Simulation result: True/False
         """
-        try:
-            for c in input:
-                if c not in self.__alphabet:
-                    raise NoneexistentLetterException(c)
-        except NoneexistentLetterException as e:
-            sys.stderr.write(e.__str__()+'\n')
+        trace = tracing.combine(trace,verbose)
+        if trace is not None:
+            return tracing.drive(self.steps(input),trace)
+        if self.__check_input(input) == False:
             return False
         
         current_state_set = self.__epsilon_closure({self.q0()})
         for i in range(0,len(input)):
-            if verbose == True:
-                print(f'Pre    : {current_state_set}')
-                print(f'Input  : {input}')
-                print(f'Read   : '+i*' '+'^')
             current_state_set = self.__move(current_state_set,input[i])
             if current_state_set is None:
                 return False
             current_state_set = self.__epsilon_closure(current_state_set)
-            if verbose == True:
-                print(f'Next   : {current_state_set}\n')
 
         for state in current_state_set:
             if state in self.__finish_states:
                 return True
         return False
 
+    def steps(self,input:str):
+        """Simulate input string on NFA step by step.
+
+        Yields:
+            Step: (index, states before, character, states after) with frozensets of states;
+            the generator returns the simulation result.
+        """
+        if self.__check_input(input) == False:
+            return False
+        current_state_set = self.__epsilon_closure({self.q0()})
+        for i in range(0,len(input)):
+            next_state_set = self.__move(current_state_set,input[i])
+            if next_state_set is not None:
+                next_state_set = self.__epsilon_closure(next_state_set)
+            yield tracing.Step(i,frozenset(current_state_set),input[i],
+                               frozenset(next_state_set) if next_state_set is not None else None)
+            if next_state_set is None:
+                return False
+            current_state_set = next_state_set
+        return len(current_state_set & self.__finish_states) != 0
+
     def __move(self,states:set[str],c:str,report:bool = True):
         """Change states according to current states 'states' and letter 'c'
 
@@ -196,7 +231,7 @@ class NFA:
         """
         try:
             for s in states:
-                if s not in self.__Q:
+                if s not in self.__Q_set:
                     raise NoneexistentStateException(s)
             if c not in self.__alphabet:
                 raise NoneexistentLetterException(c)
@@ -244,62 +279,37 @@ class NFA:
             else:
                 for (ch,next_states) in self.__deltas[top]:
                     if ch == self.__epsilon:
-                        result |= next_states
                         for state in next_states:
-                            if state not in st:
+                            # states already in the closure are not pushed again, epsilon cycles end
+                            if state not in result:
+                                result.add(state)
                                 st.append(state)
             
         return result
-    def draw(self,name = 'NFA',path:str = default_save_path):
+    def graph(self,name = 'NFA',around:str = None,depth:int = None):
+        """Build the Graphviz Digraph of the NFA, 'around' and 'depth' as in 'draw'.
+        """
+        edges = ((src,target,letter) for src,moves in self.__deltas.items() for letter,targets in moves for target in targets)
+        return render.automaton_graph(name,self.__Q,self.__q0,self.__finish_states,edges,around = around,depth = depth)
+
+    def draw(self,name = 'NFA',path:str = default_save_path,view = True,format = 'pdf',around:str = None,depth:int = None,
+             sink = None):
         """Draw picture for NFA.
 
         Args:
             name (str, optional): dest file name. Defaults to 'NFA'.
             path (str, optional): dest file dir. Defaults to default_save_path.
+            view (bool, optional): open the picture in a viewer, False for headless use. Defaults to True.
+            format (str, optional): Graphviz output format, 'dot' writes only the DOT source. Defaults to 'pdf'.
+            around (str, optional): draw only the neighborhood of this state, see render.automaton_graph.
+            depth (int, optional): radius of 'around', or draw only the states this close to the start state.
+            sink (optional): where the picture goes, see render.output. Defaults to the directory 'path'.
+
+        Returns:
+            the written file name, or what 'sink' returns.
         """
-        G = Digraph(filename=(path+name))
-        for q in self.__Q:
-            if q in self.__finish_states:
-                G.node(q,q,shape = 'doublecircle')
-            else:
-                G.node(q,q,shape = 'circle')
-            if q == self.__q0:
-                G.node('start','start',shape = 'none')
-                G.edge('start',self.__q0)
-        
-        # Temporary container for storing edge information.
-        # format of element: [src,target,label]
-        edges_list = []
-        for key,val in self.__deltas.items():
-            for(letter,next_satets) in val:
-                for next in next_satets:
-                    # Check whether the edge to be added has been recorded.
-                    ifFind = False
-                    for i in range(0,len(edges_list)):
-                        if edges_list[i][0] == key and edges_list[i][1] == next:
-                            # Add the description to the label
-                            edges_list[i][2] += f',{letter}'
-                            ifFind = True
-                            break
-                    if ifFind == False:
-                        # Edge does not exist, add it to the list.
-                        edges_list.append([key,next,letter])
-        
-        # Add edges in the list to the directed graph
-        for src,target,label in edges_list:
-            if len(label)>1:
-                label_list = label.split(',')
-                label_list.sort()
-                label = ''
-                for l in label_list:
-                    if len(label) == 0:
-                        label += l
-                    else:
-                        label += f',{l}'
-            G.edge(src,target,label)
-        G.attr(rankdir = 'LR')
-        G.view()
-        return
+        G = self.graph(name,around,depth)
+        return render.output(G,name,format,view,sink,path)
     
     def to_DFA(self)->DFA:
         """Construct DFA equivalent to NFA by subset construction method.
@@ -307,6 +317,9 @@ class NFA:
         Returns:
             DFA: DFA object returned.
         """
+        record = None
+        if profiling.enabled:
+            record = profiling.begin('NFA.to_DFA',**profiling.nfa_sizes(self.__deltas,len(self.__Q),'before'))
         d = DFA()
         new_state_idx = 0
         # Dstates: [pre_states_set, new_state_name, mark]
@@ -380,20 +393,200 @@ class NFA:
                     D_finish_states.add(Dstates[i][1])
         d.set_finish_states(D_finish_states)
         d.set_deltas(Dtrans)
-        '''
-        for it in Dstates:
-            print(it)
-        '''
+        if record is not None:
+            profiling.end(record,subset_states = len(Dstates),**profiling.dfa_sizes(d.deltas(),len(Dstates),'after'))
         return d
-    
+
+    def is_subset_of(self,other,simulation = None)->bool:
+        """Determines whether the language of the NFA is included in that of 'other'.
+
+        Args:
+            other (NFA or DFA): the larger automaton.
+            simulation (bool, optional): prune with the maximal simulation. It can save most of the
+                exploration, but is computed first, in quadratic time and memory in the states of
+                both automata. Defaults to using it when both have at most
+                antichain.SIMULATION_LIMIT reachable states.
+
+        Returns:
+            bool: result
+
+        Method: antichains over the pairs (state of self, set of states of other), explored
+        breadth first; neither automaton is determinized. antichain.inclusion_counterexample
+        gives a word of L(self) - L(other).
+        """
+        return antichain.inclusion_counterexample(self,other,simulation) is None
+
+    def is_universal(self,simulation = None)->bool:
+        """Determines whether the NFA accepts every word over its alphabet.
+
+        'simulation' as in 'is_subset_of'. antichain.universality_counterexample gives a rejected word.
+        """
+        return antichain.universality_counterexample(self,simulation) is None
+
+    def is_equivalent(self,other,simulation = None)->bool:
+        """Determines whether the NFA and 'other' (NFA or DFA) accept the same language.
+
+        'simulation' as in 'is_subset_of'. antichain.distinguishing_word gives a word accepted
+        by only one of them.
+        """
+        return antichain.distinguishing_word(self,other,simulation) is None
+
     def clear(self):
         """ clear all info in NFA
         """
         self.__alphabet.clear()
         self.__Q.clear()
+        self.__Q_set.clear()
         self.__q0 = ''
         self.__deltas.clear()
         self.__finish_states.clear()
+
+    @classmethod
+    def _build(cls,states:List[str],alphabet:set,q0:str,finish_states:set,deltas:Dict[str,List[Tuple[str,set[str]]]]):
+        """Build an NFA from trusted parts, without the checks of the 'add_'/'set_' methods.
+
+        The new NFA takes ownership of the given containers.
+        """
+        n = cls()
+        n.__Q = states
+        n.__Q_set = set(states)
+        n.__alphabet = alphabet
+        n.__q0 = q0
+        n.__finish_states = finish_states
+        n.__deltas = deltas
+        return n
+
+    @classmethod
+    def from_edges(cls,states:List[str],alphabet,q0:str,finish_states:set,edges):
+        """Build an NFA from (src, letter, target) edges, checking everything once instead of per call.
+
+        Args:
+            states (List[str]): states, in order.
+            alphabet: letters, without epsilon.
+            q0 (str): start state.
+            finish_states (set): finish states.
+            edges: iterable of (src, letter, target), letter may be epsilon.
+
+        Raises:
+            AutomatonValidationException: listing all the problems found.
+        """
+        states = list(states)
+        state_set = set(states)
+        alphabet = set(alphabet)
+        finish_states = set(finish_states)
+        epsilon = cls().epsilon()
+        errors = _part_errors(states,state_set,alphabet,q0,finish_states)
+        if epsilon in alphabet:
+            errors.append(f'epsilon {epsilon!r} in the alphabet')
+        moves_of = dict()
+        letters = set()
+        targets = set()
+        for src,letter,target in edges:
+            moves = moves_of.get(src)
+            if moves is None:
+                moves = moves_of[src] = dict()
+            target_set = moves.get(letter)
+            if target_set is None:
+                moves[letter] = {target}
+                letters.add(letter)
+            else:
+                target_set.add(target)
+            targets.add(target)
+        unknown = moves_of.keys() - state_set
+        if len(unknown) != 0:
+            errors.append(f'nonexistent source states: {_listed(unknown)}')
+        unknown = letters - alphabet - {epsilon}
+        if len(unknown) != 0:
+            errors.append(f'nonexistent letters: {_listed(unknown)}')
+        unknown = targets - state_set
+        if len(unknown) != 0:
+            errors.append(f'nonexistent target states: {_listed(unknown)}')
+        if len(errors) != 0:
+            raise AutomatonValidationException(errors)
+        deltas = {src:list(moves.items()) for src,moves in moves_of.items()}
+        return cls._build(states,alphabet,q0,finish_states,deltas)
+
+    def to_bytes(self)->bytes:
+        """Serialize the NFA, see automata/serialization.py for the format.
+
+        Transitions are stored as (src, letter, target) triples, epsilon is a letter.
+        """
+        table = serialization.StringTable()
+        intern = table.intern
+        transitions = array('I')
+        append = transitions.append
+        for src,moves in self.__deltas.items():
+            src_id = intern(src)
+            for letter,targets in moves:
+                letter_id = intern(letter)
+                for target in sorted(targets):
+                    append(src_id)
+                    append(letter_id)
+                    append(intern(target))
+        arrays = [[intern(self.__q0)],[intern(q) for q in self.__Q],[intern(ch) for ch in sorted(self.__alphabet)],
+                  [intern(q) for q in sorted(self.__finish_states)],transitions]
+        return serialization.encode(serialization.KIND_NFA,table.strings,arrays)
+
+    @classmethod
+    def from_bytes(cls,data:bytes):
+        """Deserialize an NFA written by 'to_bytes'.
+
+        Raises:
+            AutomatonFormatException: if data is not a serialized NFA.
+        """
+        strings,arrays = serialization.decode(data,serialization.KIND_NFA)
+        if len(arrays) != 5 or len(arrays[0]) != 1 or len(arrays[4]) % 3 != 0:
+            raise AutomatonFormatException('bad NFA layout')
+        meta,states,alphabet,finish_states,transitions = arrays
+        strings_of = serialization.strings_of
+        targets_of = dict()
+        try:
+            get = strings.__getitem__
+            for key,target in zip(zip(map(get,transitions[0::3]),map(get,transitions[1::3])),map(get,transitions[2::3])):
+                targets = targets_of.get(key)
+                if targets is None:
+                    targets = targets_of[key] = set()
+                targets.add(target)
+        except IndexError:
+            raise AutomatonFormatException('string id out of range')
+        deltas = dict()
+        for (src,letter),targets in targets_of.items():
+            if src not in deltas:
+                deltas[src] = []
+            deltas[src].append((letter,targets))
+        return cls._build(strings_of(strings,states),set(strings_of(strings,alphabet)),strings_of(strings,meta)[0],
+                          set(strings_of(strings,finish_states)),deltas)
+
+    def save(self,file_name:str):
+        serialization.write_file(file_name,self.to_bytes())
+
+    @classmethod
+    def load(cls,file_name:str):
+        return cls.from_bytes(serialization.read_file(file_name))
+
+    @classmethod
+    def from_jflap(cls,source):
+        """Read a JFLAP '.jff' finite automaton, see automata/importers.py.
+
+        Args:
+            source: file name or binary file object.
+
+        Raises:
+            AutomatonFormatException: if the file is malformed or not an automaton of this class.
+        """
+        return importers.read_jflap(source).nfa(cls)
+
+    @classmethod
+    def from_dot(cls,source):
+        """Read an automaton from a Graphviz DOT digraph, e.g. one written by 'draw'.
+        """
+        return importers.read_dot(source).nfa(cls)
+
+    @classmethod
+    def from_hoa(cls,source):
+        """Read an automaton in the Hanoi Omega-Automata format, on finite words.
+        """
+        return importers.read_hoa(source).nfa(cls)
     
     def regex_to_NFA(self,regex:str,new_copy = False,to_dfa=False):
         """Construct NFA from regular expressions.
@@ -1,9 +1,12 @@
 import sys
 import os
 from typing import List,Dict,Tuple
-from graphviz import Digraph
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from automata.config import default_save_path
+from automata import profiling
+from automata import serialization
+from automata import render
+from automata.myException import AutomatonFormatException
 from container.multi_key_dict import multi_key_dict
 class PDA_Template:
     def __init__(self) -> None:
@@ -37,9 +40,11 @@ class PDA_Template:
             for symbol in next_symbols:
                 assert symbol in self.__pushdown_symbols
         param = (src_state,input_symbol,pre_symbol)
-        if param not in self.__transitions:
-            self.__transitions.set_value(param,set())
-        self.__transitions.get_value(param).add((target_state,next_symbols))
+        moves = self.__transitions.get(param)
+        if moves is None:
+            moves = set()
+            self.__transitions.set_value(param,moves)
+        moves.add((target_state,next_symbols))
 
     def add_transitions(self,transitions:Dict[str,List[Tuple[str,str,str,str]]]):
         for src,val in transitions.items():
@@ -83,53 +88,109 @@ class PDA_Template:
     
     def transitions(self):
         return self.__transitions.copy()
+
+    def _finish_state_list(self)->List[str]:
+        return []
+
+    def graph(self,name = 'PDA',around:str = None,depth:int = None):
+        """Build the Graphviz Digraph of the PDA, 'around' and 'depth' as in 'draw'.
+        """
+        edges = ((src,target,f'{input_symbol},{pre_symbol}/{next_symbols}')
+                 for (src,input_symbol,pre_symbol),moves in self.__transitions.items() for target,next_symbols in moves)
+        return render.automaton_graph(name,sorted(self.__states),self.__initial_state,set(self._finish_state_list()),edges,
+                                   label = render.lines_label,around = around,depth = depth)
+
+    def draw(self,name = 'PDA',path:str = default_save_path,view = True,format = 'pdf',around:str = None,depth:int = None,
+             sink = None):
+        """Draw picture for PDA, edges are labelled 'input,stack top/pushed symbols'.
+
+        Args: see DFA.draw.
+
+        Returns:
+            the written file name, or what 'sink' returns.
+        """
+        G = self.graph(name,around,depth)
+        return render.output(G,name,format,view,sink,path)
+
+    def to_bytes(self)->bytes:
+        """Serialize the PDA, see automata/serialization.py for the format.
+
+        Transitions are stored as (src, input symbol, stack symbol, target, pushed symbols) tuples.
+        """
+        table = serialization.StringTable()
+        intern = table.intern
+        transitions = []
+        for (src,input_symbol,pre_symbol),moves in sorted(self.__transitions.items()):
+            key = [intern(src),intern(input_symbol),intern(pre_symbol)]
+            for target,next_symbols in sorted(moves):
+                transitions.extend(key)
+                transitions.append(intern(target))
+                transitions.append(intern(next_symbols))
+        arrays = [[intern(self.__initial_state),intern(self.__initial_symbol)],
+                  [intern(q) for q in sorted(self.__states)],
+                  [intern(symbol) for symbol in sorted(self.__input_symbols)],
+                  [intern(symbol) for symbol in sorted(self.__pushdown_symbols)],
+                  [intern(q) for q in self._finish_state_list()],transitions]
+        return serialization.encode(self._serial_kind,table.strings,arrays)
+
+    @classmethod
+    def from_bytes(cls,data:bytes):
+        """Deserialize a PDA written by 'to_bytes' of the same class.
+
+        Raises:
+            AutomatonFormatException: if data is not a serialized PDA of this class.
+        """
+        strings,arrays = serialization.decode(data,cls._serial_kind)
+        if len(arrays) != 6 or len(arrays[0]) != 2 or len(arrays[5]) % 5 != 0:
+            raise AutomatonFormatException('bad PDA layout')
+        meta,states,input_symbols,pushdown_symbols,finish_states,transitions = arrays
+        strings_of = serialization.strings_of
+        moves_of = dict()
+        try:
+            get = strings.__getitem__
+            columns = [map(get,transitions[i::5]) for i in range(0,5)]
+            for src,input_symbol,pre_symbol,target,next_symbols in zip(*columns):
+                key = (src,input_symbol,pre_symbol)
+                moves = moves_of.get(key)
+                if moves is None:
+                    moves = moves_of[key] = set()
+                moves.add((target,next_symbols))
+        except IndexError:
+            raise AutomatonFormatException('string id out of range')
+        p = cls()
+        p.__initial_state,p.__initial_symbol = strings_of(strings,meta)
+        p.__states = set(strings_of(strings,states))
+        p.__input_symbols = set(strings_of(strings,input_symbols))
+        p.__pushdown_symbols = set(strings_of(strings,pushdown_symbols))
+        for key,moves in moves_of.items():
+            p.__transitions.set_value(key,moves)
+        if len(finish_states) != 0:
+            p.set_finish_states(set(strings_of(strings,finish_states)))
+        return p
+
+    def save(self,file_name:str):
+        serialization.write_file(file_name,self.to_bytes())
+
+    @classmethod
+    def load(cls,file_name:str):
+        return cls.from_bytes(serialization.read_file(file_name))
     
 
 class PDA_F(PDA_Template):
     """PDA accepted by final states.
     """
+    _serial_kind = serialization.KIND_PDA_F
+
     def __init__(self) -> None:
         super().__init__()
         self.__finish_states = set()
+
+    def _finish_state_list(self)->List[str]:
+        return sorted(self.__finish_states)
            
     def set_finish_states(self,finish_states:set[str]):
         self.__finish_states = finish_states.copy()
         
-    def draw(self,name = 'PDA',path:str = default_save_path):
-        G = Digraph(filename=(path+name))
-        for state in self._PDA_Template__states:
-            if state in self.__finish_states:
-                G.node(state,state,shape = 'doublecircle')
-            else:
-                G.node(state,state,shape = 'circle')
-            if state == self._PDA_Template__initial_state:
-                G.node('start','start',shape = 'none')
-                G.edge('start',state)
-        edges_list = []
-        items = self._PDA_Template__transitions.items()
-        for key,val in items:
-            src = key[0]
-            input_symbol = key[1]
-            pre_symbol = key[2]
-
-            for target,next_symbols in val:
-                ifFind = False
-                for i in range(0,len(edges_list)):
-                    if src == edges_list[i][0] and target == edges_list[i][1]:
-                        ifFind = True
-                        edges_list[i][2] += (f'\n{input_symbol},{pre_symbol}/{next_symbols}')
-                        break
-                if ifFind == False:
-                    edges_list.append([src,target,f'{input_symbol},{pre_symbol}/{next_symbols}'])          
-                
-        
-        # Add edges in the list to the directed graph
-        for src,target,label in edges_list:
-            G.edge(src,target,label)
-        G.attr(rankdir = 'LR')
-        G.view()
-        return
-
     def run(self,input_str:str,verbose = False)->bool:
         """Test membership of input_str, accepted by final states.
         """
@@ -145,9 +206,7 @@ class PDA_F(PDA_Template):
                 identifier_list = [(state,input_str[input_symbol_idx],stack_symbol),(state,epsilon,stack_symbol)]
             
             for identifier in identifier_list:
-                if identifier not in transitions:
-                    continue
-                for target,next_symbols in transitions.get_value(identifier):
+                for target,next_symbols in transitions.get(identifier,()):
                     tmp_st = st.copy()
                     if len(tmp_st) != 0:
                         tmp_st.pop()
@@ -158,7 +217,7 @@ class PDA_F(PDA_Template):
                         tmp_stack_symbol = tmp_st[len(tmp_st)-1]
                     else:
                         tmp_stack_symbol = epsilon
-                    result = recursive_simulate(target,input_symbol_idx+1,tmp_stack_symbol,tmp_st)
+                    result = simulate(target,input_symbol_idx+1,tmp_stack_symbol,tmp_st)
                     if result == True:
                         return True
             return False
@@ -166,7 +225,19 @@ class PDA_F(PDA_Template):
         initial_state = self._PDA_Template__initial_state
         assert len(initial_symbol) == 1  
         stack = [initial_symbol]
-        return recursive_simulate(initial_state,0,initial_symbol,stack)
+        # the recursion goes through 'simulate', which counts configurations only when profiling
+        simulate = recursive_simulate
+        if profiling.enabled == False:
+            return recursive_simulate(initial_state,0,initial_symbol,stack)
+        configurations = 0
+        def simulate(*args):
+            nonlocal configurations
+            configurations += 1
+            return recursive_simulate(*args)
+        record = profiling.begin('PDA_F.run',input_length = len(input_str),states = len(self._PDA_Template__states))
+        result = simulate(initial_state,0,initial_symbol,stack)
+        profiling.end(record,configurations = configurations,accepted = result)
+        return result
 
     def finish_states(self):
         return self.__finish_states.copy()
@@ -177,41 +248,11 @@ class PDA_F(PDA_Template):
 class PDA_E(PDA_Template):
     """PDA accepted by final states.
     """
+    _serial_kind = serialization.KIND_PDA_E
+
     def __init__(self) -> None:
         super().__init__()
         
-    def draw(self,name = 'PDA',path:str = default_save_path):
-        G = Digraph(filename=(path+name))
-        for state in self._PDA_Template__states:
-            G.node(state,state,shape = 'circle')
-            if state == self._PDA_Template__initial_state:
-                G.node('start','start',shape = 'none')
-                G.edge('start',state)
-        edges_list = []
-        items = self._PDA_Template__transitions.items()
-        for key,val in items:
-            src = key[0]
-            input_symbol = key[1]
-            pre_symbol = key[2]
-
-            for target,next_symbols in val:
-                ifFind = False
-                for i in range(0,len(edges_list)):
-                    if src == edges_list[i][0] and target == edges_list[i][1]:
-                        ifFind = True
-                        edges_list[i][2] += (f'\n{input_symbol},{pre_symbol}/{next_symbols}')
-                        break
-                if ifFind == False:
-                    edges_list.append([src,target,f'{input_symbol},{pre_symbol}/{next_symbols}'])          
-                
-        
-        # Add edges in the list to the directed graph
-        for src,target,label in edges_list:
-            G.edge(src,target,label)
-        G.attr(rankdir = 'LR')
-        G.view()
-        return
-
     def run(self,input_str:str,verbose = False)->bool:
         """Test membership of input_str, accepted by final states.
         """
@@ -227,9 +268,7 @@ class PDA_E(PDA_Template):
                 identifier_list = [(state,input_str[input_symbol_idx],stack_symbol),(state,epsilon,stack_symbol)]
             
             for identifier in identifier_list:
-                if identifier not in transitions:
-                    continue
-                for target,next_symbols in transitions.get_value(identifier):
+                for target,next_symbols in transitions.get(identifier,()):
                     tmp_st = st.copy()
                     if len(tmp_st) != 0:
                         tmp_st.pop()
@@ -240,7 +279,7 @@ class PDA_E(PDA_Template):
                         tmp_stack_symbol = tmp_st[len(tmp_st)-1]
                     else:
                         tmp_stack_symbol = epsilon
-                    result = recursive_simulate(target,input_symbol_idx+1,tmp_stack_symbol,tmp_st)
+                    result = simulate(target,input_symbol_idx+1,tmp_stack_symbol,tmp_st)
                     if result == True:
                         return True
             return False
@@ -248,7 +287,19 @@ class PDA_E(PDA_Template):
         initial_state = self._PDA_Template__initial_state
         assert len(initial_symbol) == 1  
         stack = [initial_symbol]
-        return recursive_simulate(initial_state,0,initial_symbol,stack)
+        # the recursion goes through 'simulate', which counts configurations only when profiling
+        simulate = recursive_simulate
+        if profiling.enabled == False:
+            return recursive_simulate(initial_state,0,initial_symbol,stack)
+        configurations = 0
+        def simulate(*args):
+            nonlocal configurations
+            configurations += 1
+            return recursive_simulate(*args)
+        record = profiling.begin('PDA_E.run',input_length = len(input_str),states = len(self._PDA_Template__states))
+        result = simulate(initial_state,0,initial_symbol,stack)
+        profiling.end(record,configurations = configurations,accepted = result)
+        return result
 
     def __str__(self) -> str:
         return self._PDA_Template__get_str()
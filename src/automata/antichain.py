@@ -0,0 +1,240 @@
+"""
+Antichain checks of language inclusion, universality and equivalence of DFAs/NFAs.
+
+L(a) ⊆ L(b) fails iff some pair (p, S) is reachable in the product of a with the subset
+construction of b where p accepts and no state of S does. The pairs are explored breadth
+first from the start states, so b is only determinized as far as needed, and a pair is
+dropped when a pair already seen subsumes it: (p', S') subsumes (p, S) when p' simulates p
+and each state of S' is simulated by a state of S, as a counterexample from (p, S) is then
+one from (p', S') too. Simulations also drop the states of S simulated by others of S, and
+the pairs (p, S) where p is simulated by a state of S (Abdulla, Chen, Holik, Mayr, Vojnar,
+"When simulation meets antichains", 2010). With 'simulation = False' only the identity is
+used, which is the antichain algorithm of De Wulf, Doyen, Henzinger and Raskin (2006).
+
+The maximal simulation is computed up front over all the reachable states of both
+automata, in quadratic time and memory, before any pair is explored. By default it is
+only used when both automata have at most SIMULATION_LIMIT reachable states.
+
+    antichain.inclusion_counterexample(a,b)  # a word of L(a) - L(b), None if L(a) ⊆ L(b)
+    antichain.universality_counterexample(a) # a word over the alphabet of a not in L(a)
+    antichain.distinguishing_word(a,b)       # a word in exactly one of L(a), L(b)
+"""
+from collections import deque
+from typing import Dict,FrozenSet,List,Optional
+
+# most reachable states per automaton for which the simulation is computed by default
+SIMULATION_LIMIT = 500
+
+class _Component:
+    """Epsilon free view of a DFA/NFA, states numbered from 'offset' on.
+
+    The successors of a state (letter -> states) are computed on first use: the moves of its
+    epsilon closure, followed by epsilon closures.
+    """
+    def __init__(self,automaton,offset:int) -> None:
+        states = automaton.Q()
+        self.index = {q:offset+i for i,q in enumerate(states)}
+        self.alphabet = set(automaton.alphabet())
+        self.__moves = dict()
+        self.__epsilon_moves = dict()
+        index = self.index
+        if hasattr(automaton,'epsilon'):
+            epsilon = automaton.epsilon()
+            self.alphabet.discard(epsilon)
+            for q,moves in automaton.deltas().items():
+                for letter,targets in moves:
+                    if letter == epsilon:
+                        self.__epsilon_moves.setdefault(index[q],set()).update(index[p] for p in targets)
+                    else:
+                        self.__moves.setdefault(index[q],dict()).setdefault(letter,set()).update(index[p] for p in targets)
+        else:
+            for q,moves in automaton.deltas().items():
+                for letter,p in moves:
+                    self.__moves.setdefault(index[q],dict()).setdefault(letter,set()).add(index[p])
+        self.initial = index[automaton.q0()]
+        self.__finish = {index[q] for q in automaton.finish_states()}
+        self.__closures = dict()
+        self.__successors = dict()
+
+    def closure(self,q:int)->FrozenSet[int]:
+        closure = self.__closures.get(q)
+        if closure is None:
+            closure = {q}
+            st = [q]
+            while len(st) != 0:
+                for p in self.__epsilon_moves.get(st.pop(),()):
+                    if p not in closure:
+                        closure.add(p)
+                        st.append(p)
+            closure = self.__closures[q] = frozenset(closure)
+        return closure
+
+    def accepting(self,q:int)->bool:
+        return not self.__finish.isdisjoint(self.closure(q))
+
+    def successors(self,q:int)->Dict[str,FrozenSet[int]]:
+        """Letter -> states reached from q, letters without moves left out.
+        """
+        successors = self.__successors.get(q)
+        if successors is None:
+            reached = dict()
+            for s in self.closure(q):
+                for letter,targets in self.__moves.get(s,{}).items():
+                    reached.setdefault(letter,set()).update(targets)
+            successors = dict()
+            for letter,targets in reached.items():
+                successors[letter] = frozenset().union(*(self.closure(p) for p in targets))
+            self.__successors[q] = successors
+        return successors
+
+    def reachable(self,limit:int = None)->Optional[List[int]]:
+        """Reachable states, None as soon as there are more than 'limit'.
+        """
+        seen = {self.initial}
+        st = [self.initial]
+        while len(st) != 0:
+            for targets in self.successors(st.pop()).values():
+                for p in targets:
+                    if p not in seen:
+                        seen.add(p)
+                        st.append(p)
+            if limit is not None and len(seen) > limit:
+                return None
+        return sorted(seen)
+
+class _Universal:
+    """One accepting state with a loop on every letter, accepting all the words over 'alphabet'.
+    """
+    def __init__(self,alphabet:set,offset:int) -> None:
+        self.initial = offset
+        self.alphabet = set(alphabet)
+        self.__successors = {letter:frozenset([offset]) for letter in alphabet}
+
+    def accepting(self,q:int)->bool:
+        return True
+
+    def successors(self,q:int)->Dict[str,FrozenSet[int]]:
+        return self.__successors
+
+    def reachable(self,limit:int = None)->List[int]:
+        return [self.initial]
+
+def _simulation(components:List)->Dict[int,set]:
+    """Maximal simulation over the reachable states of the components: state -> states simulating it.
+
+    r simulates q when r accepts if q does and every move q -a-> q' is matched by a move
+    r -a-> r' where r' simulates q'; the relation is refined from the first condition until stable.
+    """
+    owner = {q:c for c in components for q in c.reachable()}
+    successors = {q:c.successors(q) for q,c in owner.items()}
+    accepting = {q:c.accepting(q) for q,c in owner.items()}
+    up = dict()
+    for q in owner:
+        letters = successors[q].keys()
+        up[q] = {r for r in owner if (accepting[r] or not accepting[q]) and letters <= successors[r].keys()}
+    changed = True
+    while changed:
+        changed = False
+        for q in owner:
+            moves = successors[q]
+            for r in list(up[q]):
+                if r == q:
+                    continue
+                matches = successors[r]
+                for letter,targets in moves.items():
+                    if not all(not up[p].isdisjoint(matches[letter]) for p in targets):
+                        up[q].discard(r)
+                        changed = True
+                        break
+    return up
+
+def _inclusion_counterexample(a,b,simulation:Optional[bool])->Optional[str]:
+    """A word accepted from the start state of component a and not from that of component b.
+    """
+    if simulation is None:
+        simulation = all(c.reachable(SIMULATION_LIMIT) is not None for c in (a,b))
+    up = _simulation([a,b]) if simulation else None
+
+    def simulating(q:int):
+        return up[q] if up is not None else (q,)
+
+    def reduce(S:FrozenSet[int])->FrozenSet[int]:
+        # keep one state of each class of S, among the states not simulated by others
+        if up is None or len(S) < 2:
+            return S
+        return frozenset(s for s in S
+                         if not any(t != s and t in up[s] and (s not in up[t] or t < s) for t in S))
+
+    def subsumed(p:int,S:FrozenSet[int])->bool:
+        if up is not None and not up[p].isdisjoint(S):
+            return True
+        for q in simulating(p):
+            for seen_set in seen.get(q,()):
+                if up is None:
+                    if seen_set <= S:
+                        return True
+                elif all(not up[s].isdisjoint(S) for s in seen_set):
+                    return True
+        return False
+
+    def word(node:int)->str:
+        letters = []
+        while pairs[node][2] is not None:
+            p,S,parent,letter = pairs[node]
+            letters.append(letter)
+            node = parent
+        return ''.join(reversed(letters))
+
+    def fails(p:int,S:FrozenSet[int])->bool:
+        return a.accepting(p) and not any(b.accepting(s) for s in S)
+
+    start = (a.initial,reduce(frozenset([b.initial])))
+    pairs = [(start[0],start[1],None,None)] # p, S, parent pair, letter from the parent
+    if fails(*start):
+        return ''
+    seen = {start[0]:[start[1]]}
+    queue = deque([0])
+    while len(queue) != 0:
+        node = queue.popleft()
+        p,S = pairs[node][0],pairs[node][1]
+        moves = a.successors(p)
+        for letter in sorted(moves):
+            S2 = reduce(frozenset().union(*(b.successors(s).get(letter,()) for s in S)))
+            for p2 in sorted(moves[letter]):
+                pairs.append((p2,S2,node,letter))
+                if fails(p2,S2):
+                    return word(len(pairs)-1)
+                if subsumed(p2,S2):
+                    pairs.pop()
+                    continue
+                seen.setdefault(p2,[]).append(S2)
+                queue.append(len(pairs)-1)
+    return None
+
+def inclusion_counterexample(a,b,simulation:bool = None)->Optional[str]:
+    """A word of L(a) - L(b), None if L(a) ⊆ L(b).
+
+    Args:
+        a, b (DFA or NFA): automata, a word with a letter outside the alphabet of b is not in L(b).
+        simulation (bool, optional): prune with the maximal simulation. It often cuts the explored
+            pairs by orders of magnitude, but costs quadratic time and memory in the reachable
+            states of a and b before the first pair, even when a counterexample is one letter away.
+            Defaults to using it when both have at most SIMULATION_LIMIT reachable states.
+    """
+    x = _Component(a,0)
+    y = _Component(b,len(x.index))
+    return _inclusion_counterexample(x,y,simulation)
+
+def universality_counterexample(a,simulation:bool = None)->Optional[str]:
+    """A word over the alphabet of a (epsilon excluded) not in L(a), None if there is none.
+    """
+    y = _Component(a,1)
+    return _inclusion_counterexample(_Universal(y.alphabet,0),y,simulation)
+
+def distinguishing_word(a,b,simulation:bool = None)->Optional[str]:
+    """A word accepted by exactly one of a and b, None if they are equivalent.
+    """
+    word = inclusion_counterexample(a,b,simulation)
+    if word is None:
+        word = inclusion_counterexample(b,a,simulation)
+    return word
@@ -1,5 +1,6 @@
 import os
-default_save_path = os.path.dirname(
+default_save_path = os.path.join(
     os.path.dirname(
         os.path.dirname(
-            __file__)))+'\\picture\\'
\ No newline at end of file
+            os.path.dirname(
+                os.path.abspath(__file__)))),'picture')
@@ -0,0 +1,423 @@
+"""
+Streaming readers of automata written by other tools: JFLAP (.jff), Graphviz DOT and
+Hanoi Omega-Automata (HOA).
+
+The readers parse incrementally ('iterparse' for JFLAP, line at a time for DOT and HOA)
+into an 'AutomatonBuilder', which groups the transitions as they arrive and builds the
+DFA/NFA in one step with '_build', without the per-call checks of 'add_delta'.
+Use them through 'DFA.from_jflap', 'NFA.from_dot', ... .
+
+Supported subsets:
+    JFLAP: finite automata ('<type>fa</type>'), an empty '<read/>' is an epsilon move.
+    DOT:   states are nodes, 'doublecircle' (or peripheries=2) nodes are finish states,
+           an edge without label marks the start state (its source, e.g. a 'shape=none'
+           node, is not a state), edge labels are comma separated letters or ranges ('a-z'),
+           a backslash escapes a ',', '-' or '\\' letter, 'ε' is epsilon.
+           This is what 'DFA.draw'/'NFA.draw' write.
+    HOA:   state-based acceptance read on finite words (a state in an acceptance set is
+           a finish state), every atomic proposition is a one-character letter and exactly
+           one holds at each step, labels are disjunctions of conjunctions of literals.
+"""
+import re
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from typing import Dict,List,Set,Iterator
+from automata.myException import AutomatonFormatException
+
+epsilon = 'ε'
+
+class AutomatonBuilder:
+    """Collect states and transitions of an automaton being read.
+    """
+    def __init__(self) -> None:
+        self.states = []
+        self.__state_set = set()
+        self.initial_states = []
+        self.finish_states = set()
+        self.alphabet = set()
+        self.moves = dict() # src -> letter -> set of targets
+
+    def add_state(self,state:str):
+        if state not in self.__state_set:
+            self.__state_set.add(state)
+            self.states.append(state)
+
+    def has_state(self,state:str)->bool:
+        return state in self.__state_set
+
+    def add_initial(self,state:str):
+        self.add_state(state)
+        if state not in self.initial_states:
+            self.initial_states.append(state)
+
+    def add_finish(self,state:str):
+        self.add_state(state)
+        self.finish_states.add(state)
+
+    def add_letter(self,letter:str):
+        if len(letter) != 1:
+            raise AutomatonFormatException(f'letter {letter!r} is not one character')
+        self.alphabet.add(letter)
+
+    def add_delta(self,src:str,letter:str,target:str):
+        self.add_state(src)
+        self.add_state(target)
+        if letter != epsilon:
+            self.add_letter(letter)
+        moves = self.moves.get(src)
+        if moves is None:
+            moves = self.moves[src] = dict()
+        targets = moves.get(letter)
+        if targets is None:
+            moves[letter] = {target}
+        else:
+            targets.add(target)
+
+    def dfa(self,cls):
+        """Build a DFA of class 'cls'.
+
+        Raises:
+            AutomatonFormatException: if the automaton is not deterministic.
+        """
+        if len(self.initial_states) != 1:
+            raise AutomatonFormatException(f'a DFA needs one start state, found {len(self.initial_states)}')
+        deltas = dict()
+        for src,moves in self.moves.items():
+            if epsilon in moves:
+                raise AutomatonFormatException(f'epsilon move from {src!r} in a DFA')
+            for letter,targets in moves.items():
+                if len(targets) != 1:
+                    raise AutomatonFormatException(f'nondeterministic move from {src!r} on {letter!r}')
+            deltas[src] = [(letter,next(iter(targets))) for letter,targets in moves.items()]
+        return cls._build(self.states,self.alphabet,self.initial_states[0],self.finish_states,deltas)
+
+    def nfa(self,cls):
+        """Build an NFA of class 'cls', several start states get a new start state with epsilon moves.
+        """
+        if len(self.initial_states) == 0:
+            raise AutomatonFormatException('no start state')
+        q0 = self.initial_states[0]
+        if len(self.initial_states) > 1:
+            q0 = 'start'
+            while self.has_state(q0):
+                q0 += "'"
+            self.add_state(q0)
+            self.moves[q0] = {epsilon:set(self.initial_states)}
+        deltas = {src:list(moves.items()) for src,moves in self.moves.items()}
+        return cls._build(self.states,self.alphabet,q0,self.finish_states,deltas)
+
+@contextmanager
+def _open(source,mode:str = 'r'):
+    """Open 'source' if it is a file name, else use it as a file object.
+    """
+    if isinstance(source,str):
+        with open(source,mode,encoding = 'utf-8' if 'b' not in mode else None) as f:
+            yield f
+    else:
+        yield source
+
+def read_jflap(source)->AutomatonBuilder:
+    """Read a JFLAP finite automaton.
+
+    Args:
+        source: file name or binary file object.
+    """
+    builder = AutomatonBuilder()
+    names = dict() # JFLAP state id -> state name
+    with _open(source,'rb') as f:
+        try:
+            parents = [] # open elements, a handled state or transition is removed from its parent
+            for event,elem in ET.iterparse(f,events = ('start','end')):
+                if event == 'start':
+                    parents.append(elem)
+                    continue
+                parents.pop()
+                if elem.tag == 'type':
+                    if (elem.text or '').strip() != 'fa':
+                        raise AutomatonFormatException(f'JFLAP type {elem.text!r} is not a finite automaton')
+                elif elem.tag == 'state':
+                    state_id = elem.get('id')
+                    name = elem.get('name',state_id)
+                    if state_id is None or builder.has_state(name):
+                        raise AutomatonFormatException(f'bad or duplicate JFLAP state {name!r}')
+                    names[state_id] = name
+                    builder.add_state(name)
+                    if elem.find('initial') is not None:
+                        builder.add_initial(name)
+                    if elem.find('final') is not None:
+                        builder.add_finish(name)
+                    elem.clear()
+                    if len(parents) != 0:
+                        parents[-1].remove(elem)
+                elif elem.tag == 'transition':
+                    src = names.get(elem.findtext('from','').strip())
+                    target = names.get(elem.findtext('to','').strip())
+                    if src is None or target is None:
+                        raise AutomatonFormatException('JFLAP transition between unknown states')
+                    letter = elem.findtext('read') or epsilon
+                    builder.add_delta(src,letter,target)
+                    elem.clear()
+                    if len(parents) != 0:
+                        parents[-1].remove(elem)
+        except ET.ParseError as e:
+            raise AutomatonFormatException(f'JFLAP: {e}')
+    return builder
+
+_dot_token = re.compile(r'\s*(?:(//|#).*|/\*|"((?:[^"\\]|\\.)*)"|(->|--|[\[\]{}=,;])|([^\s"\[\]{}=,;-]+|-?\d*\.?\d+))')
+
+def _dot_tokens(lines)->Iterator[str]:
+    """Tokenize DOT line at a time, IDs are yielded as ('"', text), punctuation as str.
+    """
+    in_comment = False
+    for line in lines:
+        i = 0
+        while i < len(line):
+            if in_comment:
+                end = line.find('*/',i)
+                if end < 0:
+                    break
+                i = end + 2
+                in_comment = False
+                continue
+            m = _dot_token.match(line,i)
+            if m is None:
+                if line[i:].strip() == '':
+                    break
+                raise AutomatonFormatException(f'DOT: unexpected {line[i:].strip()[:20]!r}')
+            i = m.end()
+            if m.group(1) is not None:
+                break
+            if m.group(0).strip() == '/*':
+                in_comment = True
+            elif m.group(2) is not None:
+                yield ('"',m.group(2).replace('\\"','"'))
+            elif m.group(3) is not None:
+                yield m.group(3)
+            else:
+                yield ('"',m.group(4))
+
+def _is_id(token)->bool:
+    return isinstance(token,tuple)
+
+def _label_letters(label:str)->List[str]:
+    """Letters of a comma separated edge label, as written by render.letters_label:
+    'x-y' is a range, a backslash escapes the next character.
+    """
+    letters = []
+    part = [] # (character, escaped)
+    i = 0
+    while i <= len(label):
+        if i == len(label) or label[i] == ',':
+            while len(part) != 0 and not part[0][1] and part[0][0].isspace():
+                part.pop(0)
+            while len(part) != 0 and not part[-1][1] and part[-1][0].isspace():
+                part.pop()
+            if len(part) == 3 and part[1] == ('-',False):
+                letters.extend(chr(code) for code in range(ord(part[0][0]),ord(part[2][0])+1))
+            else:
+                letters.append(''.join(ch for ch,escaped in part) or epsilon)
+            part = []
+        elif label[i] == '\\' and i + 1 < len(label):
+            i += 1
+            part.append((label[i],True))
+        else:
+            part.append((label[i],False))
+        i += 1
+    return letters
+
+def read_dot(source)->AutomatonBuilder:
+    """Read an automaton drawn as a DOT digraph.
+
+    Args:
+        source: file name or text file object.
+    """
+    builder = AutomatonBuilder()
+    markers = set() # nodes that are not states, e.g. the source of the start arrow
+    default_shape = 'circle'
+    with _open(source) as f:
+        tokens = _dot_tokens(f)
+        lookahead = []
+        def peek():
+            if len(lookahead) == 0:
+                lookahead.append(next(tokens,None))
+            return lookahead[0]
+        def take():
+            token = peek()
+            lookahead.pop()
+            return token
+        def attributes()->Dict[str,str]:
+            attrs = dict()
+            while peek() == '[':
+                take()
+                while peek() != ']':
+                    key = take()
+                    if not _is_id(key):
+                        raise AutomatonFormatException(f'DOT: bad attribute {key!r}')
+                    value = ('"','true')
+                    if peek() == '=':
+                        take()
+                        value = take()
+                    attrs[key[1]] = value[1]
+                    if peek() in (',',';'):
+                        take()
+                take()
+            return attrs
+        def node(name:str,attrs:Dict[str,str]):
+            shape = attrs.get('shape',default_shape)
+            if shape in ('none','point','plaintext','plain'):
+                markers.add(name)
+                return
+            builder.add_state(name)
+            if shape == 'doublecircle' or attrs.get('peripheries') == '2':
+                builder.add_finish(name)
+
+        depth = 0
+        while True:
+            token = take()
+            if token is None:
+                break
+            if token in (';',',') or (_is_id(token) and token[1] in ('digraph','strict','subgraph')):
+                if _is_id(token) and _is_id(peek()):
+                    take() # graph or subgraph name
+                continue
+            if token == '{':
+                depth += 1
+            elif token == '}':
+                depth -= 1
+            elif _is_id(token) and token[1] in ('graph','node','edge') and peek() == '[':
+                attrs = attributes()
+                if token[1] == 'node':
+                    default_shape = attrs.get('shape',default_shape)
+            elif _is_id(token):
+                if peek() == '=':
+                    take()
+                    take() # graph attribute
+                    continue
+                path = [token[1]]
+                while peek() in ('->','--'):
+                    take()
+                    target = take()
+                    if not _is_id(target):
+                        raise AutomatonFormatException(f'DOT: bad edge target {target!r}')
+                    path.append(target[1])
+                attrs = attributes()
+                if len(path) == 1:
+                    node(path[0],attrs)
+                    continue
+                label = attrs.get('label')
+                for src,target in zip(path,path[1:]):
+                    if label is None:
+                        # the start arrow
+                        builder.add_initial(target)
+                        if not builder.has_state(src):
+                            markers.add(src)
+                        continue
+                    for src_state in (src,target):
+                        if src_state in markers:
+                            raise AutomatonFormatException(f'DOT: labelled edge at non-state {src_state!r}')
+                    for letter in _label_letters(label):
+                        builder.add_delta(src,letter,target)
+            else:
+                raise AutomatonFormatException(f'DOT: unexpected {token!r}')
+        if depth != 0:
+            raise AutomatonFormatException('DOT: unbalanced braces')
+    return builder
+
+_hoa_token = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|(\[[^\]]*\])|(\{[^}]*\})|([^\s"\[{]+))')
+
+def _hoa_fields(line:str)->List[str]:
+    fields = []
+    i = 0
+    line = line.strip()
+    while i < len(line):
+        m = _hoa_token.match(line,i)
+        if m is None:
+            raise AutomatonFormatException(f'HOA: cannot read {line!r}')
+        fields.append(m.group(0).strip())
+        i = m.end()
+    return fields
+
+def _hoa_label(label:str,aps:List[str])->Set[str]:
+    """Letters of a label, 'aps' are the one-character atomic propositions.
+    """
+    letters = set()
+    for conjunct in label.split('|'):
+        literals = [literal.strip() for literal in conjunct.split('&')]
+        allowed = set(aps)
+        for literal in literals:
+            if literal == 't':
+                continue
+            if literal == 'f':
+                allowed = set()
+                continue
+            negated = literal.startswith('!')
+            index = literal[1:].strip() if negated else literal
+            if not index.isdigit() or int(index) >= len(aps):
+                raise AutomatonFormatException(f'HOA: unsupported label [{label}]')
+            if negated:
+                allowed.discard(aps[int(index)])
+            else:
+                allowed &= {aps[int(index)]}
+        letters |= allowed
+    return letters
+
+def read_hoa(source)->AutomatonBuilder:
+    """Read a HOA automaton, states are named by their numbers.
+
+    Args:
+        source: file name or text file object.
+    """
+    builder = AutomatonBuilder()
+    aps = []
+    acceptance_all = False
+    state = None
+    in_body = False
+    with _open(source) as f:
+        for line_no,line in enumerate(f,1):
+            fields = _hoa_fields(line)
+            if len(fields) == 0:
+                continue
+            if not in_body:
+                name = fields[0]
+                if name == '--BODY--':
+                    in_body = True
+                elif name == 'HOA:':
+                    if fields[1:2] != ['v1']:
+                        raise AutomatonFormatException(f'HOA: unsupported version {fields[1:2]}')
+                elif name == 'Start:':
+                    if '&' in ''.join(fields[1:]):
+                        raise AutomatonFormatException(f'HOA: line {line_no}: universal branching is not supported')
+                    builder.add_initial(fields[1])
+                elif name == 'AP:':
+                    aps = [ap.strip('"') for ap in fields[2:]]
+                    if len(aps) != int(fields[1]):
+                        raise AutomatonFormatException(f'HOA: line {line_no}: AP count')
+                    for ap in aps:
+                        builder.add_letter(ap)
+                elif name == 'Acceptance:':
+                    acceptance_all = fields[1:] == ['0','t']
+                elif name == 'States:':
+                    for i in range(0,int(fields[1])):
+                        builder.add_state(str(i))
+                continue
+            if fields[0] == '--END--':
+                break
+            if fields[0] == 'State:':
+                # State: [label] number ["name"] [{sets}]
+                rest = fields[1:]
+                if len(rest) != 0 and rest[0].startswith('['):
+                    raise AutomatonFormatException(f'HOA: line {line_no}: state labels are not supported')
+                state = rest[0]
+                builder.add_state(state)
+                if acceptance_all or any(field.startswith('{') for field in rest[1:]):
+                    builder.add_finish(state)
+                continue
+            if state is None or not fields[0].startswith('[') or len(fields) < 2:
+                raise AutomatonFormatException(f'HOA: line {line_no}: expected a labelled edge')
+            if any(field.startswith('{') for field in fields[2:]):
+                raise AutomatonFormatException(f'HOA: line {line_no}: transition-based acceptance is not supported')
+            if '&' in fields[1]:
+                raise AutomatonFormatException(f'HOA: line {line_no}: universal branching is not supported')
+            for letter in sorted(_hoa_label(fields[0][1:-1],aps)):
+                builder.add_delta(state,letter,fields[1])
+    return builder
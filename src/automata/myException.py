@@ -59,4 +59,35 @@ class LL_1_ConflictingEntry(Exception):
     def __str__(self) -> str:
         return repr(f'Conflicting entries appeared at M[{self.variable},{self.terminal}] when constructing LL1 analysis table M:\n'\
                     f'{self.production1}\n'\
-                    f'{self.production2}')
\ No newline at end of file
+                    f'{self.production2}')
+
+# LALR1
+class LALR_1_ConflictingEntry(Exception):
+    def __init__(self,state,symbol,entry1,entry2) -> None:
+        self.state = state
+        self.symbol = symbol
+        self.entry1 = entry1
+        self.entry2 = entry2
+
+    def __str__(self) -> str:
+        return repr(f'Conflicting entries appeared at ACTION[{self.state},{self.symbol}] when constructing LALR1 analysis table:\n'\
+                    f'{self.entry1}\n'\
+                    f'{self.entry2}')
+
+class AutomatonFormatException(Exception):
+    '''
+    Malformed serialized automaton
+    '''
+    def __init__(self,reason):
+        self.reason = reason
+    def __str__(self):
+        return repr(f'malformed serialized automaton: {self.reason}')
+
+class AutomatonValidationException(Exception):
+    '''
+    Invalid parts given to a bulk constructor, all problems found at once
+    '''
+    def __init__(self,errors):
+        self.errors = errors
+    def __str__(self):
+        return repr(f'{len(self.errors)} problem(s) in automaton:\n' + '\n'.join(self.errors))
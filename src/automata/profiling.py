@@ -0,0 +1,106 @@
+"""
+Opt-in instrumentation of the automata operations.
+
+Instrumented operations check the module flag 'enabled' once per call. When it is
+set, each call produces one record (a dict) with its wall time, its sizes before and
+after and operation specific counters, and every registered sink is called with it:
+
+    with profiling.profile(profiling.JSONLinesSink('ops.jsonl')) as records:
+        nfa.to_DFA().minimize()
+
+Records of NFA.to_DFA have 'subset_states', DFA.minimize 'refinement_rounds',
+PDA_F.run/PDA_E.run 'configurations'.
+"""
+import json
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable,List
+
+enabled = False
+_sinks = []
+
+logger = logging.getLogger(__name__)
+
+def add_sink(sink:Callable[[dict],None]):
+    """Register a sink, a callable getting each record.
+    """
+    _sinks.append(sink)
+
+def remove_sink(sink:Callable[[dict],None]):
+    _sinks.remove(sink)
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+@contextmanager
+def profile(*sinks:Callable[[dict],None]):
+    """Enable the instrumentation in a block, with extra sinks.
+
+    Yields:
+        List[dict]: the records of the block.
+    """
+    global enabled
+    records = []
+    added = list(sinks) + [records.append]
+    previous = enabled
+    _sinks.extend(added)
+    enabled = True
+    try:
+        yield records
+    finally:
+        enabled = previous
+        for sink in added:
+            _sinks.remove(sink)
+
+class LoggingSink:
+    """Log each record as JSON.
+    """
+    def __init__(self,logger:logging.Logger = logger,level:int = logging.INFO) -> None:
+        self.logger = logger
+        self.level = level
+
+    def __call__(self,record:dict):
+        self.logger.log(self.level,'%s',json.dumps(record))
+
+class JSONLinesSink:
+    """Append each record as one JSON line to a file (a path or a text file object).
+    """
+    def __init__(self,file) -> None:
+        self.file = file
+
+    def __call__(self,record:dict):
+        line = json.dumps(record) + '\n'
+        if isinstance(self.file,str):
+            with open(self.file,'a') as f:
+                f.write(line)
+        else:
+            self.file.write(line)
+
+def begin(operation:str,**fields)->dict:
+    """Start the record of an operation, call it only when 'enabled' is set.
+    """
+    record = {'operation':operation}
+    record.update(fields)
+    record['_start'] = time.perf_counter()
+    return record
+
+def end(record:dict,**fields):
+    """Finish a record started by 'begin' and send it to the sinks.
+    """
+    record['seconds'] = time.perf_counter() - record.pop('_start')
+    record.update(fields)
+    for sink in list(_sinks):
+        sink(record)
+
+def dfa_sizes(deltas:dict,states_num:int,prefix:str)->dict:
+    return {f'states_{prefix}':states_num,f'transitions_{prefix}':sum(len(moves) for moves in deltas.values())}
+
+def nfa_sizes(deltas:dict,states_num:int,prefix:str)->dict:
+    return {f'states_{prefix}':states_num,
+            f'transitions_{prefix}':sum(len(targets) for moves in deltas.values() for letter,targets in moves)}
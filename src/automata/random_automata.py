@@ -0,0 +1,229 @@
+"""
+Seeded random generators of automata and regexes, for differential testing and benchmarks.
+
+Every generator takes 'seed', an int (or None for a random one), and builds its
+instance with the public construction methods of DFA/NFA/PDA.
+"""
+import os
+import sys
+import math
+import random
+from functools import lru_cache
+from typing import List,Iterable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from automata.DFA import DFA
+from automata.NFA import NFA
+from automata.PDA import PDA_F,PDA_E
+
+exact_dfa_limit = 256
+regex_special_characters = set('()[]|*+.\\-')
+
+def _random(seed)->random.Random:
+    return seed if isinstance(seed,random.Random) else random.Random(seed)
+
+@lru_cache(maxsize = 8)
+def _accessible_dfa_table(n:int,k:int)->List[List[int]]:
+    """table[t][m]: number of ways to choose the targets of transitions t..k*n-1, with m states already found.
+
+    Transitions are taken in BFS order (state t//k, letter t%k), a target is either one of
+    the m found states or the next new state. State t//k must already be found.
+    """
+    table = [[0]*(n+2) for _ in range(0,k*n+1)]
+    table[k*n][n] = 1
+    for t in range(k*n-1,-1,-1):
+        s = t // k
+        for m in range(s+1,n+1):
+            table[t][m] = m*table[t+1][m] + table[t+1][m+1]
+    return table
+
+def count_accessible_dfas(n:int,k:int)->int:
+    """Number of accessible complete DFAs with n states over k letters, up to isomorphism, ignoring finish states.
+    """
+    assert n >= 1 and k >= 1
+    return _accessible_dfa_table(n,k)[0][1]
+
+def _accessible_ratio(k:int)->float:
+    """Expected ratio of accessible states in a large uniform random DFA over k letters: v = 1 - e^(-kv).
+    """
+    v = 1.0
+    for _ in range(0,100):
+        v = 1 - math.exp(-k*v)
+    return v
+
+def _exact_accessible_transitions(n:int,k:int,rand:random.Random)->List[List[int]]:
+    """Uniform accessible DFA transitions by the recursive method on BFS ordered transitions.
+    """
+    table = _accessible_dfa_table(n,k)
+    targets = [[0]*k for _ in range(0,n)]
+    m = 1
+    for t in range(0,k*n):
+        if rand.randrange(table[t][m]) < m*table[t+1][m]:
+            targets[t//k][t%k] = rand.randrange(m)
+        else:
+            targets[t//k][t%k] = m
+            m += 1
+    return targets
+
+def _rejection_accessible_transitions(n:int,k:int,rand:random.Random)->List[List[int]]:
+    """Uniform accessible DFA transitions by rejection (Carayol-Nicaud): the accessible part of a
+    uniform random complete DFA, conditioned on its size, is uniform. The size of the random DFA is
+    chosen so that its accessible part has n states on average.
+    """
+    size = max(n,round(n / _accessible_ratio(k)))
+    while True:
+        transitions = [[rand.randrange(size) for _ in range(0,k)] for _ in range(0,size)]
+        # BFS numbering of the accessible states
+        number = {0:0}
+        order = [0]
+        i = 0
+        while i < len(order) and len(order) <= n:
+            for p in transitions[order[i]]:
+                if p not in number:
+                    number[p] = len(order)
+                    order.append(p)
+            i += 1
+        if len(order) == n:
+            return [[number[p] for p in transitions[q]] for q in order]
+
+def random_dfa(n:int,alphabet:Iterable[str] = 'ab',final_probability:float = 0.5,seed = None)->DFA:
+    """Uniform random accessible complete DFA with n states.
+
+    The transition structure is uniform among accessible DFAs up to isomorphism: exact
+    counting for n <= exact_dfa_limit, rejection sampling above. Each state is a finish state
+    with probability 'final_probability', 0.5 makes the whole DFA uniform.
+    States are 'q0'...'q{n-1}' in BFS order, 'q0' is the start state.
+    """
+    rand = _random(seed)
+    alphabet = sorted(set(alphabet))
+    k = len(alphabet)
+    if n <= exact_dfa_limit:
+        targets = _exact_accessible_transitions(n,k,rand)
+    else:
+        targets = _rejection_accessible_transitions(n,k,rand)
+    states = [f'q{i}' for i in range(0,n)]
+    d = DFA()
+    d.set_alphabet(set(alphabet))
+    d.add_states(states)
+    d.set_q0(states[0])
+    d.set_finish_states({q for q in states if rand.random() < final_probability})
+    d.set_deltas({states[i]:[(alphabet[j],states[targets[i][j]]) for j in range(0,k)] for i in range(0,n)})
+    return d
+
+def _bernoulli_indices(n:int,p:float,rand:random.Random)->List[int]:
+    """Indices in [0, n) each chosen with probability p, by geometric skips.
+    """
+    if p <= 0:
+        return []
+    if p >= 1:
+        return list(range(0,n))
+    indices = []
+    log_q = math.log(1 - p)
+    i = -1
+    while True:
+        i += 1 + int(math.log(1 - rand.random()) / log_q)
+        if i >= n:
+            return indices
+        indices.append(i)
+
+def random_nfa(n:int,alphabet:Iterable[str] = 'ab',density:float = 1.5,epsilon_density:float = 0.1,
+               final_probability:float = 0.3,seed = None)->NFA:
+    """Random NFA with n states.
+
+    Args:
+        density (float): expected number of targets of each (state, letter).
+        epsilon_density (float): expected number of epsilon transitions leaving each state.
+        final_probability (float): probability of each state to be a finish state.
+    """
+    rand = _random(seed)
+    alphabet = sorted(set(alphabet))
+    states = [f'q{i}' for i in range(0,n)]
+    a = NFA()
+    a.set_alphabet(set(alphabet))
+    a.add_states(states)
+    a.set_q0(states[0])
+    a.set_finish_states({q for q in states if rand.random() < final_probability})
+    deltas = dict()
+    for i in range(0,n):
+        moves = []
+        for letter in alphabet:
+            targets = {states[j] for j in _bernoulli_indices(n,density/n,rand)}
+            if len(targets) != 0:
+                moves.append((letter,targets))
+        targets = {states[j] for j in _bernoulli_indices(n,epsilon_density/n,rand) if j != i}
+        if len(targets) != 0:
+            moves.append((a.epsilon(),targets))
+        if len(moves) != 0:
+            deltas[states[i]] = moves
+    a.set_deltas(deltas)
+    return a
+
+def random_regex(size:int,alphabet:Iterable[str] = 'ab',closure_probability:float = 0.2,
+                 union_probability:float = 0.5,set_probability:float = 0.1,seed = None)->str:
+    """Random regex of the 'NFA.regex_to_NFA' dialect with 'size' letters or character sets.
+
+    Operators are concatenation, '|', '*', '+' and '[...]', special characters are escaped.
+    """
+    rand = _random(seed)
+    alphabet = sorted(set(alphabet))
+    set_letters = [ch for ch in alphabet if ch.isalnum()]
+    def letter():
+        if len(set_letters) > 1 and rand.random() < set_probability:
+            return '[' + ''.join(rand.sample(set_letters,rand.randint(1,len(set_letters)))) + ']'
+        ch = rand.choice(alphabet)
+        return '\\' + ch if ch in regex_special_characters else ch
+    def generate(size:int)->str:
+        if size == 1:
+            regex = letter()
+        else:
+            left = rand.randint(1,size-1)
+            if rand.random() < union_probability:
+                regex = f'({generate(left)}|{generate(size-left)})'
+            else:
+                regex = f'({generate(left)}{generate(size-left)})'
+        if rand.random() < closure_probability:
+            regex = f'({regex}){rand.choice("*+")}'
+        return regex
+    assert size >= 1
+    return generate(size)
+
+def random_pda(n:int,input_symbols:Iterable[str] = 'ab',pushdown_symbols:Iterable[str] = 'XY',
+               density:float = 1.0,epsilon_density:float = 0.0,max_push:int = 2,
+               accept:str = 'final',final_probability:float = 0.3,seed = None):
+    """Random PDA with n states, 'Z' is the initial stack symbol.
+
+    Args:
+        density (float): expected number of transitions of each (state, input symbol, stack symbol).
+        epsilon_density (float): same for epsilon moves. The reference 'run' of PDA_F/PDA_E does not
+            bound epsilon moves, keep it 0 when the PDA is run.
+        max_push (int): maximum number of symbols a transition pushes.
+        accept (str): 'final' for a PDA_F, 'empty' for a PDA_E.
+    """
+    assert accept in ('final','empty')
+    rand = _random(seed)
+    input_symbols = sorted(set(input_symbols))
+    pushdown_symbols = sorted(set(pushdown_symbols) | {'Z'})
+    states = [f'q{i}' for i in range(0,n)]
+    p = PDA_F() if accept == 'final' else PDA_E()
+    p.set_input_symbols(set(input_symbols))
+    p.set_pushdown_symbols(set(pushdown_symbols))
+    p.add_states(states)
+    p.set_initial_state(states[0])
+    p.set_initial_symbol('Z')
+    if accept == 'final':
+        p.set_finish_states({q for q in states if rand.random() < final_probability})
+    for src in states:
+        for input_symbol in input_symbols + [p.epsilon()]:
+            probability = (density if input_symbol != p.epsilon() else epsilon_density) / n
+            for stack_symbol in pushdown_symbols:
+                for j in _bernoulli_indices(n,probability,rand):
+                    push = ''.join(rand.choice(pushdown_symbols) for _ in range(0,rand.randint(0,max_push)))
+                    p.add_transition(src,input_symbol,stack_symbol,states[j],push if len(push) != 0 else p.epsilon())
+    return p
+
+def random_strings(alphabet:Iterable[str],count:int,max_length:int,seed = None):
+    """Generate 'count' random strings, lengths uniform in [0, max_length].
+    """
+    rand = _random(seed)
+    alphabet = sorted(set(alphabet))
+    for _ in range(0,count):
+        yield ''.join(rand.choices(alphabet,k = rand.randint(0,max_length)))
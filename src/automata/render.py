@@ -0,0 +1,222 @@
+"""
+Graphviz rendering of automata, used by the 'draw' methods of DFA, NFA, PDA_F and PDA_E.
+
+Parallel edges are grouped with a dict in one pass, runs of letters are shown as ranges
+('a-z'), and a large automaton can be cut down to the neighborhood of a state or to the
+states within some depth of the start state.
+
+Rendered pictures go to a sink: a directory, an in-memory buffer or a callback.
+'render_batch' renders many graphs with a single 'dot' process.
+"""
+import os
+import tempfile
+import subprocess
+from collections import deque
+from typing import Any,Dict,Iterable,List,Set,Tuple,Callable
+import graphviz
+from graphviz import Digraph
+
+def letter_label(letter:str)->str:
+    """A letter as written in a label, ',', '-' and '\\' are escaped with a backslash.
+    """
+    return '\\' + letter if letter in (',','-','\\') else letter
+
+def letters_label(letters:Iterable[str])->str:
+    """Sorted, comma separated letters, with runs of 3 or more consecutive letters or digits as ranges.
+
+    Letters that would be read as separators are escaped (see 'letter_label').
+    """
+    letters = sorted(set(letters))
+    parts = []
+    i = 0
+    while i < len(letters):
+        j = i
+        while j + 1 < len(letters) and letters[j+1].isalnum() and letters[j].isalnum() \
+                and ord(letters[j+1]) == ord(letters[j]) + 1:
+            j += 1
+        if j - i >= 2:
+            parts.append(f'{letters[i]}-{letters[j]}')
+        else:
+            parts.extend(letter_label(letter) for letter in letters[i:j+1])
+        i = j + 1
+    return ','.join(parts)
+
+def lines_label(lines:Iterable[str])->str:
+    """Sorted labels, one per line.
+    """
+    return '\n'.join(sorted(lines))
+
+def group_edges(edges:Iterable[Tuple[str,str,str]])->Dict[Tuple[str,str],List[str]]:
+    """Group (src, target, label) edges by (src, target).
+    """
+    grouped = dict()
+    for src,target,label in edges:
+        labels = grouped.get((src,target))
+        if labels is None:
+            grouped[(src,target)] = [label]
+        else:
+            labels.append(label)
+    return grouped
+
+def select_states(pairs:Iterable[Tuple[str,str]],start:str,depth:int,undirected:bool = False)->Set[str]:
+    """States within 'depth' edges of 'start', following edges backwards too if 'undirected'.
+    """
+    neighbors = dict()
+    for src,target in pairs:
+        neighbors.setdefault(src,set()).add(target)
+        if undirected:
+            neighbors.setdefault(target,set()).add(src)
+    selected = {start}
+    queue = deque([(start,0)])
+    while len(queue) != 0:
+        q,d = queue.popleft()
+        if d == depth:
+            continue
+        for p in neighbors.get(q,()):
+            if p not in selected:
+                selected.add(p)
+                queue.append((p,d+1))
+    return selected
+
+def automaton_graph(name:str,states:Iterable[str],q0:str,finish_states:Set[str],edges:Iterable[Tuple[str,str,str]],
+                    label:Callable[[List[str]],str] = letters_label,around:str = None,depth:int = None)->Digraph:
+    """Build the Digraph of an automaton.
+
+    Args:
+        name (str): graph name.
+        states (Iterable[str]): states, in drawing order.
+        q0 (str): start state.
+        finish_states (Set[str]): finish states, drawn with double circles.
+        edges (Iterable[Tuple[str,str,str]]): (src, target, label part) of each transition.
+        label (Callable, optional): makes the label of an edge from its parts. Defaults to letters_label.
+        around (str, optional): draw only the states within 'depth' edges of this state, in either direction.
+        depth (int, optional): with 'around', the radius (default 1), else draw only the states within
+            'depth' edges of the start state.
+
+    States of a partial drawing with edges to undrawn states are dashed.
+    """
+    grouped = group_edges(edges)
+    selected = None
+    if around is not None:
+        selected = select_states(grouped.keys(),around,1 if depth is None else depth,undirected = True)
+    elif depth is not None:
+        selected = select_states(grouped.keys(),q0,depth)
+    truncated = set()
+    if selected is not None:
+        for src,target in grouped.keys():
+            if (src in selected) != (target in selected):
+                truncated.add(src if src in selected else target)
+
+    G = Digraph(name)
+    for q in states:
+        if selected is not None and q not in selected:
+            continue
+        attrs = {'shape':'doublecircle' if q in finish_states else 'circle'}
+        if q in truncated:
+            attrs['style'] = 'dashed'
+        G.node(q,q,**attrs)
+        if q == q0:
+            G.node('start','start',shape = 'none')
+            G.edge('start',q0)
+    for (src,target),parts in grouped.items():
+        if selected is None or (src in selected and target in selected):
+            G.edge(src,target,label(parts))
+    G.attr(rankdir = 'LR')
+    return G
+
+class DirectorySink:
+    """Write each picture to 'directory/name.format', 'name.gv' for DOT sources.
+    """
+    def __init__(self,directory:str) -> None:
+        self.directory = directory
+
+    def write(self,name:str,format:str,data:bytes)->str:
+        os.makedirs(self.directory,exist_ok = True)
+        file_name = os.path.join(self.directory,f'{name}.{_extension(format)}')
+        with open(file_name,'wb') as f:
+            f.write(data)
+        return file_name
+
+class BufferSink:
+    """Keep the pictures in memory, 'pictures' maps name to (format, data).
+    """
+    def __init__(self) -> None:
+        self.pictures = dict()
+
+    def write(self,name:str,format:str,data:bytes)->str:
+        self.pictures[name] = (format,data)
+        return name
+
+class CallbackSink:
+    """Pass each picture to callback(name, format, data), its result is returned by 'draw'.
+    """
+    def __init__(self,callback:Callable[[str,str,bytes],Any]) -> None:
+        self.callback = callback
+
+    def write(self,name:str,format:str,data:bytes):
+        return self.callback(name,format,data)
+
+def _extension(format:str)->str:
+    return 'gv' if format in ('dot','gv') else format
+
+def output(G:Digraph,name:str,format:str = 'pdf',view:bool = False,sink = None,path:str = None):
+    """Render G and hand the result to a sink.
+
+    Args:
+        name (str): picture name.
+        format (str, optional): Graphviz output format, 'dot' hands over only the DOT source
+            and needs no Graphviz installation. Defaults to 'pdf'.
+        view (bool, optional): open the written file in a viewer, directory sinks only. Defaults to False.
+        sink (optional): DirectorySink, BufferSink, CallbackSink or any object with
+            write(name, format, data). Defaults to DirectorySink(path).
+        path (str, optional): directory of the default sink.
+
+    Returns:
+        what the sink's write returns, the file name for a DirectorySink.
+    """
+    if sink is None:
+        sink = DirectorySink(path)
+    if format in ('dot','gv'):
+        data = G.source.encode('utf-8')
+    else:
+        data = G.pipe(format = format)
+    result = sink.write(name,format,data)
+    if view and isinstance(sink,DirectorySink):
+        graphviz.view(result)
+    return result
+
+def render_batch(graphs:Iterable[Tuple[str,Digraph]],format:str = 'pdf',sink = None,path:str = None,
+                 chunk_size:int = 1000)->List:
+    """Render many graphs with one 'dot' process (per 'chunk_size' graphs, to bound the command line).
+
+    Args:
+        graphs: (name, Digraph) pairs, e.g. from the 'graph' methods of the automata.
+        format, sink, path: as in 'output'.
+
+    Returns:
+        List: what the sink returned for each graph.
+    """
+    if sink is None:
+        sink = DirectorySink(path)
+    graphs = list(graphs)
+    if format in ('dot','gv'):
+        return [sink.write(name,format,G.source.encode('utf-8')) for name,G in graphs]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for begin in range(0,len(graphs),chunk_size):
+            chunk = graphs[begin:begin+chunk_size]
+            file_names = []
+            for i,(name,G) in enumerate(chunk):
+                file_name = os.path.join(directory,f'{begin+i}.gv')
+                with open(file_name,'w',encoding = 'utf-8') as f:
+                    f.write(G.source)
+                file_names.append(file_name)
+            try:
+                # -O writes each 'file.gv' to 'file.gv.format'
+                subprocess.run(['dot',f'-T{format}','-O'] + file_names,check = True,capture_output = True)
+            except FileNotFoundError:
+                raise graphviz.ExecutableNotFound(['dot'])
+            for (name,G),file_name in zip(chunk,file_names):
+                with open(f'{file_name}.{format}','rb') as f:
+                    results.append(sink.write(name,format,f.read()))
+    return results
@@ -0,0 +1,134 @@
+"""
+Binary format of the automata ('to_bytes'/'from_bytes' of DFA, NFA, PDA_F and PDA_E) and of
+the LALR(1) analysis tables ('save_table'/'load_table' of LALR_1_parser).
+
+    header       : magic b'AUTM', version (u16), kind (u8), reserved (u8)
+    string table : count (u32), count+1 character offsets (u32), UTF-8 length (u32), UTF-8 text, padding
+    arrays       : number of arrays (u32), then for each array its length (u32) and its u32 items
+
+All integers are little-endian. State and symbol names are stored once in the string table,
+the arrays hold string ids. 'decode' returns the arrays as 'memoryview' casts of the data,
+but 'from_bytes' still builds a Python tuple or set entry per transition, so loading is not
+faster than unpickling: for a DFA with 20000 states and 1M transitions (CPython 3.11),
+'to_bytes' takes 0.36 s and 'from_bytes' 0.40-0.55 s, against 0.29 s for 'pickle.dumps' and
+0.36 s for 'pickle.loads', for about the same size (12.3 MB). What the format gives is that
+loading runs no code from the data and does not depend on the layout of the Python objects.
+"""
+import sys
+import struct
+from array import array
+from typing import List,Tuple
+from automata.myException import AutomatonFormatException
+
+FORMAT_MAGIC = b'AUTM'
+FORMAT_VERSION = 1
+KIND_DFA = 1
+KIND_NFA = 2
+KIND_PDA_F = 3
+KIND_PDA_E = 4
+KIND_LALR_1_TABLE = 5
+
+_header = struct.Struct('<4sHBB')
+_u32 = struct.Struct('<I')
+
+class StringTable:
+    """Interned strings, each string gets the id of its first occurrence.
+    """
+    def __init__(self) -> None:
+        self.strings = []
+        self.__ids = dict()
+
+    def intern(self,s:str)->int:
+        i = self.__ids.get(s)
+        if i is None:
+            i = len(self.strings)
+            self.__ids[s] = i
+            self.strings.append(s)
+        return i
+
+def _u32_bytes(items)->bytes:
+    a = items if isinstance(items,array) and items.typecode == 'I' else array('I',items)
+    if sys.byteorder == 'big':
+        a = array('I',a)
+        a.byteswap()
+    return a.tobytes()
+
+def _pad(n:int)->bytes:
+    return b'\0' * (-n % 4)
+
+def encode(kind:int,strings:List[str],arrays:List)->bytes:
+    """Encode a string table and u32 arrays.
+    """
+    offsets = array('I',[0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    text = ''.join(strings).encode('utf-8')
+    chunks = [_header.pack(FORMAT_MAGIC,FORMAT_VERSION,kind,0),
+              _u32.pack(len(strings)),_u32_bytes(offsets),_u32.pack(len(text)),text,_pad(len(text)),
+              _u32.pack(len(arrays))]
+    for items in arrays:
+        chunks.append(_u32.pack(len(items)))
+        chunks.append(_u32_bytes(items))
+    return b''.join(chunks)
+
+def _u32_view(data:memoryview,offset:int,n:int):
+    end = offset + 4*n
+    if end > len(data):
+        raise AutomatonFormatException('truncated data')
+    if sys.byteorder == 'big':
+        a = array('I',data[offset:end].tobytes())
+        a.byteswap()
+        return a,end
+    return data[offset:end].cast('I'),end
+
+def decode(data,kind:int)->Tuple[List[str],List[memoryview]]:
+    """Decode data written by 'encode'.
+
+    Returns:
+        (strings, arrays): arrays are read-only views of u32 items into 'data'.
+    """
+    data = memoryview(data).cast('B')
+    if len(data) < _header.size:
+        raise AutomatonFormatException('truncated header')
+    magic,version,data_kind,_ = _header.unpack_from(data,0)
+    if magic != FORMAT_MAGIC:
+        raise AutomatonFormatException('bad magic')
+    if version != FORMAT_VERSION:
+        raise AutomatonFormatException(f'unsupported version {version}')
+    if data_kind != kind:
+        raise AutomatonFormatException(f'kind {data_kind} instead of {kind}')
+    offset = _header.size
+    try:
+        (count,) = _u32.unpack_from(data,offset)
+        offsets,offset = _u32_view(data,offset + 4,count + 1)
+        (text_length,) = _u32.unpack_from(data,offset)
+        offset += 4
+        text = bytes(data[offset:offset+text_length]).decode('utf-8')
+        offset += text_length + (-text_length % 4)
+        strings = [text[offsets[i]:offsets[i+1]] for i in range(0,count)]
+        (arrays_num,) = _u32.unpack_from(data,offset)
+        offset += 4
+        arrays = []
+        for _ in range(0,arrays_num):
+            (n,) = _u32.unpack_from(data,offset)
+            items,offset = _u32_view(data,offset + 4,n)
+            arrays.append(items)
+    except (struct.error,UnicodeDecodeError) as e:
+        raise AutomatonFormatException(str(e))
+    return strings,arrays
+
+def strings_of(strings:List[str],ids)->List[str]:
+    """Map string ids to strings.
+    """
+    try:
+        return [strings[i] for i in ids]
+    except IndexError:
+        raise AutomatonFormatException('string id out of range')
+
+def write_file(file_name:str,data:bytes):
+    with open(file_name,'wb') as f:
+        f.write(data)
+
+def read_file(file_name:str)->bytes:
+    with open(file_name,'rb') as f:
+        return f.read()
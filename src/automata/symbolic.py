@@ -0,0 +1,274 @@
+"""
+Symbolic (BDD) exploration of products of DFAs/NFAs.
+
+Each automaton of a product gets a block of state bits, current and next bits interleaved,
+below the shared letter bits. Its transition relation T_i(letter, current, next) is a BDD,
+completed with a dead state that also stands for every state from which no finish state
+can be reached, so an intersection never explores tuples one of whose automata is dead.
+The image of a set of product states conjoins the T_i one
+at a time, quantifying the current bits of each automaton as soon as it is done (relational
+product). The product automaton itself is never built.
+
+    symbolic.is_empty([d1,d2,d3])               # is L(d1) & L(d2) & L(d3) empty?
+    symbolic.find_word([d1,d2],accept = 'any')  # a word of L(d1) | L(d2), None if empty
+    symbolic.is_equal(d1,d2)
+"""
+import os
+import sys
+from typing import List,Dict,Tuple,Optional,Callable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from container.bdd import BDD
+
+def _bits(n:int)->int:
+    return max(1,(n-1).bit_length())
+
+def _epsilon_closure(deltas:Dict,epsilon:str,states)->set:
+    closure = set(states)
+    st = list(closure)
+    while len(st) != 0:
+        q = st.pop()
+        for letter,targets in deltas.get(q,()):
+            if letter == epsilon:
+                for p in targets:
+                    if p not in closure:
+                        closure.add(p)
+                        st.append(p)
+    return closure
+
+def _live_states(moves:Dict[int,Dict[str,set]],finish:List[int])->set:
+    """States from which a finish state can be reached.
+    """
+    reverse = dict()
+    for q,by_letter in moves.items():
+        for targets in by_letter.values():
+            for p in targets:
+                reverse.setdefault(p,[]).append(q)
+    live = set(finish)
+    st = list(live)
+    while len(st) != 0:
+        for q in reverse.get(st.pop(),()):
+            if q not in live:
+                live.add(q)
+                st.append(q)
+    return live
+
+class _Component:
+    """One automaton of a product: its states are numbered, the last number is the dead state.
+
+    States that cannot reach a finish state are merged into the dead state.
+    """
+    def __init__(self,automaton,first_var:int) -> None:
+        self.states = automaton.Q()
+        self.dead = len(self.states)
+        self.index = {q:i for i,q in enumerate(self.states)}
+        self.bits = _bits(len(self.states)+1)
+        self.cur_vars = [first_var + 2*j for j in range(0,self.bits)]
+        self.next_vars = [v + 1 for v in self.cur_vars]
+        deltas = automaton.deltas()
+        finish_states = automaton.finish_states()
+        if hasattr(automaton,'epsilon'):
+            # NFA: moves lead to epsilon closures, starting from the closure of q0
+            epsilon = automaton.epsilon()
+            closure = lambda states: _epsilon_closure(deltas,epsilon,states)
+            self.initial = sorted(self.index[q] for q in closure({automaton.q0()}))
+            self.moves = dict()
+            for q,moves in deltas.items():
+                for letter,targets in moves:
+                    if letter != epsilon:
+                        self.moves.setdefault(self.index[q],dict()).setdefault(letter,set()).update(
+                            self.index[p] for p in closure(targets))
+        else:
+            self.initial = [self.index[automaton.q0()]]
+            self.moves = dict()
+            for q,moves in deltas.items():
+                for letter,p in moves:
+                    self.moves.setdefault(self.index[q],dict()).setdefault(letter,set()).add(self.index[p])
+        self.finish = [self.index[q] for q in finish_states]
+        self.live = _live_states(self.moves,self.finish)
+        self.initial = [i for i in self.initial if i in self.live] or [self.dead]
+        for by_letter in self.moves.values():
+            for letter,targets in by_letter.items():
+                live_targets = targets & self.live
+                by_letter[letter] = live_targets if len(live_targets) != 0 else {self.dead}
+
+    def state_cube(self,manager:BDD,i:int,next:bool = False)->int:
+        variables = self.next_vars if next else self.cur_vars
+        return manager.cube({variables[j]:bool(i >> j & 1) for j in range(0,self.bits)})
+
+class SymbolicProduct:
+    """Synchronous product of DFAs/NFAs over the union of their alphabets, kept symbolic.
+    """
+    def __init__(self,automata:List,manager:BDD = None) -> None:
+        assert len(automata) >= 1
+        self.manager = manager if manager is not None else BDD()
+        self.alphabet = sorted(set().union(*(a.alphabet() for a in automata)))
+        self.letter_bits = _bits(len(self.alphabet))
+        self.letter_vars = list(range(0,self.letter_bits))
+        self.components = []
+        first_var = self.letter_bits
+        for a in automata:
+            component = _Component(a,first_var)
+            first_var += 2*component.bits
+            self.components.append(component)
+        self.cur_vars = [v for c in self.components for v in c.cur_vars]
+        self.next_vars = [v for c in self.components for v in c.next_vars]
+        self.__to_cur = dict(zip(self.next_vars,self.cur_vars))
+        self.__to_next = dict(zip(self.cur_vars,self.next_vars))
+        m = self.manager
+        self.__letter_cubes = [m.cube({v:bool(k >> j & 1) for j,v in enumerate(self.letter_vars)})
+                               for k in range(0,len(self.alphabet))]
+        self.transitions = [self.__transition_relation(c) for c in self.components]
+        self.initial = m.and_all(m.or_all(c.state_cube(m,i) for i in c.initial) for c in self.components)
+
+    def __transition_relation(self,c:_Component)->int:
+        m = self.manager
+        relation = 0
+        for i in sorted(c.live) + [c.dead]:
+            moves = c.moves.get(i,{})
+            by_targets = dict()
+            for k,letter in enumerate(self.alphabet):
+                targets = moves.get(letter)
+                targets = frozenset(targets) if targets else frozenset([c.dead])
+                by_targets.setdefault(targets,[]).append(k)
+            source = c.state_cube(m,i)
+            for targets,letters in by_targets.items():
+                letter_set = m.or_all(self.__letter_cubes[k] for k in letters)
+                target_set = m.or_all(c.state_cube(m,p,next = True) for p in targets)
+                relation = m.or_(relation,m.and_(source,m.and_(letter_set,target_set)))
+        return relation
+
+    def final(self,i:int)->int:
+        """States of the product where automaton i is in a finish state.
+        """
+        m = self.manager
+        c = self.components[i]
+        return m.or_all(c.state_cube(m,q) for q in c.finish)
+
+    def live(self)->int:
+        """Product states where no automaton is in its dead state.
+        """
+        m = self.manager
+        return m.and_all(m.not_(c.state_cube(m,c.dead)) for c in self.components)
+
+    def accepting(self,accept = 'all')->int:
+        """Product states accepting for 'all' (intersection), 'any' (union) of the automata,
+        or for accept(product, [final_0, final_1, ...]) -> BDD.
+        """
+        m = self.manager
+        finals = [self.final(i) for i in range(0,len(self.components))]
+        if accept == 'all':
+            return m.and_all(finals)
+        if accept == 'any':
+            return m.or_all(finals)
+        return accept(self,finals)
+
+    def image(self,states:int)->int:
+        """Successors of a set of product states, by partitioned relational product.
+        """
+        m = self.manager
+        r = states
+        for c,relation in zip(self.components,self.transitions):
+            r = m.and_exists(r,relation,c.cur_vars)
+            if r == 0:
+                return 0
+        r = m.exists(r,self.letter_vars)
+        return m.rename(r,self.__to_cur)
+
+    def reachable(self,stop:int = 0,within:int = 1)->Tuple[int,List[int],bool]:
+        """Breadth first reachability from the initial states.
+
+        Args:
+            stop (int, optional): stop as soon as a state of this set is reached. Defaults to none.
+            within (int, optional): explore only these states, e.g. 'live()'. Defaults to all.
+
+        Returns:
+            (reached states, BFS layers, whether 'stop' was hit): the last layer meets 'stop' if it was hit.
+        """
+        m = self.manager
+        reached = m.and_(self.initial,within)
+        frontier = reached
+        layers = [frontier]
+        while True:
+            if m.and_(frontier,stop) != 0:
+                return reached,layers,True
+            if frontier == 0:
+                return reached,layers,False
+            frontier = m.and_(m.and_(self.image(frontier),within),m.not_(reached))
+            if frontier == 0:
+                return reached,layers,False
+            reached = m.or_(reached,frontier)
+            layers.append(frontier)
+
+    def count(self,states:int)->int:
+        """Number of product states in a set.
+        """
+        return self.manager.sat_count(states,self.cur_vars)
+
+    def decode(self,assignment:Dict[int,bool])->Tuple:
+        """Product state of a (partial) assignment of the current bits, free bits are False.
+        """
+        state = []
+        for c in self.components:
+            i = sum(1 << j for j,v in enumerate(c.cur_vars) if assignment.get(v,False))
+            state.append(c.states[i] if i < c.dead else None)
+        return tuple(state)
+
+    def __pick_state(self,states:int)->int:
+        assignment = self.manager.sat_one(states)
+        return self.manager.cube({v:assignment.get(v,False) for v in self.cur_vars})
+
+    def word_to(self,layers:List[int],target:int)->str:
+        """A shortest word leading from the initial states to the set 'target', which must meet the last layer.
+        """
+        m = self.manager
+        state = self.__pick_state(m.and_(layers[-1],target))
+        word = []
+        for layer in reversed(layers[:-1]):
+            # predecessors of 'state' in 'layer', with their letters
+            r = m.and_(m.rename(state,self.__to_next),layer)
+            for c,relation in zip(self.components,self.transitions):
+                r = m.and_exists(r,relation,c.next_vars)
+            assignment = m.sat_one(r)
+            k = sum(1 << j for j,v in enumerate(self.letter_vars) if assignment.get(v,False))
+            word.append(self.alphabet[k])
+            state = m.cube({v:assignment.get(v,False) for v in self.cur_vars})
+        return ''.join(reversed(word))
+
+def find_word(automata:List,accept = 'all',manager:BDD = None)->Optional[str]:
+    """A shortest word accepted by the product of the automata, None if there is none.
+
+    Args:
+        accept: 'all' for the intersection, 'any' for the union, see SymbolicProduct.accepting.
+            For 'all', only the tuples of live states are explored.
+    """
+    product = SymbolicProduct(automata,manager)
+    target = product.accepting(accept)
+    within = product.live() if accept == 'all' else 1
+    reached,layers,hit = product.reachable(stop = target,within = within)
+    return product.word_to(layers,target) if hit else None
+
+def is_empty(automata:List,accept = 'all',manager:BDD = None)->bool:
+    """Test whether the intersection ('all') or union ('any') of the automata is empty.
+    """
+    return find_word(automata,accept,manager) is None
+
+def distinguishing_word(a,b,manager:BDD = None)->Optional[str]:
+    """A shortest word accepted by exactly one of a and b, None if they are equivalent.
+
+    NFAs are determinized first.
+    """
+    automata = [x.to_DFA() if hasattr(x,'epsilon') else x for x in (a,b)]
+    return find_word(automata,lambda product,finals: product.manager.xor(*finals),manager)
+
+def is_equal(a,b,manager:BDD = None)->bool:
+    """Test whether a and b accept the same language.
+    """
+    return distinguishing_word(a,b,manager) is None
+
+def reachable_count(automata:List,manager:BDD = None)->int:
+    """Number of reachable states of the product of the automata, completed with dead states
+    (a dead state also stands for the states that cannot reach a finish state).
+    """
+    product = SymbolicProduct(automata,manager)
+    reached,layers,hit = product.reachable()
+    return product.count(reached)
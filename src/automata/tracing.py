@@ -0,0 +1,75 @@
+"""
+Step traces of the automata and parsers.
+
+Engines produce 'Step' events from a generator (DFA.steps, NFA.steps,
+LL_1_parser.parse_steps, LALR_1_parser.parse_steps), and their run/parse methods
+take a 'trace' callback that gets the same events. A 'Trace' keeps the steps, or
+only the last 'maxlen' of them for post-mortem inspection:
+
+    last_steps = Trace(maxlen = 100)
+    if not dfa.run(input_str,trace = last_steps):
+        print(list(last_steps))
+"""
+from collections import deque,namedtuple
+from typing import Callable,Generator,Iterator
+
+# index: step number, state_before/state_after: state (set of states for NFA, stack top for LL(1),
+# state stack for LALR(1)), symbol: input symbol read or looked at, stack: symbol stack of parsers,
+# action: what a parser did.
+Step = namedtuple('Step',['index','state_before','symbol','state_after','stack','action'],defaults = (None,None))
+
+class Trace:
+    """Callable receiving steps: forwards them to 'callback' and keeps them.
+
+    Args:
+        callback (Callable, optional): called with each step. Defaults to None.
+        maxlen (int, optional): keep only the last 'maxlen' steps (ring buffer). Defaults to None, keep all.
+    """
+    def __init__(self,callback:Callable[[Step],None] = None,maxlen:int = None) -> None:
+        self.callback = callback
+        self.steps = deque(maxlen = maxlen)
+
+    def __call__(self,step:Step):
+        self.steps.append(step)
+        if self.callback is not None:
+            self.callback(step)
+
+    def __iter__(self)->Iterator[Step]:
+        return iter(self.steps)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def clear(self):
+        self.steps.clear()
+
+def print_step(step:Step):
+    """Print a step, for the 'verbose' option of run/parse.
+    """
+    lines = [f'Pre    : {step.state_before}',f'Read   : {step.symbol}',f'Next   : {step.state_after}']
+    if step.stack is not None:
+        lines.append(f'Stack  : {list(step.stack)}')
+    if step.action is not None:
+        lines.append(f'Action : {step.action}')
+    print('\n'.join(lines) + '\n')
+
+def combine(trace:Callable[[Step],None] = None,verbose = False)->Callable[[Step],None]:
+    """Get the step callback of the 'trace' and 'verbose' options, None if there is none.
+    """
+    if verbose == True and trace is not None:
+        def both(step:Step):
+            print_step(step)
+            trace(step)
+        return both
+    return print_step if verbose == True else trace
+
+def drive(steps:Generator,trace:Callable[[Step],None] = None):
+    """Consume a step generator, calling 'trace' with each step, and get its return value.
+    """
+    while True:
+        try:
+            step = next(steps)
+        except StopIteration as e:
+            return e.value
+        if trace is not None:
+            trace(step)
@@ -0,0 +1,304 @@
+from typing import Dict,Iterable,Optional
+
+class BDD:
+    """Manager of reduced ordered binary decision diagrams.
+
+    Nodes are ints: 0 is false, 1 is true, other nodes are rows of the 'var'/'low'/'high'
+    arrays. A unique table makes equal functions the same node, so equivalence is '=='.
+    Smaller variable numbers are closer to the root. The operations are cached
+    until 'clear_caches'.
+    """
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self) -> None:
+        terminal_level = float('inf')
+        self.__var = [terminal_level,terminal_level]
+        self.__low = [0,1]
+        self.__high = [0,1]
+        self.__unique = dict()
+        self.__ite_cache = dict()
+        self.__exists_cache = dict()
+        self.__and_exists_cache = dict()
+        self.__rename_cache = dict()
+        self.__var_sets = dict() # frozenset of variables -> small id, for the cache keys
+
+    def __len__(self)->int:
+        """Number of nodes, terminals included.
+        """
+        return len(self.__var)
+
+    def clear_caches(self):
+        self.__ite_cache.clear()
+        self.__exists_cache.clear()
+        self.__and_exists_cache.clear()
+        self.__rename_cache.clear()
+
+    def node(self,var:int,low:int,high:int)->int:
+        """Get the node 'if var then high else low'.
+        """
+        if low == high:
+            return low
+        key = (var,low,high)
+        u = self.__unique.get(key)
+        if u is None:
+            u = len(self.__var)
+            self.__var.append(var)
+            self.__low.append(low)
+            self.__high.append(high)
+            self.__unique[key] = u
+        return u
+
+    def var(self,var:int)->int:
+        return self.node(var,0,1)
+
+    def top(self,u:int):
+        return self.__var[u]
+
+    def cofactors(self,u:int,var:int):
+        if self.__var[u] == var:
+            return self.__low[u],self.__high[u]
+        return u,u
+
+    def ite(self,f:int,g:int,h:int)->int:
+        """If f then g else h.
+        """
+        var = self.__var
+        cache = self.__ite_cache
+        node = self.node
+        cofactors = self.cofactors
+        results = []
+        # (f, g, h) to compute, or (None, key, var) to build a node from the two last results
+        stack = [(f,g,h)]
+        while len(stack) != 0:
+            f,g,h = stack.pop()
+            if f is None:
+                high = results.pop()
+                low = results.pop()
+                r = cache[g] = node(h,low,high)
+                results.append(r)
+                continue
+            if f == 1 or g == h:
+                results.append(g)
+                continue
+            if f == 0:
+                results.append(h)
+                continue
+            if g == 1 and h == 0:
+                results.append(f)
+                continue
+            key = (f,g,h)
+            r = cache.get(key)
+            if r is not None:
+                results.append(r)
+                continue
+            v = min(var[f],var[g],var[h])
+            f0,f1 = cofactors(f,v)
+            g0,g1 = cofactors(g,v)
+            h0,h1 = cofactors(h,v)
+            stack.append((None,key,v))
+            stack.append((f1,g1,h1))
+            stack.append((f0,g0,h0))
+        return results[-1]
+
+    def not_(self,f:int)->int:
+        return self.ite(f,0,1)
+
+    def and_(self,f:int,g:int)->int:
+        return self.ite(f,g,0)
+
+    def or_(self,f:int,g:int)->int:
+        return self.ite(f,1,g)
+
+    def xor(self,f:int,g:int)->int:
+        return self.ite(f,self.not_(g),g)
+
+    def and_all(self,nodes:Iterable[int])->int:
+        """Conjunction of the nodes, combined pairwise in a balanced tree.
+        """
+        return self.__combine_all(list(nodes),self.and_,1,0)
+
+    def or_all(self,nodes:Iterable[int])->int:
+        """Disjunction of the nodes, combined pairwise in a balanced tree.
+        """
+        return self.__combine_all(list(nodes),self.or_,0,1)
+
+    def __combine_all(self,nodes:list,op,neutral:int,absorbing:int)->int:
+        # pairing keeps both operands small, a left fold walks the whole result at each step
+        if len(nodes) == 0:
+            return neutral
+        while len(nodes) > 1:
+            if absorbing in nodes:
+                return absorbing
+            nodes = [op(nodes[i],nodes[i+1]) if i + 1 < len(nodes) else nodes[i] for i in range(0,len(nodes),2)]
+        return nodes[0]
+
+    def cube(self,assignment:Dict[int,bool])->int:
+        """Conjunction of the literals of 'assignment' (variable -> value).
+        """
+        r = 1
+        for v in sorted(assignment,reverse = True):
+            r = self.node(v,0,r) if assignment[v] else self.node(v,r,0)
+        return r
+
+    def __var_set_id(self,variables:frozenset)->int:
+        i = self.__var_sets.get(variables)
+        if i is None:
+            i = self.__var_sets[variables] = len(self.__var_sets)
+        return i
+
+    def exists(self,f:int,variables:Iterable[int])->int:
+        """Existential quantification of f over 'variables'.
+        """
+        variables = frozenset(variables)
+        return self.__exists(f,variables,self.__var_set_id(variables))
+
+    def __exists(self,f:int,variables:frozenset,set_id:int)->int:
+        var,low,high = self.__var,self.__low,self.__high
+        cache = self.__exists_cache
+        results = []
+        # (0, f): compute, (1, f): the low result is known, (2, f): both are known
+        stack = [(0,f)]
+        while len(stack) != 0:
+            stage,f = stack.pop()
+            if stage == 0:
+                if f <= 1:
+                    results.append(f)
+                    continue
+                r = cache.get((f,set_id))
+                if r is not None:
+                    results.append(r)
+                    continue
+                stack.append((1,f))
+                stack.append((0,low[f]))
+            elif stage == 1:
+                if var[f] in variables and results[-1] == 1:
+                    cache[(f,set_id)] = 1
+                    continue
+                stack.append((2,f))
+                stack.append((0,high[f]))
+            else:
+                r1 = results.pop()
+                r0 = results.pop()
+                v = var[f]
+                r = cache[(f,set_id)] = self.or_(r0,r1) if v in variables else self.node(v,r0,r1)
+                results.append(r)
+        return results[-1]
+
+    def and_exists(self,f:int,g:int,variables:Iterable[int])->int:
+        """Relational product: exists 'variables'. f and g, without building f and g.
+        """
+        variables = frozenset(variables)
+        return self.__and_exists(f,g,variables,self.__var_set_id(variables))
+
+    def __and_exists(self,f:int,g:int,variables:frozenset,set_id:int)->int:
+        var = self.__var
+        cache = self.__and_exists_cache
+        cofactors = self.cofactors
+        results = []
+        # (0, f, g, None): compute, (1, f, g, v): the low result is known, (2, f, g, v): both are known
+        stack = [(0,f,g,None)]
+        while len(stack) != 0:
+            stage,f,g,v = stack.pop()
+            if stage == 0:
+                if f == 0 or g == 0:
+                    results.append(0)
+                elif f == 1 and g == 1:
+                    results.append(1)
+                elif f == 1 or f == g:
+                    results.append(self.__exists(g,variables,set_id))
+                elif g == 1:
+                    results.append(self.__exists(f,variables,set_id))
+                else:
+                    if f > g:
+                        f,g = g,f
+                    r = cache.get((f,g,set_id))
+                    if r is not None:
+                        results.append(r)
+                        continue
+                    v = min(var[f],var[g])
+                    stack.append((1,f,g,v))
+                    stack.append((0,cofactors(f,v)[0],cofactors(g,v)[0],None))
+            elif stage == 1:
+                if v in variables and results[-1] == 1:
+                    cache[(f,g,set_id)] = 1
+                    continue
+                stack.append((2,f,g,v))
+                stack.append((0,cofactors(f,v)[1],cofactors(g,v)[1],None))
+            else:
+                r1 = results.pop()
+                r0 = results.pop()
+                r = cache[(f,g,set_id)] = self.or_(r0,r1) if v in variables else self.node(v,r0,r1)
+                results.append(r)
+        return results[-1]
+
+    def rename(self,f:int,mapping:Dict[int,int])->int:
+        """Rename the variables of f. The mapping must keep the order of the variables of f.
+        """
+        key_id = self.__var_set_id(frozenset(mapping.items()))
+        var,low,high = self.__var,self.__low,self.__high
+        cache = self.__rename_cache
+        results = []
+        # (False, f): compute, (True, f): build from the two last results
+        stack = [(False,f)]
+        while len(stack) != 0:
+            built,f = stack.pop()
+            if built:
+                r1 = results.pop()
+                r0 = results.pop()
+                v = var[f]
+                r = cache[(f,key_id)] = self.node(mapping.get(v,v),r0,r1)
+                results.append(r)
+                continue
+            if f <= 1:
+                results.append(f)
+                continue
+            r = cache.get((f,key_id))
+            if r is not None:
+                results.append(r)
+                continue
+            stack.append((True,f))
+            stack.append((False,high[f]))
+            stack.append((False,low[f]))
+        return results[-1]
+
+    def sat_one(self,f:int)->Optional[Dict[int,bool]]:
+        """Get one satisfying assignment of f, None if f is false. Missing variables are free.
+        """
+        if f == 0:
+            return None
+        assignment = dict()
+        while f != 1:
+            if self.__low[f] != 0:
+                assignment[self.__var[f]] = False
+                f = self.__low[f]
+            else:
+                assignment[self.__var[f]] = True
+                f = self.__high[f]
+        return assignment
+
+    def sat_count(self,f:int,variables:Iterable[int])->int:
+        """Number of assignments of 'variables' satisfying f, which must only depend on them.
+        """
+        order = sorted(variables)
+        level = {v:i for i,v in enumerate(order)}
+        n = len(order)
+        def depth(u:int)->int:
+            return n if u <= 1 else level[self.__var[u]]
+        counts = {0:0,1:1} # node -> assignments of the variables from its level on
+        stack = [f]
+        while len(stack) != 0:
+            u = stack[-1]
+            if u in counts:
+                stack.pop()
+                continue
+            low,high = self.__low[u],self.__high[u]
+            if low not in counts:
+                stack.append(low)
+            elif high not in counts:
+                stack.append(high)
+            else:
+                stack.pop()
+                i = depth(u)
+                counts[u] = counts[low] * 2 ** (depth(low) - i - 1) + counts[high] * 2 ** (depth(high) - i - 1)
+        return counts[f] * 2 ** depth(f)
@@ -1,15 +1,75 @@
 import copy
+from array import array
+from typing import Dict,List
+
+class IntDisjointSet:
+    """Union-find over the dense ids 0..n-1, with path halving and union by size.
+
+    Parents and sizes are kept in int arrays, so find/union are amortized
+    almost O(1) and 'groups' is O(n).
+    """
+    def __init__(self,n:int):
+        self.__parent = array('l',range(0,n))
+        self.__size = array('l',[1]) * n
+        self.sets_count = n
+
+    def __len__(self)->int:
+        return len(self.__parent)
+
+    def find(self,x:int)->int:
+        """Find the root of x, making every other node on the path point to its grandparent.
+        """
+        parent = self.__parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self,a:int,b:int)->bool:
+        """Merge the sets of a and b.
+
+        Returns:
+            bool: False if a and b were already in the same set.
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        size = self.__size
+        if size[root_a] < size[root_b]:
+            root_a,root_b = root_b,root_a
+        self.__parent[root_b] = root_a
+        size[root_a] += size[root_b]
+        self.sets_count -= 1
+        return True
+
+    def same(self,a:int,b:int)->bool:
+        return self.find(a) == self.find(b)
+
+    def groups(self)->Dict[int,List[int]]:
+        """Get root -> members of each set, members in increasing order, roots in order of their first member.
+        """
+        groups = dict()
+        find = self.find
+        for x in range(0,len(self.__parent)):
+            root = find(x)
+            members = groups.get(root)
+            if members is None:
+                groups[root] = [x]
+            else:
+                members.append(x)
+        return groups
 
 class DisjointSet:
     def __init__(self,data_list):
         self.__parent = {}
         self.__rank = {}
         self.sets_count = len(data_list)
-        
+
         for d in data_list:
             self.__parent[d]=d
             self.__rank[d] = 1
-    
+
     def find(self,d):
         """Find the root of data d \n
         Method : CollapsingFind
@@ -38,7 +98,7 @@ class DisjointSet:
         """
         assert a in self.__parent
         assert b in self.__parent
-        
+
         root_a = self.find(a)
         root_b = self.find(b)
 
@@ -51,40 +111,42 @@ class DisjointSet:
                     self.__rank[root_a] += 1
             else:
                 self.__parent[root_a] = root_b
-        self.sets_count -= 1
+            self.sets_count -= 1
+
+    def groups(self)->dict:
+        """Get root -> members of each set, in insertion order.
+        """
+        groups = dict()
+        for data in self.__parent.keys():
+            root = self.find(data)
+            if root not in groups:
+                groups[root] = []
+            groups[root].append(data)
+        return groups
 
     def get_set_list(self)->list:
         """Get sets of DS
 
         Returns:
-            list: sets of DS
+            list: sets of DS, each set starts with its root
         """
         set_list = []
-        for (key,val) in self.__parent.items():
-            if key == val:
-                #root
-                set_list.append([copy.deepcopy(key)])
-        
-        for data in self.__parent.keys():
-            pa = self.find(data)
-            if pa != data:
-                for l in set_list:
-                    if pa in l:
-                        l.append(data)
-
+        for root,members in self.groups().items():
+            members.remove(root)
+            set_list.append([copy.deepcopy(root)] + members)
         return set_list
 
-    
+
     def parent(self):
         return copy.deepcopy(self.__parent)
-    
+
     def rank(self):
         return copy.deepcopy(self.__rank)
-    
+
 if __name__ == '__main__':
     ds = DisjointSet(['a','b','c','d'])
     ds.union('a','b')
     ds.union('b','d')
     print(ds.parent())
     print(ds.rank())
-    print(ds.get_set_list())
\ No newline at end of file
+    print(ds.get_set_list())
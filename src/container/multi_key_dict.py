@@ -1,6 +1,11 @@
 import copy
-from typing import List,Set,Tuple,Any
+from typing import List,Set,Tuple,Any,Iterator
 class multi_key_dict:
+    """Dictionary keyed by tuples of 'key_num' keys.
+
+    Values are stored in one flat dict keyed by the whole tuple, with a secondary
+    index from the first key to its tuples for prefix queries.
+    """
     def __init__(self,key_num = 1) -> None:
         """
         Initialize a multi-key dictionary.
@@ -10,8 +15,7 @@ class multi_key_dict:
         assert key_num >= 1
         self.__key_num = key_num
         self.__dict = dict()
-        self.__keys = set()
-        pass
+        self.__first_index = dict() # first key -> list of key tuples
 
     def set_value(self,keys:tuple,val)->None:
         """Set the value of multi_key_dict[key_1][key_2]...[key_n].
@@ -21,51 +25,62 @@ class multi_key_dict:
             val (_type_): Value.
         """
         assert len(keys) == self.__key_num
-        d = self.__dict
-        for i in range(0,self.__key_num-1):
-            key = keys[i]
-            if key not in d:
-                d[key] = dict()
-            d = d[key]
-        d[keys[self.__key_num -1]] = val
-        self.__keys.add(keys)        
+        keys = tuple(keys)
+        if keys not in self.__dict:
+            index = self.__first_index.get(keys[0])
+            if index is None:
+                self.__first_index[keys[0]] = [keys]
+            else:
+                index.append(keys)
+        self.__dict[keys] = val
 
     def get_value(self,keys:tuple)->Any:
         """Get the value of multi_key_dict[key_1][key_2]...[key_n].
 
         Args:
             keys (tuple): A tuple that contains keys in order. Its length must be equal to the number of keys.
+
+        Raises:
+            KeyError: if there is no such keys.
         """
         assert len(keys) == self.__key_num
-        d = self.__dict
-        for i in range(0,self.__key_num):
-            d = d[keys[i]]
-        return d
+        return self.__dict[tuple(keys)]
+
+    def get(self,keys:tuple,default = None)->Any:
+        """Get the value of the keys, or 'default' if there is none.
+        """
+        return self.__dict.get(keys,default)
+
+    def prefix_items(self,prefix:tuple)->List[Tuple[Tuple,Any]]:
+        """Get "(keys,val)" of all keys starting with 'prefix', e.g. all (state,*,*) with prefix (state,).
+        """
+        assert 1 <= len(prefix) <= self.__key_num
+        prefix = tuple(prefix)
+        n = len(prefix)
+        candidates = self.__first_index.get(prefix[0],())
+        return [(keys,self.__dict[keys]) for keys in candidates if n == 1 or keys[:n] == prefix]
 
     def keys(self)->Set[tuple]:
         """Get all keys of the multi_key_dict.
         """
-        return self.__keys.copy()
-    
-    def values(self)->List[Any]:
-        """Get all values of the multi_key_dict.
+        return set(self.__dict)
+
+    def values(self):
+        """Get a view of all values of the multi_key_dict.
         """
-        values = []
-        for key in self.__keys:
-            values.append(self.get_value(key))
-        return values
+        return self.__dict.values()
 
-    def items(self)->List[Tuple[Tuple,Any]]:
-        """Get set of all "(keys,val)" in multi_key_dict.
+    def items(self):
+        """Get a view of all "(keys,val)" in multi_key_dict.
         """
-        mutli_keys_dict_items = []
-        for key in self.__keys:
-            print(key)
-            val = self.get_value(key)
-            print(val)
-            mutli_keys_dict_items.append((key,val))
-        return mutli_keys_dict_items
-    
+        return self.__dict.items()
+
+    def __len__(self)->int:
+        return len(self.__dict)
+
+    def __iter__(self)->Iterator[tuple]:
+        return iter(self.__dict)
+
     def __contains__(self,keys:tuple)->bool:
         """Check whether the given multi_key is in the dict.
 
@@ -76,34 +91,39 @@ class multi_key_dict:
             bool: The result.
         """
         assert len(keys) == self.__key_num
-        if keys in self.__keys:
-            return True
-        return False
-    
+        return keys in self.__dict
+
     def clear(self)->None:
         """Clear all the "keys-val" pairs in the dict.
 
         Note that the number of keys is not reset.
         """
         self.__dict.clear()
-        self.__keys.clear()
-    
+        self.__first_index.clear()
+
     def keys_num(self)->int:
         """Get the number of keys.
-        """ 
+        """
         return self.__key_num
-    
+
     def __str__(self) -> str:
-        items = self.items()
         s = str()
-        for key,val in items:
+        for key,val in self.__dict.items():
             s += f'{key} : {val}\n'
         return s
-    
-    def copy(self):
-        """Return a deep copy of this dict.
+
+    def copy(self,deep = True):
+        """Return a copy of this dict.
+
+        Args:
+            deep (bool, optional): also copy the values. Defaults to True.
         """
-        copy.deepcopy(self)        
+        if deep == True:
+            return copy.deepcopy(self)
+        other = multi_key_dict(self.__key_num)
+        other.__dict = self.__dict.copy()
+        other.__first_index = {key:index.copy() for key,index in self.__first_index.items()}
+        return other
 
 
 def test_multi_key_dict():
@@ -134,6 +154,12 @@ def test_multi_key_dict():
     for elem in l:
         assert elem in d
 
+    # test 'get', prefix queries and 'copy':
+    assert d.get(('x','y','z'),-1) == -1
+    assert sorted(d.prefix_items(('g',))) == [(('g','h','i'),2),(('g','h','j'),3)]
+    assert d.prefix_items(('g','h','j')) == [(('g','h','j'),3)]
+    assert sorted(d.copy().items()) == sorted(d.items())
+
     # test 'clear':
     d.clear()
     assert len(d.keys()) == 0
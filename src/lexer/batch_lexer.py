@@ -0,0 +1,69 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor,wait,FIRST_COMPLETED
+from typing import List,Tuple,Callable,Iterable,Iterator
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cmm_define import cmm_token_re_func
+from token_dfa import TokenDFA
+from scanner import Lexer,get_token_dfa
+from myToken.my_token import Token
+
+# lexer settings of a worker process, set once by '_init_worker'
+_worker_settings = None
+
+def _init_worker(token_re_func,token_dfa:TokenDFA,skip_blank:bool):
+    global _worker_settings
+    _worker_settings = (token_re_func,token_dfa,skip_blank)
+
+def _lex_file(file_name:str)->Tuple[str,List[Token]]:
+    token_re_func,token_dfa,skip_blank = _worker_settings
+    lexer = Lexer.from_file(file_name,token_re_func = token_re_func,token_dfa = token_dfa,skip_blank = skip_blank)
+    return (file_name,lexer.recognize_token())
+
+def lex_files(file_names:Iterable[str],workers:int = None,token_re_func:List[Tuple[str,str,Callable]] = cmm_token_re_func,
+              max_in_flight:int = None,skip_blank = False)->Iterator[Tuple[str,List[Token]]]:
+    """Lex many files in worker processes.
+
+    The token DFA is compiled once here and sent to each worker when it starts.
+    File names are taken from 'file_names' lazily and at most 'max_in_flight' files
+    are being lexed or waiting to be consumed, so memory stays flat on large trees.
+
+    Args:
+        file_names (Iterable[str]): files to lex.
+        workers (int, optional): number of processes, 1 lexes in this process. Defaults to os.cpu_count().
+        token_re_func (optional): token rules, callbacks must be picklable (module level functions). Defaults to cmm_token_re_func.
+        max_in_flight (int, optional): Defaults to 2*workers.
+        skip_blank (bool, optional): see 'Lexer'. Defaults to False.
+
+    Yields:
+        (file_name, tokens) in completion order.
+    """
+    token_dfa = get_token_dfa(token_re_func)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        _init_worker(token_re_func,token_dfa,skip_blank)
+        for file_name in file_names:
+            yield _lex_file(file_name)
+        return
+    if max_in_flight is None:
+        max_in_flight = 2*workers
+    assert max_in_flight >= 1
+
+    file_names = iter(file_names)
+    with ProcessPoolExecutor(workers,initializer = _init_worker,initargs = (token_re_func,token_dfa,skip_blank)) as executor:
+        in_flight = set()
+        exhausted = False
+        while True:
+            while exhausted == False and len(in_flight) < max_in_flight:
+                file_name = next(file_names,None)
+                if file_name is None:
+                    exhausted = True
+                    break
+                in_flight.add(executor.submit(_lex_file,file_name))
+            if len(in_flight) == 0:
+                break
+            done,in_flight = wait(in_flight,return_when = FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -1,36 +1,24 @@
-from lexer_shared_var import *
+"""
+Token rules of C--: (token_name, regex, func).
 
-def func_endline():
-    set_global_value('line_no',get_global_value('line_no')+1)
+'func' is called with the lexer right after its token is matched, the lexer's
+'read_ptr' is then just behind the token. Lines are not counted while lexing, the
+tokens resolve them from their offsets.
+"""
 
-def func_single_line_comment():
-    c = get_lexer_input_ch()
-    while c != None and c != '\n':
-        c = get_lexer_input_ch()
-    pass
+def func_single_line_comment(lexer):
+    lexer.skip_past('\n')
 
-def func_multiline_comment():
-    c = get_lexer_input_ch()
-    state = 0;
-    while True:
-        if state == 0:
-            if c == '*':
-                state = 1
-        
-        elif state == 1:
-            if c == '/':
-                break
-            else:
-                state = 0
-        c = get_lexer_input_ch()
+def func_multiline_comment(lexer):
+    lexer.skip_past('*/')
     
 
 cmm_token_re_func = [
-        ("ENDLINE","\r\n|\n",func_endline),
+        ("ENDLINE","\r\n|\n",None),
         ("TAB","\t",None),
         ("BLANK"," ",None),
         ("SINGLE_LINE_COMMENT","//",func_single_line_comment),
-        ("MULTILINE_COMMENT","/\*",func_multiline_comment),
+        ("MULTILINE_COMMENT","/\\*",func_multiline_comment),
         ("TYPE", "int|float",None),
         ("INT", "0|((1|2|3|4|5|6|7|8|9)(0|1|2|3|4|5|6|7|8|9)*)",None),
         ("SEMI", ";",None),
@@ -60,4 +48,4 @@ cmm_token_re_func = [
 ]
 
 if __name__ == '__main__':
-    pass
\ No newline at end of file
+    pass
@@ -0,0 +1,215 @@
+import os
+import sys
+from bisect import bisect_left,bisect_right
+from typing import List,Tuple,Callable
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cmm_define import cmm_token_re_func
+from token_dfa import TokenDFA
+from scanner import Lexer,get_token_dfa
+from line_index import LineIndex
+from myToken.my_token import Token
+
+class _Shift:
+    """Offset delta not yet added to the tokens from the gap on.
+    """
+    __slots__ = ('delta',)
+
+    def __init__(self,delta:int = 0) -> None:
+        self.delta = delta
+
+class IncrementalLexer:
+    """Lexer for an edited source buffer.
+
+    Besides the tokens, the lexer keeps for each token its start offset, the end of
+    the input it consumed (including what its callback skipped) and its scan end,
+    one past the last character examined while matching it.
+
+    After an edit, scanning restarts at the first token whose scan end reaches
+    the edit (found by bisecting the running maximum of the scan ends: a token's
+    lookahead can reach past the scan ends of later tokens), and stops as soon as a token boundary after the edit coincides with
+    a shifted old boundary: every token starts in the start state of the DFA, so
+    from there on the old tokens are reused.
+    Characters no rule matches become 'ERROR' tokens instead of stopping the lexer.
+
+    The reused tokens are not rewritten: the offsets of the tokens from the gap (the end
+    of the last re-lexed range) on are stored without the delta of the edits since, which
+    is added when they are read, as for the newlines of the LineIndex, updated in place.
+    An edit costs the re-lexed tokens plus the tokens between it and the previous edit, or
+    those after it if fewer.
+    """
+    def __init__(self,token_re_func:List[Tuple[str,str,Callable]] = cmm_token_re_func,token_dfa:TokenDFA = None) -> None:
+        self.__token_re_func = token_re_func
+        self.__token_dfa = token_dfa if token_dfa is not None else get_token_dfa(token_re_func)
+        self.__input_str = ''
+        self.__line_index = LineIndex('')
+        self.__tokens = []
+        self.__starts = []
+        self.__ends = []
+        self.__scan_ends = []
+        self.__scan_maxes = [] # running maximum of __scan_ends
+        self.__gap = 0 # offsets from the gap on are shifted by __shift.delta
+        self.__shift = _Shift()
+        self.__changed = (0,0,0)
+
+    def __lexer(self)->Lexer:
+        return Lexer(self.__input_str,self.__token_re_func,self.__token_dfa,line_index = self.__line_index)
+
+    def lex(self,input_str:str)->List[Token]:
+        """Lex the whole input.
+        """
+        self.__input_str = input_str
+        self.__line_index = LineIndex(input_str)
+        self.__tokens = []
+        self.__starts = []
+        self.__ends = []
+        self.__scan_ends = []
+        self.__scan_maxes = []
+        self.__gap = 0
+        self.__shift = shift = _Shift()
+        running = 0
+        for token,start,end,scan_end in self.__lexer().scan(0):
+            token._shift = shift
+            self.__tokens.append(token)
+            self.__starts.append(start)
+            self.__ends.append(end)
+            self.__scan_ends.append(scan_end)
+            if scan_end > running:
+                running = scan_end
+            self.__scan_maxes.append(running)
+        self.__changed = (0,0,len(self.__tokens))
+        return self.__tokens
+
+    def edit(self,begin:int,end:int,new_str:str)->List[Token]:
+        """Replace input_str[begin:end] with 'new_str' and re-lex the affected tokens.
+
+        Args:
+            begin (int): start offset of the replaced range.
+            end (int): end offset of the replaced range.
+            new_str (str): replacement.
+
+        Returns:
+            List[Token]: all tokens of the edited input.
+        """
+        assert 0 <= begin <= end <= len(self.__input_str)
+        old_input_str = self.__input_str
+        self.__input_str = old_input_str[:begin] + new_str + old_input_str[end:]
+        self.__line_index.replace(begin,end,new_str)
+        delta = len(new_str) - (end - begin)
+        new_end = begin + len(new_str)
+        starts = self.__starts
+
+        # Restart at the first token whose scan reached the edit, at the last token
+        # for an edit at the end of the input.
+        first = min(self.__bisect(self.__scan_maxes,begin,bisect_right),len(self.__tokens)-1)
+        if first < 0:
+            first = 0
+        restart = self.__offset(starts,first) if first < len(self.__tokens) else 0
+
+        # Old tokens starting after the edit are candidates for reuse.
+        j = self.__bisect(starts,end,bisect_left)
+        new_tokens = []
+        new_starts = []
+        new_ends = []
+        new_scan_ends = []
+        reuse = len(self.__tokens)
+        for token,start,token_end,scan_end in self.__lexer().scan(restart):
+            if start >= new_end:
+                old_start = start - delta
+                while j < len(starts) and self.__offset(starts,j) < old_start:
+                    j += 1
+                if j < len(starts) and self.__offset(starts,j) == old_start:
+                    # Resynchronized with the old token stream.
+                    reuse = j
+                    break
+            new_tokens.append(token)
+            new_starts.append(start)
+            new_ends.append(token_end)
+            new_scan_ends.append(scan_end)
+
+        # The re-lexed tokens end at the gap, the reused ones after it move with the shift.
+        self.__move_gap(reuse)
+        self.__tokens[first:reuse] = new_tokens
+        starts[first:reuse] = new_starts
+        self.__ends[first:reuse] = new_ends
+        self.__scan_ends[first:reuse] = new_scan_ends
+        self.__scan_maxes[first:reuse] = new_scan_ends
+        self.__gap = first + len(new_tokens)
+        self.__shift.delta += delta
+        self.__update_scan_maxes(first)
+        self.__changed = (first,reuse,first+len(new_tokens))
+        return self.__tokens
+
+    def __offset(self,offsets:list,i:int)->int:
+        return offsets[i] + self.__shift.delta if i >= self.__gap else offsets[i]
+
+    def __bisect(self,offsets:list,offset:int,bisect:Callable)->int:
+        """Bisect the non-decreasing offsets, the stored ones from the gap on are shifted.
+        """
+        gap = self.__gap
+        i = bisect(offsets,offset,0,gap)
+        if i < gap:
+            return i
+        return bisect(offsets,offset - self.__shift.delta,gap)
+
+    def __move_gap(self,gap:int):
+        """Move the gap to token 'gap', adding the shift to the offsets it passes over or
+        taking it out of them.
+        """
+        shift = self.__shift
+        delta = shift.delta
+        old_gap = self.__gap
+        tokens = self.__tokens
+        if delta != 0:
+            low,high,sign = (old_gap,gap,1) if gap > old_gap else (gap,old_gap,-1)
+            for offsets in (self.__starts,self.__ends,self.__scan_ends,self.__scan_maxes):
+                offsets[low:high] = [offset + sign*delta for offset in offsets[low:high]]
+        if gap - old_gap > len(tokens) - gap:
+            # fewer tokens after the gap: they get a new shift, the old one no longer changes
+            self.__shift = shift = _Shift(delta)
+            for token in tokens[gap:]:
+                token._shift = shift
+        else:
+            for token in tokens[old_gap:gap]:
+                token.offset = token.offset
+        for token in tokens[gap:old_gap]:
+            token._offset = token.offset - delta
+            token._shift = shift
+        self.__gap = gap
+
+    def __update_scan_maxes(self,first:int):
+        """Recompute the running maximum of the scan ends from token 'first' on. Past the gap
+        it is only recomputed until it meets the shifted old maximum, which it follows from there.
+        """
+        scan_ends = self.__scan_ends
+        scan_maxes = self.__scan_maxes
+        gap = self.__gap
+        delta = self.__shift.delta
+        running = scan_maxes[first-1] if first > 0 else 0
+        for i in range(first,gap):
+            if scan_ends[i] > running:
+                running = scan_ends[i]
+            scan_maxes[i] = running
+        for i in range(gap,len(scan_ends)):
+            if scan_ends[i] + delta > running:
+                running = scan_ends[i] + delta
+            if scan_maxes[i] + delta == running:
+                break
+            scan_maxes[i] = running - delta
+
+    def changed(self)->Tuple[int,int,int]:
+        """Describe the last lex/edit: (first, old_end, new_end).
+
+        Tokens [first, old_end) of the previous token list were replaced by tokens [first, new_end).
+        """
+        return self.__changed
+
+    def tokens(self)->List[Token]:
+        return self.__tokens
+
+    def token_offsets(self)->List[int]:
+        delta = self.__shift.delta
+        return self.__starts[:self.__gap] + [start + delta for start in self.__starts[self.__gap:]]
+
+    def input_str(self)->str:
+        return self.__input_str
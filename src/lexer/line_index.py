@@ -0,0 +1,90 @@
+from array import array
+from bisect import bisect_left
+from typing import Tuple
+
+class LineIndex:
+    """Newline offsets of an input (str, bytes or mmap), built with one pass of 'find'.
+
+    Offsets are resolved to lines and columns by bisection. Lines and columns start at 1,
+    a newline character belongs to the line it ends.
+
+    'replace' keeps the index up to date with an edited input in time proportional to the
+    replacement and to the distance from the previous edit: the newlines from the last edit
+    on (the gap) are stored without the shift of the edits since, it is added when read.
+    """
+    def __init__(self,source) -> None:
+        newline = '\n' if isinstance(source,str) else b'\n'
+        newlines = array('I')
+        find = source.find
+        i = find(newline)
+        while i >= 0:
+            newlines.append(i)
+            i = find(newline,i+1)
+        self.__newlines = newlines
+        self.__length = len(source)
+        self.__gap = len(newlines) # newlines from the gap on are shifted by __delta
+        self.__delta = 0
+
+    def __index(self,offset:int)->int:
+        """Index of the first newline at or after offset.
+        """
+        newlines = self.__newlines
+        gap = self.__gap
+        if self.__delta == 0:
+            return bisect_left(newlines,offset)
+        if gap > 0 and newlines[gap-1] >= offset:
+            return bisect_left(newlines,offset,0,gap)
+        return bisect_left(newlines,offset - self.__delta,gap)
+
+    def __newline(self,i:int)->int:
+        return self.__newlines[i] + self.__delta if i >= self.__gap else self.__newlines[i]
+
+    def __move_gap(self,gap:int):
+        newlines = self.__newlines
+        delta = self.__delta
+        for i in range(self.__gap,gap):
+            newlines[i] += delta
+        for i in range(gap,self.__gap):
+            newlines[i] -= delta
+        self.__gap = gap
+
+    def line_count(self)->int:
+        return len(self.__newlines) + 1
+
+    def line(self,offset:int)->int:
+        return self.__index(offset) + 1
+
+    def line_col(self,offset:int)->Tuple[int,int]:
+        """Get (line, column) of an offset.
+        """
+        i = self.__index(offset)
+        line_start = self.__newline(i-1) + 1 if i > 0 else 0
+        return (i + 1,offset - line_start + 1)
+
+    def line_start(self,line:int)->int:
+        """Get the offset of the first character of a line.
+        """
+        assert 1 <= line <= self.line_count()
+        return self.__newline(line-2) + 1 if line > 1 else 0
+
+    def replace(self,begin:int,end:int,new_str):
+        """Update the index for the input with input[begin:end] replaced by 'new_str'.
+        """
+        assert 0 <= begin <= end <= self.__length
+        if self.__newlines.typecode == 'I':
+            # shifted offsets may be negative
+            self.__newlines = array('q',self.__newlines)
+        first = self.__index(begin)
+        last = self.__index(end)
+        self.__move_gap(last)
+        newline = '\n' if isinstance(new_str,str) else b'\n'
+        inserted = array('q')
+        i = new_str.find(newline)
+        while i >= 0:
+            inserted.append(begin + i)
+            i = new_str.find(newline,i+1)
+        self.__newlines[first:last] = inserted
+        self.__gap = first + len(inserted)
+        delta = len(new_str) - (end - begin)
+        self.__delta += delta
+        self.__length += delta
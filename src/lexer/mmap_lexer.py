@@ -0,0 +1,60 @@
+import os
+import re
+import sys
+import mmap
+from typing import List,Tuple,Callable
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cmm_define import cmm_token_re_func
+from token_dfa import TokenDFA
+from scanner import Lexer,get_token_dfa
+from myToken.my_token import SpanToken
+
+class MmapLexer(Lexer):
+    """Lexer running the token DFA directly over the bytes of a memory-mapped file.
+
+    The file is never decoded as a whole: bytes are mapped to character classes
+    with a 256-entry table and tokens are 'SpanToken's holding offset and length,
+    their lexemes are decoded lazily. Only ASCII bytes can be part of a token.
+    Close the lexer (or use it in a 'with' block) after the lexemes are read.
+    """
+    _blank_re = re.compile(b'[ \t]+')
+    _blank_chars = b' \t'
+
+    def __init__(self,file_name:str,token_re_func:List[Tuple[str,str,Callable]] = cmm_token_re_func,
+                 token_dfa:TokenDFA = None,skip_blank = False) -> None:
+        self.__token_dfa = token_dfa if token_dfa is not None else get_token_dfa(token_re_func)
+        self.__file = open(file_name,'rb')
+        if os.fstat(self.__file.fileno()).st_size > 0:
+            buffer = mmap.mmap(self.__file.fileno(),0,access = mmap.ACCESS_READ)
+        else:
+            buffer = b''
+        super().__init__(buffer,token_re_func,self.__token_dfa,skip_blank)
+
+    def _match(self,begin:int)->Tuple[int,int,int]:
+        return self.__token_dfa.match_bytes(self.input_str,begin)
+
+    def _new_token(self,token_id:str,start:int,end:int):
+        return SpanToken(token_id,start,end-start,None,self.input_str,line_index = self.line_index())
+
+    def skip_past(self,s:str):
+        i = self.input_str.find(s.encode(),self.read_ptr)
+        self.read_ptr = len(self.input_str) if i < 0 else i + len(s.encode())
+
+    def input_ch(self):
+        if self.read_ptr < len(self.input_str):
+            ch = chr(self.input_str[self.read_ptr])
+            self.read_ptr += 1
+            return ch
+        return None
+
+    def close(self):
+        if isinstance(self.input_str,mmap.mmap):
+            self.input_str.close()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
@@ -0,0 +1,155 @@
+import os
+import re
+import sys
+import threading
+from typing import List,Tuple,Callable,Iterator
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cmm_define import cmm_token_re_func
+from token_dfa import TokenDFA,compile_token_dfa
+from line_index import LineIndex
+from myToken.my_token import Token,TokenBuffer,token_kind
+
+_token_dfa_cache = dict()
+_token_dfa_lock = threading.Lock()
+
+def get_token_dfa(token_re_func:List[Tuple[str,str,Callable]] = cmm_token_re_func)->TokenDFA:
+    """Get the compiled TokenDFA of the token rules, it is compiled once per rule list.
+    """
+    with _token_dfa_lock:
+        key = id(token_re_func)
+        if key not in _token_dfa_cache:
+            _token_dfa_cache[key] = (token_re_func,compile_token_dfa(token_re_func))
+        return _token_dfa_cache[key][1]
+
+class Lexer:
+    """Re-entrant lexer, each instance owns its input buffer and cursor.
+
+    Token callbacks get the lexer, they may move 'read_ptr' (e.g. with 'skip_past').
+    Tokens keep their start offset, their lines are resolved from the newline index
+    of the input (see 'line_index') when read. Compiled token DFAs are shared and
+    read-only, so lexers can run in parallel threads.
+    Characters no rule matches become 'ERROR' tokens.
+    """
+    _blank_re = re.compile('[ \t]+')
+    _blank_chars = ' \t'
+
+    def __init__(self,input_str:str = '',token_re_func:List[Tuple[str,str,Callable]] = cmm_token_re_func,
+                 token_dfa:TokenDFA = None,skip_blank = False,line_index:LineIndex = None) -> None:
+        """
+        Args:
+            input_str (str, optional): input to lex. Defaults to ''.
+            token_re_func (optional): token rules. Defaults to cmm_token_re_func.
+            token_dfa (TokenDFA, optional): compiled rules. Defaults to the shared one of token_re_func.
+            skip_blank (bool, optional): skip runs of blanks and tabs without making tokens. Defaults to False.
+            line_index (LineIndex, optional): newline index of input_str. Defaults to one built on first use.
+        """
+        self.input_str = input_str
+        self.read_ptr = 0
+        self.__token_re_func = token_re_func
+        self.__token_dfa = token_dfa if token_dfa is not None else get_token_dfa(token_re_func)
+        self.__skip_blank = skip_blank
+        self.__line_index = line_index
+
+    @classmethod
+    def from_file(cls,file_name:str,**kwargs):
+        with open(file_name) as f:
+            return cls(f.read(),**kwargs)
+
+    def skip_past(self,s:str):
+        """Move 'read_ptr' behind the next occurrence of s, or to the end of the input.
+        """
+        i = self.input_str.find(s,self.read_ptr)
+        self.read_ptr = len(self.input_str) if i < 0 else i + len(s)
+
+    def line_index(self)->LineIndex:
+        """Get the newline index of the input, built on first use.
+        """
+        if self.__line_index is None:
+            self.__line_index = LineIndex(self.input_str)
+        return self.__line_index
+
+    def line_col(self,offset:int)->Tuple[int,int]:
+        """Get (line, column) of an offset of the input.
+        """
+        return self.line_index().line_col(offset)
+
+    def input_ch(self):
+        """Read one character, None at the end of the input.
+        """
+        if self.read_ptr < len(self.input_str):
+            ch = self.input_str[self.read_ptr]
+            self.read_ptr += 1
+            return ch
+        return None
+
+    def _match(self,begin:int)->Tuple[int,int,int]:
+        return self.__token_dfa.match(self.input_str,begin)
+
+    def _new_token(self,token_id:str,start:int,end:int):
+        return Token(token_id,self.input_str[start:end],None,None,start,self.line_index())
+
+    def scan(self,begin:int = 0)->Iterator[Tuple[Token,int,int,int]]:
+        """Lex from 'begin' to the end of the input.
+
+        Yields:
+            (token, start, end, scan end): 'end' includes what the callback skipped, 'scan end' is
+            one past the last character examined, or len(input_str)+1 if the scan reached the end.
+        """
+        return self.__scan(begin,self._new_token)
+
+    def fill_token_buffer(self,token_buffer:TokenBuffer = None)->TokenBuffer:
+        """Lex the whole input into a columnar TokenBuffer, without making Token objects.
+
+        Args:
+            token_buffer (TokenBuffer, optional): buffer to append to. Defaults to a new one over the input.
+        """
+        if token_buffer is None:
+            token_buffer = TokenBuffer(self.input_str,self.line_index())
+        append = token_buffer.append
+        def new_token(token_id,start,end):
+            append(token_kind(token_id),start,end-start)
+        for _ in self.__scan(0,new_token):
+            pass
+        return token_buffer
+
+    def __scan(self,begin:int,new_token:Callable):
+        input_str = self.input_str
+        length = len(input_str)
+        match = self._match
+        token_names = self.__token_dfa.token_names
+        token_re_func = self.__token_re_func
+        blank_match = self._blank_re.match
+        blank_chars = self._blank_chars
+        skip_blank = self.__skip_blank
+        self.read_ptr = begin
+        while self.read_ptr < length:
+            start = self.read_ptr
+            if skip_blank == True and input_str[start] in blank_chars:
+                self.read_ptr = blank_match(input_str,start).end()
+                continue
+            end,rule,scan_end = match(start)
+            if end < 0:
+                self.read_ptr = start + 1
+                yield (new_token('ERROR',start,start+1),start,start+1,scan_end)
+                continue
+            token = new_token(token_names[rule],start,end)
+            self.read_ptr = end
+            func = token_re_func[rule][2]
+            if func is not None:
+                func(self)
+                end = self.read_ptr
+                scan_end = max(scan_end,end if end < length else length+1)
+            yield (token,start,end,scan_end)
+
+    def next_token(self):
+        """Get the next token from 'read_ptr', None at the end of the input.
+        """
+        for token,start,end,scan_end in self.scan(self.read_ptr):
+            return token
+        return None
+
+    def recognize_token(self)->List[Token]:
+        """Lex the whole input.
+        """
+        return [token for token,start,end,scan_end in self.scan()]
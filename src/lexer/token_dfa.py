@@ -0,0 +1,159 @@
+import os
+import sys
+from array import array
+from typing import List,Tuple,Callable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from automata.NFA import NFA
+
+class TokenDFA:
+    """All token rules compiled into one table-driven DFA.
+
+    Characters are mapped to classes (class 0 stands for characters not used by
+    any rule), and 'transitions[state*class_num+cls]' is the next state or -1.
+    'accept[state]' is the index of the first rule accepting in that state or -1,
+    so a longest match resolves ties by rule order.
+    Only plain lists/arrays are kept, which makes the object small to pickle.
+    """
+    def __init__(self,token_names:List[str],char_class:dict,class_num:int,transitions:array,accept:array) -> None:
+        self.token_names = token_names
+        self.char_class = char_class
+        self.class_num = class_num
+        self.transitions = transitions
+        self.accept = accept
+        # classes of bytes, only ASCII characters are matched on bytes
+        self.byte_class = array('i',[char_class.get(chr(b),0) if b < 128 else 0 for b in range(0,256)])
+
+    def states_num(self)->int:
+        return len(self.accept)
+
+    def match(self,input_str:str,begin:int)->Tuple[int,int,int]:
+        """Find the longest token starting at 'begin'.
+
+        Returns:
+            Tuple[int,int,int]: (end, rule index, scan end).
+            'end' is -1 if no rule matches. 'scan end' is one past the last character examined,
+            or len(input_str)+1 if the scan reached the end of the input.
+        """
+        char_class = self.char_class
+        transitions = self.transitions
+        accept = self.accept
+        class_num = self.class_num
+        length = len(input_str)
+        state = 0
+        last_end = -1
+        last_token = -1
+        i = begin
+        while i < length:
+            state = transitions[state*class_num+char_class.get(input_str[i],0)]
+            if state < 0:
+                return (last_end,last_token,i+1)
+            i += 1
+            if accept[state] >= 0:
+                last_end = i
+                last_token = accept[state]
+        return (last_end,last_token,length+1)
+
+    def match_bytes(self,buffer,begin:int)->Tuple[int,int,int]:
+        """Same as 'match', on a bytes-like buffer (bytes, mmap...).
+        """
+        byte_class = self.byte_class
+        transitions = self.transitions
+        accept = self.accept
+        class_num = self.class_num
+        length = len(buffer)
+        state = 0
+        last_end = -1
+        last_token = -1
+        i = begin
+        while i < length:
+            state = transitions[state*class_num+byte_class[buffer[i]]]
+            if state < 0:
+                return (last_end,last_token,i+1)
+            i += 1
+            if accept[state] >= 0:
+                last_end = i
+                last_token = accept[state]
+        return (last_end,last_token,length+1)
+
+def compile_token_dfa(token_re_func:List[Tuple[str,str,Callable]])->TokenDFA:
+    """Compile the token rules '(token_name, regex, func)' into a TokenDFA.
+
+    Each regex is converted to a DFA, then the product of all the DFAs is explored
+    from the tuple of start states, dropping components that can no longer accept.
+    """
+    components = []
+    alphabet = set()
+    for token_name,re,func in token_re_func:
+        d = NFA().regex_to_NFA(re,new_copy = True).to_DFA()
+        moves = {q:dict() for q in d.Q()}
+        for q,deltas in d.deltas().items():
+            for ch,p in deltas:
+                moves[q][ch] = p
+        finish = d.finish_states()
+        # live states: states that can reach a finish state
+        reverse = {q:set() for q in moves}
+        for q,q_moves in moves.items():
+            for p in q_moves.values():
+                reverse[p].add(q)
+        live = set(finish)
+        st = list(finish)
+        while len(st) != 0:
+            p = st.pop()
+            for q in reverse[p]:
+                if q not in live:
+                    live.add(q)
+                    st.append(q)
+        components.append((moves,finish,live,d.q0()))
+        alphabet |= d.alphabet()
+
+    chars = sorted(alphabet)
+    start = tuple(q0 if q0 in live else None for moves,finish,live,q0 in components)
+    state_idx = {start:0}
+    product_states = [start]
+    columns = {ch:[] for ch in chars}
+    accept = array('i')
+    i = 0
+    while i < len(product_states):
+        state = product_states[i]
+        token = -1
+        for k,q in enumerate(state):
+            if q is not None and q in components[k][1]:
+                token = k
+                break
+        accept.append(token)
+        for ch in chars:
+            next_state = []
+            for k,q in enumerate(state):
+                p = None
+                if q is not None:
+                    p = components[k][0][q].get(ch)
+                    if p not in components[k][2]:
+                        p = None
+                next_state.append(p)
+            next_state = tuple(next_state)
+            if all(p is None for p in next_state):
+                columns[ch].append(-1)
+                continue
+            if next_state not in state_idx:
+                state_idx[next_state] = len(product_states)
+                product_states.append(next_state)
+            columns[ch].append(state_idx[next_state])
+        i += 1
+
+    # Characters with identical columns share a class, class 0 is the all-error column.
+    states_num = len(product_states)
+    class_of_column = {tuple([-1]*states_num):0}
+    class_columns = [[-1]*states_num]
+    char_class = dict()
+    for ch in chars:
+        column = tuple(columns[ch])
+        if column not in class_of_column:
+            class_of_column[column] = len(class_columns)
+            class_columns.append(column)
+        char_class[ch] = class_of_column[column]
+    class_num = len(class_columns)
+    transitions = array('i',[-1]*(states_num*class_num))
+    for cls,column in enumerate(class_columns):
+        for state in range(0,states_num):
+            transitions[state*class_num+cls] = column[state]
+    return TokenDFA([token_name for token_name,re,func in token_re_func],char_class,class_num,transitions,accept)
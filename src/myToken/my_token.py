@@ -1,23 +1,183 @@
+import threading
+from array import array
+from typing import List,Iterator
+
+# token kinds are interned: each token id is mapped once to a small int
+_kind_of_id = dict()
+_id_of_kind = list()
+_kind_lock = threading.Lock()
+
+def token_kind(token_id)->int:
+    """Get the interned integer kind of a token id, registering it on first use.
+
+    Lookups take no lock, registrations are serialized so concurrent lexers agree on the kinds.
+    """
+    kind = _kind_of_id.get(token_id)
+    if kind is None:
+        with _kind_lock:
+            kind = _kind_of_id.get(token_id)
+            if kind is None:
+                kind = len(_id_of_kind)
+                # the id is readable before the kind is published
+                _id_of_kind.append(token_id)
+                _kind_of_id[token_id] = kind
+    return kind
+
+def token_id(kind:int):
+    """Get the token id of an interned integer kind.
+    """
+    return _id_of_kind[kind]
+
 class Token:
-    def __init__(self,token_id = None,token_lexeme = None,token_line = None,attr = None) -> None:
-        self.id = token_id
+    """Token with an interned integer kind, 'id' gives the token id (e.g. 'ID', 'SEMI').
+
+    A lexed token keeps its start offset and the line index of its input (anything with
+    line(offset), e.g. a LineIndex), and 'line' is resolved from them when read. A line
+    given to the constructor or assigned is kept as is.
+
+    An incremental lexer may set '_shift', an object whose 'delta' is added to the stored
+    offset, to move all the tokens after an edit at once.
+    """
+    __slots__ = ('kind','lexeme','_offset','attr','_line','_line_index','_shift')
+
+    def __init__(self,token_id = None,token_lexeme = None,token_line = None,attr = None,offset:int = None,line_index = None) -> None:
+        self.kind = token_kind(token_id)
         self.lexeme = token_lexeme
-        self.line = token_line
+        self._offset = offset
         self.attr = attr
-        pass
-    
+        self._line = token_line
+        self._line_index = line_index
+        self._shift = None
+
+    @property
+    def offset(self):
+        if self._shift is not None:
+            return self._offset + self._shift.delta
+        return self._offset
+
+    @offset.setter
+    def offset(self,offset):
+        self._offset = offset
+        self._shift = None
+
+    @property
+    def id(self):
+        return _id_of_kind[self.kind]
+
+    @id.setter
+    def id(self,token_id):
+        self.kind = token_kind(token_id)
+
+    @property
+    def line(self):
+        if self._line is None and self._line_index is not None:
+            return self._line_index.line(self.offset)
+        return self._line
+
+    @line.setter
+    def line(self,line):
+        self._line = line
+
     def set_attr(self,attr):
         self.attr = attr
 
+    def __reduce__(self):
+        # kinds are only valid in this process, pickle the token id; the line is resolved
+        return (Token,(self.id,self.lexeme,self.line,self.attr,self.offset))
+
     def __repr__(self) -> str:
         return f'[ Token ID : {self.id} '\
                f'Token Lexeme : {self.lexeme} '\
                f'Token Line : {self.line} ]'
-        
-        pass
 
-def func():
-    pass
+class SpanToken:
+    """Token referring to its lexeme in the source buffer by offset and length.
+
+    The lexeme is only decoded when accessed, so the buffer (e.g. an mmap) must stay open until then.
+    The line is resolved from 'line_index' as for 'Token'.
+    """
+    __slots__ = ('kind','offset','length','attr','_line','_line_index','_buffer')
+
+    def __init__(self,token_id,offset:int,length:int,token_line = None,buffer = None,attr = None,line_index = None) -> None:
+        self.kind = token_kind(token_id)
+        self.offset = offset
+        self.length = length
+        self.attr = attr
+        self._line = token_line
+        self._line_index = line_index
+        self._buffer = buffer
+
+    @property
+    def id(self):
+        return _id_of_kind[self.kind]
+
+    @property
+    def lexeme(self)->str:
+        return _decode(self._buffer[self.offset:self.offset+self.length])
+
+    line = Token.line
+
+    def set_attr(self,attr):
+        self.attr = attr
+
+    def __reduce__(self):
+        return (Token,(self.id,self.lexeme,self.line,self.attr,self.offset))
+
+    def __repr__(self) -> str:
+        return f'[ Token ID : {self.id} '\
+               f'Token Lexeme : {self.lexeme} '\
+               f'Token Line : {self.line} ]'
+
+def _decode(lexeme)->str:
+    return lexeme if isinstance(lexeme,str) else bytes(lexeme).decode('utf-8','replace')
+
+class TokenBuffer:
+    """Columnar token storage: parallel arrays of kind, start offset and length.
+
+    Lexemes stay in the source (str, bytes or mmap), indexing builds a 'Token' view on demand.
+    Lines are resolved from the start offsets with 'line_index', an object with line(offset)
+    such as the LineIndex of the source.
+    """
+    def __init__(self,source = '',line_index = None) -> None:
+        self.source = source
+        self.line_index = line_index
+        self.kinds = array('I')
+        self.starts = array('I')
+        self.lengths = array('I')
+
+    def append(self,kind:int,start:int,length:int):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def id(self,i:int):
+        return _id_of_kind[self.kinds[i]]
+
+    def lexeme(self,i:int)->str:
+        start = self.starts[i]
+        return _decode(self.source[start:start+self.lengths[i]])
+
+    def line(self,i:int)->int:
+        return self.line_index.line(self.starts[i])
+
+    def __getitem__(self,i):
+        if isinstance(i,slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        token = Token.__new__(Token)
+        token.kind = self.kinds[i]
+        token.lexeme = self.lexeme(i)
+        token.offset = self.starts[i]
+        token.attr = None
+        token._line = None
+        token._line_index = self.line_index
+        return token
+
+    def __iter__(self) -> Iterator[Token]:
+        for i in range(0,len(self)):
+            yield self[i]
 
-if __name__ == '__main__':
-    t = Token()
+    def tokens(self)->List[Token]:
+        return list(self)
@@ -1,7 +1,7 @@
 import os
 import sys
 import copy
-from typing import List
+from typing import List,Iterable
 from parser_shared_var import attr_list
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from myToken.my_token import Token
@@ -9,6 +9,8 @@ from automata.CFG import CFG,LL_1_parser
 class LL_1_parser_recognize_token(LL_1_parser):
     def __init__(self, input_CFG=None) -> None:
         super().__init__(input_CFG)
-    def parse_token(self):
-        print(super().__LL_1_analysis_table)
+    def parse_token(self,token_list:Iterable[Token])->bool:
+        """Parse tokens produced by the lexer, see 'LL_1_parser.parse_tokens'.
+        """
+        return self.parse_tokens(token_list)
     pass
@@ -0,0 +1,160 @@
+"""
+Differential testing: run a reference and a new engine on random strings and report
+the first input where they disagree, minimized.
+
+    python test/differential.py --pair to_DFA --strings 1000000 --workers 8
+    python test/differential.py --pair minimize --instances 20 --size 30
+
+Each pair builds its random instance from a seed in every worker process, so only seeds
+and strings ranges cross process boundaries.
+"""
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lexer')))
+from automata.NFA import NFA
+from automata import random_automata
+
+def pair_to_DFA(size:int,seed:int):
+    """NFA simulation against its subset construction DFA.
+    """
+    a = random_automata.random_nfa(size,'ab',seed = seed)
+    return a.run,a.to_DFA().run,'ab'
+
+def pair_minimize(size:int,seed:int):
+    """DFA against its minimized DFA.
+    """
+    d = random_automata.random_dfa(size,'ab',seed = seed)
+    return d.run,d.minimize(new_copy = True).run,'ab'
+
+def pair_token_dfa(size:int,seed:int):
+    """Regex NFA against the compiled token DFA of the lexer.
+    """
+    from token_dfa import compile_token_dfa
+    regex = random_automata.random_regex(size,'abc',seed = seed)
+    a = NFA()
+    a.regex_to_NFA(regex)
+    token_dfa = compile_token_dfa([('R',regex,None)])
+    def token_dfa_run(input_str:str)->bool:
+        if input_str == '':
+            # tokens are never empty, the empty string is not compared
+            return a.run(input_str)
+        end,rule,scan_end = token_dfa.match(input_str,0)
+        return end == len(input_str)
+    return a.run,token_dfa_run,'abc'
+
+pairs = {
+    'to_DFA':pair_to_DFA,
+    'minimize':pair_minimize,
+    'token_dfa':pair_token_dfa,
+}
+
+_engines = dict()
+
+def _get_engines(pair:str,size:int,seed:int):
+    key = (pair,size,seed)
+    if key not in _engines:
+        _engines[key] = pairs[pair](size,seed)
+    return _engines[key]
+
+def _diverges(engines,input_str:str)->bool:
+    old,new,alphabet = engines
+    return old(input_str) != new(input_str)
+
+def _check_chunk(pair:str,size:int,seed:int,chunk:int,count:int,max_length:int):
+    """Find the first diverging string of a chunk, None if there is none.
+    """
+    engines = _get_engines(pair,size,seed)
+    strings = random_automata.random_strings(engines[2],count,max_length,seed = (seed << 32) + chunk)
+    for input_str in strings:
+        if _diverges(engines,input_str):
+            return input_str
+    return None
+
+def minimize_input(diverges,input_str:str,alphabet:str)->str:
+    """Shrink a diverging input: drop chunks then single characters, and lower characters
+    to the first letter of the alphabet, while it still diverges.
+    """
+    alphabet = sorted(set(alphabet))
+    step = max(len(input_str) // 2,1)
+    while step >= 1:
+        i = 0
+        while i < len(input_str):
+            candidate = input_str[:i] + input_str[i+step:]
+            if diverges(candidate):
+                input_str = candidate
+            else:
+                i += step
+        step //= 2
+    for i in range(0,len(input_str)):
+        for ch in alphabet:
+            if ch >= input_str[i]:
+                break
+            candidate = input_str[:i] + ch + input_str[i+1:]
+            if diverges(candidate):
+                input_str = candidate
+                break
+    return input_str
+
+def differential(pair:str,size:int = 10,instances:int = 1,strings:int = 10000,max_length:int = 12,
+                 workers:int = None,chunk_size:int = 10000,seed:int = 0):
+    """Compare the engines of 'pair' on random instances and strings.
+
+    Args:
+        pair (str): a key of 'pairs'.
+        size (int): size of the random instances.
+        instances (int): number of random instances, with seeds seed, seed+1, ...
+        strings (int): random strings per instance.
+        max_length (int): maximum length of the random strings.
+        workers (int, optional): worker processes, None for os.cpu_count(), 1 runs in this process.
+
+    Returns:
+        None if the engines agree, else (instance seed, first diverging string, minimized string).
+    """
+    tasks = []
+    for instance_seed in range(seed,seed+instances):
+        for chunk in range(0,(strings + chunk_size - 1) // chunk_size):
+            count = min(chunk_size,strings - chunk*chunk_size)
+            tasks.append((pair,size,instance_seed,chunk,count,max_length))
+    if workers == 1:
+        results = (_check_chunk(*task) for task in tasks)
+        return _first_divergence(tasks,results,pair,size)
+    with ProcessPoolExecutor(workers) as executor:
+        # results come in task order, so the first divergence found is the first in order
+        results = executor.map(_check_chunk,*zip(*tasks)) if len(tasks) != 0 else []
+        divergence = _first_divergence(tasks,results,pair,size)
+        executor.shutdown(cancel_futures = True)
+        return divergence
+
+def _first_divergence(tasks,results,pair:str,size:int):
+    for task,input_str in zip(tasks,results):
+        if input_str is not None:
+            instance_seed = task[2]
+            engines = _get_engines(pair,size,instance_seed)
+            minimized = minimize_input(lambda s: _diverges(engines,s),input_str,engines[2])
+            return (instance_seed,input_str,minimized)
+    return None
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Differential testing of automata engines.')
+    parser.add_argument('--pair',choices = sorted(pairs),default = 'to_DFA')
+    parser.add_argument('--size',type = int,default = 10,help = 'size of the random instances')
+    parser.add_argument('--instances',type = int,default = 1)
+    parser.add_argument('--strings',type = int,default = 100000,help = 'random strings per instance')
+    parser.add_argument('--max-length',type = int,default = 12)
+    parser.add_argument('--workers',type = int,default = None)
+    parser.add_argument('--seed',type = int,default = 0)
+    args = parser.parse_args(argv)
+    divergence = differential(args.pair,args.size,args.instances,args.strings,args.max_length,
+                              args.workers,seed = args.seed)
+    if divergence is None:
+        print(f'{args.pair}: no divergence')
+        return 0
+    instance_seed,input_str,minimized = divergence
+    print(f'{args.pair}: instance seed {instance_seed} diverges on {input_str!r}, minimized {minimized!r}')
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
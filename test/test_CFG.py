@@ -1,7 +1,11 @@
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src.automata.CFG import CFG,LL_1_parser
+import tempfile
+import itertools
+from src.myToken.my_token import Token
+from src.automata.CFG import CFG,LL_1_parser,LALR_1_parser,CFG_FIRST_FOLLOW
+from automata.myException import AutomatonFormatException
 def test_func():
     pass
 def test_CFG1():
@@ -21,6 +25,213 @@ def test_CFG1():
     assert ll_1.parse('ab',True) == True
     assert ll_1.parse('aab',True) == False
 
+def test_FIRST_FOLLOW():
+    g = CFG()
+    g.set_variables({'E','E1','T','T1','F'})
+    g.set_terminals({'+','*','(',')','i'})
+    g.set_start_variable('E')
+    g.add_production('E',['T','E1'])
+    g.add_production('E1',['+','T','E1'])
+    g.add_production('E1',[g.epsilon()])
+    g.add_production('T',['F','T1'])
+    g.add_production('T1',['*','F','T1'])
+    g.add_production('T1',[g.epsilon()])
+    g.add_production('F',['(','E',')'])
+    g.add_production('F',['i'])
+
+    first_follow = CFG_FIRST_FOLLOW(g)
+    assert first_follow.first('E') == {'(','i'}
+    assert first_follow.first('E1') == {'+',g.epsilon()}
+    assert first_follow.first('T1') == {'*',g.epsilon()}
+    assert first_follow.follow('E') == {')','$'}
+    assert first_follow.follow('T') == {'+',')','$'}
+    assert first_follow.follow('F') == {'+','*',')','$'}
+
+    ll_1 = LL_1_parser(g)
+    ll_1.construct_LL_1_analysis_table()
+    assert ll_1.parse('i+i*i') == True
+    assert ll_1.parse('(i+i)*i') == True
+    assert ll_1.parse('i+*i') == False
+
+def test_LL_1_parse_tokens():
+    g = CFG()
+    g.set_variables({'S'})
+    g.set_terminals({'LP','RP'})
+    g.set_start_variable('S')
+    g.add_production('S',['LP','S','RP','S'])
+    g.add_production('S',[g.epsilon()])
+
+    ll_1 = LL_1_parser(g)
+    ll_1.construct_LL_1_analysis_table()
+    tokens = [Token(token_id,lexeme,1) for token_id,lexeme in [('LP','('),('LP','('),('RP',')'),('RP',')'),('LP','('),('RP',')')]]
+    assert ll_1.parse_tokens(tokens) == True
+    assert ll_1.parse_tokens(iter(tokens)) == True
+    assert ll_1.parse_tokens(tokens[:-1]) == False
+    assert ll_1.parse_tokens(tokens + [Token('ID','a',1)]) == False
+    assert ll_1.parse_tokens([]) == True
+
+def test_LALR_1():
+    # Expression grammar, it is left recursive so LL(1) can not handle it.
+    g = CFG()
+    g.set_variables({'E','T','F'})
+    g.set_terminals({'+','*','(',')','i'})
+    g.set_start_variable('E')
+    g.add_production('E',['E','+','T'])
+    g.add_production('E',['T'])
+    g.add_production('T',['T','*','F'])
+    g.add_production('T',['F'])
+    g.add_production('F',['(','E',')'])
+    g.add_production('F',['i'])
+
+    lalr_1 = LALR_1_parser(g)
+    lalr_1.construct_LALR_1_analysis_table()
+    assert lalr_1.parse('i+i*i') == True
+    assert lalr_1.parse(['(','i','+','i',')','*','i']) == True
+    assert lalr_1.parse('i+') == False
+    assert lalr_1.parse('i)') == False
+
+def test_LALR_1_not_SLR():
+    g = CFG()
+    g.set_variables({'S','L','R'})
+    g.set_terminals({'=','*','x'})
+    g.set_start_variable('S')
+    g.add_production('S',['L','=','R'])
+    g.add_production('S',['R'])
+    g.add_production('L',['*','R'])
+    g.add_production('L',['x'])
+    g.add_production('R',['L'])
+
+    lalr_1 = LALR_1_parser(g)
+    lalr_1.construct_LALR_1_analysis_table()
+    assert lalr_1.parse('*x=**x') == True
+    assert lalr_1.parse('x') == True
+    assert lalr_1.parse('=x') == False
+
+def test_LALR_1_action_and_table():
+    reduced = []
+    g = CFG()
+    g.set_variables({'S'})
+    g.set_terminals({'a','b'})
+    g.set_start_variable('S')
+    g.add_production('S',['a','S','b'],lambda: reduced.append('aSb'))
+    g.add_production('S',[g.epsilon()],lambda: reduced.append('ε'))
+
+    lalr_1 = LALR_1_parser(g)
+    lalr_1.construct_LALR_1_analysis_table()
+    assert lalr_1.parse('aabb',True) == True
+    assert reduced == ['ε','aSb','aSb']
+    assert lalr_1.parse('') == True
+    assert lalr_1.parse('aab') == False
+
+    with tempfile.TemporaryDirectory() as dir_name:
+        file_name = os.path.join(dir_name,'table')
+        lalr_1.save_table(file_name)
+        loaded = LALR_1_parser(g)
+        assert loaded.load_table(file_name) == True
+        assert loaded.parse('ab') == True
+        assert loaded.parse('abb') == False
+
+        # a table saved for another grammar is not loaded
+        g.add_production('S',['b'])
+        assert LALR_1_parser(g).load_table(file_name) == False
+        # neither is a file in another format
+        with open(file_name,'wb') as f:
+            f.write(b'\x80\x04not a table')
+        try:
+            loaded.load_table(file_name)
+            assert False
+        except AutomatonFormatException:
+            pass
+
+def test_remove_left_recursion():
+    g = CFG()
+    g.set_variables({'E','T','F'})
+    g.set_terminals({'+','*','(',')','i'})
+    g.set_start_variable('E')
+    g.add_production('E',['E','+','T'])
+    g.add_production('E',['T'])
+    g.add_production('T',['T','*','F'])
+    g.add_production('T',['F'])
+    g.add_production('F',['(','E',')'])
+    g.add_production('F',['i'])
+
+    lalr_1 = LALR_1_parser(g)
+    lalr_1.construct_LALR_1_analysis_table()
+    ll_1 = LL_1_parser(g.remove_left_recursion(new_copy = True))
+    ll_1.construct_LL_1_analysis_table()
+    for length in range(0,5):
+        for w in itertools.product('+*()i',repeat = length):
+            assert ll_1.parse_tokens(w) == lalr_1.parse(w)
+
+def test_left_factor():
+    g = CFG()
+    g.set_variables({'S','E'})
+    g.set_terminals({'i','t','e','a','b'})
+    g.set_start_variable('S')
+    g.add_production('S',['i','E','t','S'])
+    g.add_production('S',['i','E','t','e','S'])
+    g.add_production('S',['a'])
+    g.add_production('E',['b'])
+    g.left_factor()
+    assert len(g.variables()) == 3
+    assert len(g.productions()['S']) == 2
+
+    ll_1 = LL_1_parser(g)
+    ll_1.construct_LL_1_analysis_table()
+    assert ll_1.parse('ibtibta') == True
+    assert ll_1.parse('ibtea') == True
+    assert ll_1.parse('ibt') == False
+
+def test_clean_grammar():
+    g = CFG()
+    g.set_variables({'S','A','B','C'})
+    g.set_terminals({'a','b','c'})
+    g.set_start_variable('S')
+    g.add_production('S',['A'])
+    g.add_production('S',['C','a'])
+    g.add_production('A',['B'])
+    g.add_production('A',['a'])
+    g.add_production('A',[g.epsilon()])
+    g.add_production('B',['b'])
+    g.add_production('C',['C','c'])
+
+    g.remove_epsilon_productions()
+    assert g.start_variable() != 'S'
+    g.remove_unit_productions()
+    g.remove_useless_symbols()
+    assert g.variables() == {g.start_variable()}
+    assert g.terminals() == {'a','b'}
+
+    ll_1 = LL_1_parser(g)
+    ll_1.construct_LL_1_analysis_table()
+    assert ll_1.parse('') == True
+    assert ll_1.parse('a') == True
+    assert ll_1.parse('b') == True
+    assert ll_1.parse('c') == False
+
+def test_remove_epsilon_long_body():
+    # 2^20 combinations of the nullable variables if the body were expanded as a whole
+    n = 20
+    g = CFG()
+    g.set_variables({'S'} | {f'A{i}' for i in range(0,n)})
+    g.set_terminals({f'a{i}' for i in range(0,n)})
+    g.set_start_variable('S')
+    g.add_production('S',[f'A{i}' for i in range(0,n)])
+    for i in range(0,n):
+        g.add_production(f'A{i}',[f'a{i}'])
+        g.add_production(f'A{i}',[g.epsilon()])
+
+    h = g.remove_epsilon_productions(new_copy = True)
+    assert sum(len(body_list) for body_list in h.productions().values()) < 6*n
+    assert all(not production.is_epsilon() for var,body_list in h.productions().items()
+               for production in body_list if var != h.start_variable())
+
+    expected = LALR_1_parser(g)
+    expected.construct_LALR_1_analysis_table()
+    lalr_1 = LALR_1_parser(h)
+    lalr_1.construct_LALR_1_analysis_table()
+    for w in ([],['a0'],['a19'],['a3','a7','a19'],['a7','a3'],['a0','a0'],[f'a{i}' for i in range(0,n)]):
+        assert lalr_1.parse(w) == expected.parse(w)
 
 if __name__ == '__main__':
     test_CFG1()
\ No newline at end of file
@@ -3,6 +3,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import src.automata.DFA as DFA_SRC
 import src.automata.NFA as NFA_SRC
+from automata.myException import AutomatonValidationException
 
 
 def test_dfa1():
@@ -267,6 +268,54 @@ def test_difference():
     d6 = d5.difference(d1)
     assert d6.is_empty() == True
 
+def test_from_table():
+    d = DFA_SRC.DFA.from_table(['q0','q1'],'ab','q0',{'q1'},[['q1',None],['q1','q0']])
+    assert d.deltas() == {'q0':[('a','q1')],'q1':[('a','q1'),('b','q0')]}
+    assert d.run('aba') == True and d.run('ab') == False
+    e = DFA_SRC.DFA.from_table(['q0','q1'],{'a','b'},'q0',{'q1'},{'q0':{'a':'q1'},'q1':{'a':'q1','b':'q0'}})
+    assert e.is_equal(d)
+    try:
+        DFA_SRC.DFA.from_table(['q0','q0','q1'],'ab','q9',{'q2'},{'q0':{'c':'q1'},'q1':{'a':'q3','b':'q4'},'q5':{}})
+        assert False
+    except AutomatonValidationException as e:
+        assert len(e.errors) == 6
+        assert "'q3', 'q4'" in e.errors[-1]
+
+def mod_counter(p:int,letter:str = 'a'):
+    """Accepts the words whose number of 'letter' is a multiple of p.
+    """
+    states = [f'r{i}' for i in range(0,p)]
+    return DFA_SRC.DFA.from_table(states,'ab','r0',{'r0'},
+                                  [[states[(i+1)%p] if letter == 'a' else states[i],
+                                    states[(i+1)%p] if letter == 'b' else states[i]] for i in range(0,p)])
+
+def test_intersect_all():
+    mods = [mod_counter(p) for p in (2,3,5)]
+    for balanced in (False,True):
+        d = DFA_SRC.DFA.intersect_all(mods,balanced = balanced)
+        assert len(d.Q()) == 30
+        assert d.run('a'*30) == True and d.run('a'*15 + 'b') == False and d.run('') == True
+    d = DFA_SRC.DFA.intersect_all([mod_counter(2),mod_counter(3,'b')],minimize = False)
+    assert d.run('aabbb') == True and d.run('abbb') == False
+    # no word has an odd and an even number of 'a'
+    odd = DFA_SRC.DFA.from_table(['r0','r1'],'ab','r0',{'r1'},[['r1','r0'],['r0','r1']])
+    for balanced in (False,True):
+        e = DFA_SRC.DFA.intersect_all([mod_counter(7),odd,mod_counter(2)],balanced = balanced)
+        assert e.is_empty() == True and e.run('a') == False
+    three = [mod_counter(2),mod_counter(3,'b'),mod_counter(5)]
+    assert DFA_SRC.DFA.intersect_all(three).is_equal(three[0].intersection(three[1]).intersection(three[2]))
+
+def test_union_all():
+    d1 = DFA_SRC.DFA.from_table(['q0','q1'],'a','q0',{'q1'},[['q1'],[None]])
+    d2 = DFA_SRC.DFA.from_table(['q0','q1'],'b','q0',{'q1'},[['q1'],[None]])
+    d3 = mod_counter(3)
+    for balanced in (False,True):
+        u = DFA_SRC.DFA.union_all([d1,d2,d3],balanced = balanced)
+        assert u.alphabet() == {'a','b'}
+        for word,accepted in (('a',True),('b',True),('aaa',True),('ab',False),('aab',False),('bbb',True)):
+            assert u.run(word) == accepted
+        assert u.is_equal(d1.union(d2).union(d3))
+
 def test_all():
     test_dfa1()
     test_minimize()
@@ -284,6 +333,9 @@ def test_all():
     test_intersection2()
 
     test_difference()
+    test_from_table()
+    test_intersect_all()
+    test_union_all()
 
 if __name__ == '__main__':
     
@@ -2,6 +2,7 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import src.automata.NFA as NFA_SRC
+from automata.myException import AutomatonValidationException
 
 def test_nfa1():
     n = NFA_SRC.NFA()
@@ -127,6 +128,37 @@ def test_regex_to_NFA7():
     assert d.run('t0') == True
 
     d.draw()
+
+def test_epsilon_cycle():
+    # nested closures make epsilon cycles
+    n = NFA_SRC.NFA()
+    n.regex_to_NFA('((a(b)*)+)*',new_copy = False)
+    d = n.to_DFA().minimize(new_copy = True)
+    assert d.run('') == True
+    assert d.run('abbab') == True
+    assert d.run('ba') == False
+
+def test_from_edges():
+    n = NFA_SRC.NFA.from_edges(['q0','q1','q2'],'ab','q0',{'q2'},
+                               [('q0','a','q0'),('q0','b','q0'),('q0','a','q1'),('q1','b','q2'),('q2','ε','q0')])
+    assert n.deltas()['q0'] == [('a',{'q0','q1'}),('b',{'q0'})]
+    assert n.run('ab') == True and n.run('abab') == True and n.run('aba') == False
+    try:
+        NFA_SRC.NFA.from_edges(['q0'],{'a','ε'},'q0',set(),[('q0','c','q1'),('q1','a','q0')])
+        assert False
+    except AutomatonValidationException as e:
+        assert len(e.errors) == 4
+
+def test_add_delta_merge():
+    n = NFA_SRC.NFA()
+    n.set_alphabet({'a'})
+    n.add_states(['q0','q1','q2'])
+    targets = {'q1'}
+    n.add_delta('q0','a',targets)
+    n.add_delta('q0','a',{'q2'})
+    assert n.deltas()['q0'] == [('a',{'q1','q2'})]
+    assert targets == {'q1'}
+
 def test_all():
     test_nfa1()
     test_to_DFA()
@@ -137,6 +169,9 @@ def test_all():
     test_regex_to_NFA5()
     test_regex_to_NFA6()
     test_regex_to_NFA7()
+    test_epsilon_cycle()
+    test_from_edges()
+    test_add_delta_merge()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,74 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from automata.DFA import DFA
+from automata.NFA import NFA
+from automata import antichain
+from automata import random_automata
+
+def regex(r:str)->NFA:
+    n = NFA()
+    n.regex_to_NFA(r)
+    return n
+
+def accepts(a,word:str)->bool:
+    return all(c in a.alphabet() for c in word) and a.run(word)
+
+def test_inclusion():
+    a = regex('(a|b)*abb')
+    b = regex('(a|b)*b')
+    assert a.is_subset_of(b) == True and b.is_subset_of(a) == False
+    assert antichain.inclusion_counterexample(b,a) == 'b'
+    assert antichain.inclusion_counterexample(a,b) is None
+    # letters outside the alphabet of the larger automaton
+    assert antichain.inclusion_counterexample(regex('a|c'),regex('a*')) == 'c'
+    d = DFA.from_table(['q0','q1'],'ab','q0',{'q1'},[['q0','q1'],['q0','q1']])
+    assert a.is_subset_of(d) == True and regex('ba').is_subset_of(d) == False
+
+def test_universal_equivalent():
+    assert regex('(a|b)*').is_universal() == True
+    assert regex('(a|b)*a|b*').is_universal() == False
+    assert antichain.universality_counterexample(regex('(a|b)*abb')) == ''
+    assert antichain.universality_counterexample(regex('a*|(a|b)*b')) == 'ba'
+    assert regex('(a*b*)*').is_equivalent(regex('(a|b)*')) == True
+    assert regex('(ab)*a').is_equivalent(regex('a(ba)*')) == True
+    assert antichain.distinguishing_word(regex('(ab)*'),regex('(ab)*|b')) == 'b'
+
+def test_random():
+    for seed in range(0,60):
+        a = random_automata.random_nfa(4,'ab',seed = 2*seed)
+        b = random_automata.random_nfa(4,'ab',seed = 2*seed+1)
+        included = a.to_DFA().difference(b.to_DFA()).is_empty()
+        for simulation in (True,False):
+            word = antichain.inclusion_counterexample(a,b,simulation)
+            assert (word is None) == included
+            if word is not None:
+                assert accepts(a,word) and not accepts(b,word)
+            word = antichain.universality_counterexample(a,simulation)
+            assert (word is None) == a.to_DFA().complement().is_empty()
+            if word is not None:
+                assert not accepts(a,word)
+
+def test_no_determinization():
+    # the subset construction of these has about 2^13 states
+    a = regex('(a|b)*a' + '(a|b)'*12)
+    b = regex('(a|b)*a' + '(a|b)'*12 + '|b*')
+    assert a.is_subset_of(b) == True
+    assert antichain.inclusion_counterexample(b,a) == ''
+
+def test_large():
+    # beyond SIMULATION_LIMIT no simulation is computed, the counterexample is found at once
+    large = random_automata.random_nfa(2*antichain.SIMULATION_LIMIT,'ab',seed = 1)
+    word = antichain.inclusion_counterexample(regex('(a|b)*'),large)
+    assert word is not None and not accepts(large,word)
+    assert regex('(a|b)*').is_subset_of(large) == False
+
+def test_all():
+    test_inclusion()
+    test_universal_equivalent()
+    test_random()
+    test_no_determinization()
+    test_large()
+
+if __name__ == '__main__':
+    test_all()
@@ -0,0 +1,55 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from container.disjoint_set import DisjointSet,IntDisjointSet
+from container.multi_key_dict import multi_key_dict
+from automata import random_automata
+
+def test_int_disjoint_set():
+    d = IntDisjointSet(6)
+    assert d.union(0,1) == True
+    assert d.union(1,0) == False
+    assert d.union(3,4) == True and d.union(4,1) == True
+    assert d.sets_count == 3 and len(d) == 6
+    assert d.same(0,3) and not d.same(0,2)
+    groups = d.groups()
+    assert sorted(groups.values()) == [[0,1,3,4],[2],[5]]
+    assert all(d.find(x) == root for root,members in groups.items() for x in members)
+
+def test_disjoint_set():
+    d = DisjointSet(['a','b','c','d'])
+    d.union('a','b')
+    d.union('b','a')
+    d.union('b','d')
+    assert d.sets_count == 2
+    assert sorted(map(sorted,d.get_set_list())) == [['a','b','d'],['c']]
+
+def test_multi_key_dict_copy():
+    d = multi_key_dict(2)
+    d.set_value(('a','x'),{1})
+    d.set_value(('b','x'),{2})
+    shallow = d.copy(deep = False)
+    deep = d.copy()
+    d.get_value(('a','x')).add(3)
+    d.set_value(('a','y'),set())
+    assert shallow.get_value(('a','x')) == {1,3} and deep.get_value(('a','x')) == {1}
+    assert ('a','y') not in shallow and len(shallow) == 2
+    assert [keys for keys,val in shallow.prefix_items(('a',))] == [('a','x')]
+    assert [keys for keys,val in d.prefix_items(('a',))] == [('a','x'),('a','y')]
+
+def test_PDA_transitions():
+    p = random_automata.random_pda(3,seed = 2)
+    transitions = p.transitions()
+    assert transitions is not None and len(transitions) != 0
+    for keys,moves in transitions.items():
+        moves.clear()
+    assert sum(len(moves) for moves in p.transitions().values()) != 0
+
+def test_all():
+    test_int_disjoint_set()
+    test_disjoint_set()
+    test_multi_key_dict_copy()
+    test_PDA_transitions()
+
+if __name__ == '__main__':
+    test_all()
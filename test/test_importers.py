@@ -0,0 +1,115 @@
+import io
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from automata.DFA import DFA
+from automata.NFA import NFA
+from automata.myException import AutomatonFormatException
+from automata import random_automata
+
+jflap = '''<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<structure>
+    <type>fa</type>
+    <automaton>
+        <state id="0" name="q0"><x>0.0</x><y>0.0</y><initial/></state>
+        <state id="1" name="q1"><x>0.0</x><y>0.0</y></state>
+        <state id="2" name="q2"><x>0.0</x><y>0.0</y><final/></state>
+        <transition><from>0</from><to>1</to><read>a</read></transition>
+        <transition><from>1</from><to>2</to><read>b</read></transition>
+        <transition><from>2</from><to>0</to><read/></transition>
+    </automaton>
+</structure>
+'''
+
+# what graphviz writes for 'DFA.draw'
+dot = '''digraph {
+	q0 [label=q0 shape=circle]
+	start [label=start shape=none]
+	start -> q0
+	q1 [label=q1 shape=doublecircle]
+	/* a comment
+	   over two lines */
+	q0 -> q1 [label="a,b"]
+	q1 -> q1 [label=a] // loop
+	rankdir=LR
+}
+'''
+
+hoa = '''HOA: v1
+States: 3
+Start: 0
+AP: 2 "a" "b"
+Acceptance: 1 Inf(0)
+--BODY--
+State: 0
+[0&!1] 1
+[0 | !0] 0
+State: 1 "middle"
+[1] 2
+State: 2 {0}
+[t] 2
+--END--
+'''
+
+def test_jflap():
+    n = NFA.from_jflap(io.BytesIO(jflap.encode()))
+    assert n.q0() == 'q0' and n.finish_states() == {'q2'} and n.alphabet() == {'a','b'}
+    assert n.run('ab') == True and n.run('abab') == True and n.run('a') == False
+    try:
+        DFA.from_jflap(io.BytesIO(jflap.encode()))
+        assert False
+    except AutomatonFormatException:
+        pass
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory,'a.jff')
+        with open(file_name,'w') as f:
+            f.write(jflap.replace('<read/>','<read>a</read>'))
+        d = DFA.from_jflap(file_name)
+        assert d.run('aba') == False and d.run('abaab') == True
+
+def test_dot():
+    d = DFA.from_dot(io.StringIO(dot))
+    assert sorted(d.Q()) == ['q0','q1'] and d.q0() == 'q0' and d.finish_states() == {'q1'}
+    assert d.run('b') == True and d.run('aaa') == True and d.run('bb') == False
+    n = NFA.from_dot(io.StringIO('digraph { node [shape=doublecircle]; 1; node [shape=circle];'
+                                 ' 0; init [shape=point]; init -> 0; 0 -> 0 [label="a"]; 0 -> 1 [label="a,ε"] }'))
+    assert n.finish_states() == {'1'} and n.run('') == True and n.run('aa') == True and n.run('b') == False
+
+def test_hoa():
+    n = NFA.from_hoa(io.StringIO(hoa))
+    assert n.Q() == ['0','1','2'] and n.finish_states() == {'2'}
+    for s in random_automata.random_strings('ab',200,6,seed = 0):
+        assert n.run(s) == ('ab' in s)
+    try:
+        DFA.from_hoa(io.StringIO(hoa))
+        assert False
+    except AutomatonFormatException:
+        pass
+    try:
+        NFA.from_hoa(io.StringIO(hoa.replace('[1] 2','[1] 2 {0}')))
+        assert False
+    except AutomatonFormatException:
+        pass
+
+def test_large():
+    # a large DFA written as DOT and read back
+    d = random_automata.random_dfa(2000,'ab',seed = 1)
+    lines = ['digraph {','\tstart [shape=none]',f'\tstart -> {d.q0()}']
+    for q in d.Q():
+        lines.append(f'\t{q} [shape={"doublecircle" if q in d.finish_states() else "circle"}]')
+    for q,moves in d.deltas().items():
+        for letter,p in moves:
+            lines.append(f'\t{q} -> {p} [label={letter}]')
+    lines.append('}')
+    e = DFA.from_dot(io.StringIO('\n'.join(lines)))
+    assert e.to_bytes() == d.to_bytes()
+
+def test_all():
+    test_jflap()
+    test_dot()
+    test_hoa()
+    test_large()
+
+if __name__ == '__main__':
+    test_all()
@@ -0,0 +1,203 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lexer')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from cmm_define import cmm_token_re_func
+from token_dfa import compile_token_dfa
+from incremental_lexer import IncrementalLexer
+from scanner import Lexer
+from batch_lexer import lex_files
+from mmap_lexer import MmapLexer
+from myToken.my_token import Token,token_kind,token_id
+from line_index import LineIndex
+import json
+import pickle
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+token_dfa = compile_token_dfa(cmm_token_re_func)
+
+def token_tuples(tokens):
+    return [(t.id,t.lexeme,t.line) for t in tokens]
+
+def test_token_dfa():
+    input_str = 'int a==b;integer'
+    result = []
+    begin = 0
+    while begin < len(input_str):
+        end,rule,scan_end = token_dfa.match(input_str,begin)
+        result.append((token_dfa.token_names[rule],input_str[begin:end]))
+        begin = end
+    assert result == [('TYPE','int'),('BLANK',' '),('ID','a'),('RELOP','=='),('ID','b'),('SEMI',';'),('ID','integer')]
+
+def test_lexer():
+    input_str = 'int a = 1; // comment\n/* multiline\ncomment */ a = a + 1;\n'
+    tokens = Lexer(input_str).recognize_token()
+    assert [t.id for t in tokens if t.id != 'BLANK'] == ['TYPE','ID','ASSIGNOP','INT','SEMI','SINGLE_LINE_COMMENT',
+                                                        'MULTILINE_COMMENT','ID','ASSIGNOP','ID','PLUS','INT','SEMI','ENDLINE']
+    tokens = Lexer(input_str,skip_blank = True).recognize_token()
+    assert 'BLANK' not in [t.id for t in tokens]
+
+    # lexers do not share state
+    l1 = Lexer('int a;\nint b;')
+    l2 = Lexer('float c;')
+    assert l1.next_token().lexeme == 'int'
+    assert l2.next_token().lexeme == 'float'
+    assert l1.next_token().id == 'BLANK'
+    assert l1.next_token().lexeme == 'a'
+
+    inputs = [f'int a{i} = {i};\n' * (i + 1) for i in range(0,8)]
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda s: Lexer(s).recognize_token(),inputs))
+    for i,tokens in enumerate(results):
+        assert tokens[-1].line == i + 1
+        assert token_tuples(tokens) == token_tuples(Lexer(inputs[i]).recognize_token())
+
+def test_lex_files():
+    with tempfile.TemporaryDirectory() as dir_name:
+        file_names = []
+        for i in range(0,6):
+            file_name = os.path.join(dir_name,f'{i}.cmm')
+            with open(file_name,'w') as f:
+                f.write(f'int a{i};\n' * (i + 1))
+            file_names.append(file_name)
+        serial = dict(lex_files(file_names,workers = 1))
+        parallel = dict(lex_files(file_names,workers = 2,max_in_flight = 2))
+        assert sorted(parallel.keys()) == sorted(file_names)
+        for file_name in file_names:
+            assert token_tuples(parallel[file_name]) == token_tuples(serial[file_name])
+        assert serial[file_names[5]][-1].line == 6
+
+def test_mmap_lexer():
+    input_str = 'int a = 1; // comment\n/* multiline\ncomment */ while (a >= 1) { a = a - 1; }\n'
+    with tempfile.TemporaryDirectory() as dir_name:
+        file_name = os.path.join(dir_name,'a.cmm')
+        with open(file_name,'w') as f:
+            f.write(input_str)
+        with MmapLexer(file_name) as lexer:
+            tokens = lexer.recognize_token()
+            assert token_tuples(tokens) == token_tuples(Lexer(input_str).recognize_token())
+            assert input_str[tokens[2].offset:tokens[2].offset+tokens[2].length] == 'a'
+        empty_file_name = os.path.join(dir_name,'empty.cmm')
+        open(empty_file_name,'w').close()
+        with MmapLexer(empty_file_name) as lexer:
+            assert lexer.recognize_token() == []
+
+def test_token_buffer():
+    input_str = 'int a = 1; // comment\nfloat b;\n'
+    tokens = Lexer(input_str).recognize_token()
+    token_buffer = Lexer(input_str).fill_token_buffer()
+    assert len(token_buffer) == len(tokens)
+    assert token_tuples(token_buffer) == token_tuples(tokens)
+    assert token_tuples(token_buffer[-3:]) == token_tuples(tokens[-3:])
+    assert token_buffer.kinds[0] == token_kind('TYPE') and token_buffer.lexeme(1) == ' '
+    assert token_buffer.line(len(token_buffer)-2) == 2 and token_buffer[-2].offset == input_str.index(';\n',22)
+
+    token = Token('ID','a',1)
+    assert not hasattr(token,'__dict__')
+    assert token.kind == token_kind('ID') and token.id == 'ID'
+    token.id = 'SEMI'
+    assert token.kind == token_kind('SEMI')
+    assert token_tuples([pickle.loads(pickle.dumps(token))]) == [('SEMI','a',1)]
+
+    # kinds registered concurrently are distinct and stable
+    token_ids = [f'KIND_{i}' for i in range(0,200)]
+    with ThreadPoolExecutor(8) as executor:
+        kinds = list(executor.map(lambda i: [token_kind(token_id) for token_id in token_ids[i:] + token_ids[:i]],range(0,16)))
+    assert all(sorted(k) == sorted(kinds[0]) for k in kinds) and len(set(kinds[0])) == len(token_ids)
+    assert [token_id(token_kind(t)) for t in token_ids] == token_ids
+
+def test_line_index():
+    input_str = 'ab\n\ncd\n'
+    line_index = LineIndex(input_str)
+    assert line_index.line_count() == 4
+    assert [line_index.line_col(i) for i in range(0,len(input_str)+1)] == [(1,1),(1,2),(1,3),(2,1),(3,1),(3,2),(3,3),(4,1)]
+    assert line_index.line_start(3) == 4
+    assert LineIndex(input_str.encode()).line_col(5) == (3,2)
+
+    # an index updated in place agrees with one built from the edited input
+    edits = [(0,0,'x\n'),(5,7,''),(1,3,'\n\n\n'),(len(input_str),len(input_str),'\ny'),(2,2,'z')]
+    for begin,end,new_str in edits:
+        input_str = input_str[:begin] + new_str + input_str[end:]
+        line_index.replace(begin,end,new_str)
+        expected = LineIndex(input_str)
+        assert line_index.line_count() == expected.line_count()
+        assert [line_index.line_col(i) for i in range(0,len(input_str)+1)] == [expected.line_col(i) for i in range(0,len(input_str)+1)]
+
+    # comments spanning lines do not make the following lines drift
+    input_str = 'int a; // comment\n/* multiline\n\ncomment */ a = 1;\nb = 2;'
+    lexer = Lexer(input_str,skip_blank = True)
+    tokens = [(token,start) for token,start,end,scan_end in lexer.scan()]
+    for token,start in tokens:
+        assert token.offset == start and token.line == lexer.line_col(start)[0]
+    assert tokens[-1][0].line == 5
+    # lines are resolved when read, an explicit line is kept
+    token = tokens[-1][0]
+    token.line = 7
+    assert token.line == 7 and pickle.loads(pickle.dumps(token)).line == 7
+
+def test_incremental_lexer():
+    input_str = 'int a = 1;\nfloat b = 2; // comment\nwhile (a) { a = a - 1; }\n'
+    lexer = IncrementalLexer(token_dfa = token_dfa)
+    lexer.lex(input_str)
+    tokens_before = lexer.tokens().copy()
+
+    # rename 'a' to 'abc' in the declaration
+    tokens = lexer.edit(4,5,'abc')
+    input_str = input_str[:4] + 'abc' + input_str[5:]
+    assert token_tuples(tokens) == token_tuples(IncrementalLexer(token_dfa = token_dfa).lex(input_str))
+    first,old_end,new_end = lexer.changed()
+    assert old_end - first <= 2 and new_end - first <= 2
+    # tokens after the edit are reused
+    assert tokens[-1] is tokens_before[-1]
+
+    # join two lines, the reused tokens get new lines
+    newline = input_str.index('\n')
+    tokens = lexer.edit(newline,newline+1,' ')
+    input_str = input_str[:newline] + ' ' + input_str[newline+1:]
+    assert token_tuples(tokens) == token_tuples(IncrementalLexer(token_dfa = token_dfa).lex(input_str))
+
+    # an edit extending the previous token
+    tokens = lexer.edit(len(input_str),len(input_str),'int')
+    input_str += 'int'
+    assert token_tuples(tokens) == token_tuples(IncrementalLexer(token_dfa = token_dfa).lex(input_str))
+    tokens = lexer.edit(len(input_str),len(input_str),'eger')
+    input_str += 'eger'
+    assert tokens[-1].id == 'ID' and tokens[-1].lexeme == 'integer'
+
+    # the lookahead of 'A' for 'abcd' reaches past the scan ends of 'B' and 'C'
+    rules = [('A','a',None),('ABCD','abcd',None),('B','b',None),('C','c',None),('D','d',None),('E','e',None)]
+    lexer = IncrementalLexer(rules)
+    assert [t.id for t in lexer.lex('abce')] == ['A','B','C','E']
+    assert [t.id for t in lexer.edit(3,4,'d')] == ['ABCD']
+    assert lexer.changed()[0] == 0
+    assert [t.id for t in lexer.edit(1,2,'x')] == ['A','ERROR','C','D']
+
+def test_bench_lexer():
+    # one run of the benchmark at its smallest size, every engine lexes the same tokens
+    bench_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bench'))
+    sys.path.append(bench_path)
+    from bench_lexer import engines
+    with tempfile.TemporaryDirectory() as dir_name:
+        file_name = os.path.join(dir_name,'results.json')
+        subprocess.run([sys.executable,os.path.join(bench_path,'bench_lexer.py'),'--sizes','1K','-o',file_name],
+                       capture_output = True,check = True)
+        with open(file_name) as f:
+            results = json.load(f)['results']
+    assert [r['engine'] for r in results] == engines
+    assert len({r['tokens'] for r in results}) == 1 and results[0]['tokens'] > 0
+
+def test_all():
+    test_token_dfa()
+    test_lexer()
+    test_lex_files()
+    test_mmap_lexer()
+    test_token_buffer()
+    test_line_index()
+    test_incremental_lexer()
+    test_bench_lexer()
+
+if __name__ == '__main__':
+    test_all()
@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+import json
+import logging
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from automata import profiling
+from automata.NFA import NFA
+from automata.PDA import PDA_F
+from automata import random_automata
+
+def test_profile():
+    n = NFA()
+    n.regex_to_NFA('(a|b)*abb')
+    assert profiling.enabled == False
+    with profiling.profile() as records:
+        d = n.to_DFA()
+        d.minimize()
+    assert profiling.enabled == False
+    assert [record['operation'] for record in records] == ['NFA.to_DFA','DFA.minimize']
+    to_DFA,minimize = records
+    assert to_DFA['subset_states'] == to_DFA['states_after'] == 5
+    assert to_DFA['transitions_after'] == 10
+    assert minimize['states_before'] == 5 and minimize['states_after'] == 4
+    assert minimize['refinement_rounds'] >= 1 and minimize['seconds'] >= 0
+
+    # disabled: no records
+    with profiling.profile() as records:
+        pass
+    n.to_DFA()
+    assert records == []
+
+def test_sinks():
+    p = random_automata.random_pda(3,seed = 1)
+    f = io.StringIO()
+    called = []
+    with profiling.profile(profiling.JSONLinesSink(f),called.append,profiling.LoggingSink(level = logging.DEBUG)):
+        result = p.run('ab')
+    record = json.loads(f.getvalue())
+    assert record['operation'] == 'PDA_F.run' and record['accepted'] == result
+    assert record['configurations'] >= 1
+    assert called[0] is not None and called[0]['configurations'] == record['configurations']
+
+def test_configurations():
+    a = PDA_F()
+    a.set_input_symbols({'0','1'})
+    a.set_pushdown_symbols({'0','1','Z'})
+    a.add_states(['q0','q1','q2'])
+    a.set_initial_state('q0')
+    a.set_initial_symbol('Z')
+    a.set_finish_states({'q2'})
+    a.add_transition('q0','0','Z','q1','Z0')
+    a.add_transition('q1','1','0','q2','01')
+    assert a.run('01') == True
+    with profiling.profile() as records:
+        assert a.run('01') == True
+        assert a.run('00') == False
+    assert [record['configurations'] for record in records] == [3,2]
+
+def test_all():
+    test_profile()
+    test_sinks()
+    test_configurations()
+
+if __name__ == '__main__':
+    test_all()
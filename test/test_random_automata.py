@@ -0,0 +1,81 @@
+import os
+import sys
+import itertools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+import src.automata.random_automata as RA
+import src.automata.NFA as NFA_SRC
+import differential
+
+def test_count_accessible_dfas():
+    # brute force: labeled accessible DFAs / (n-1)! relabelings
+    for n,k in [(2,2),(3,2),(2,3)]:
+        count = 0
+        for targets in itertools.product(range(0,n),repeat = n*k):
+            visit = {0}
+            st = [0]
+            while len(st) != 0:
+                q = st.pop()
+                for p in targets[q*k:q*k+k]:
+                    if p not in visit:
+                        visit.add(p)
+                        st.append(p)
+            count += len(visit) == n
+        assert RA.count_accessible_dfas(n,k) == count // [1,1,2][n-1]
+
+def test_random_dfa():
+    for n in [1,5,40,300]:
+        d = RA.random_dfa(n,'ab',seed = n)
+        assert len(d.Q()) == n
+        # accessible and complete: minimize only removes unreachable states
+        deltas = d.deltas()
+        assert all(len(deltas[q]) == 2 for q in d.Q())
+        visit = {d.q0()}
+        st = [d.q0()]
+        while len(st) != 0:
+            for ch,p in deltas[st.pop()]:
+                if p not in visit:
+                    visit.add(p)
+                    st.append(p)
+        assert len(visit) == n
+    assert str(RA.random_dfa(20,seed = 3)) == str(RA.random_dfa(20,seed = 3))
+    # all 12 accessible DFAs with 2 states over 2 letters are generated
+    shapes = {str(RA.random_dfa(2,'ab',final_probability = 0,seed = seed).deltas()) for seed in range(0,400)}
+    assert len(shapes) == 12
+
+def test_random_regex_nfa_pda():
+    for seed in range(0,5):
+        regex = RA.random_regex(8,'ab+',seed = seed)
+        n = NFA_SRC.NFA()
+        n.regex_to_NFA(regex)
+        d = n.to_DFA()
+        for input_str in RA.random_strings('ab+',50,6,seed = seed):
+            assert n.run(input_str) == d.run(input_str)
+    n = RA.random_nfa(30,epsilon_density = 1.0,seed = 1)
+    assert len(n.Q()) == 30
+    p = RA.random_pda(5,accept = 'empty',seed = 2)
+    assert p.initial_symbol() == 'Z'
+    p.run('abab')
+
+def test_differential():
+    for pair in ['to_DFA','minimize','token_dfa']:
+        assert differential.differential(pair,size = 6,instances = 2,strings = 300,workers = 1) is None
+    assert differential.differential('to_DFA',size = 6,strings = 2000,workers = 2,chunk_size = 500) is None
+
+    # a broken engine: the divergence is found and minimized
+    def pair_broken(size,seed):
+        d = RA.random_dfa(size,'ab',seed = seed)
+        return d.run,lambda s: d.run(s) if 'bab' not in s else not d.run(s),'ab'
+    differential.pairs['broken'] = pair_broken
+    seed,input_str,minimized = differential.differential('broken',size = 4,strings = 1000,max_length = 10,workers = 1)
+    assert 'bab' in input_str and minimized == 'bab'
+    del differential.pairs['broken']
+
+def test_all():
+    test_count_accessible_dfas()
+    test_random_dfa()
+    test_random_regex_nfa_pda()
+    test_differential()
+
+if __name__ == '__main__':
+    test_all()
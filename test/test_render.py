@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from automata.DFA import DFA
+from automata.NFA import NFA
+from automata import render
+from automata import random_automata
+from automata.config import default_save_path
+
+def test_letters_label():
+    assert render.letters_label('cba') == 'a-c'
+    assert render.letters_label('ab') == 'a,b'
+    assert render.letters_label('abcxyz0123+') == '+,0-3,a-c,x-z'
+    assert render.letters_label(['ε']) == 'ε'
+    assert render.letters_label(',-\\a') == '\\,,\\-,\\\\,a'
+
+def test_draw_dot():
+    d = DFA.from_table(['q0','q1'],'abcd','q0',{'q1'},[['q1','q1','q1','q0'],[None,None,None,'q1']])
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = d.draw('d',directory + os.sep,view = False,format = 'dot')
+        with open(file_name) as f:
+            source = f.read()
+        assert 'q0 -> q1 [label="a-c"]' in source and 'q1 [label=q1 shape=doublecircle]' in source
+        e = DFA.from_dot(file_name)
+        assert e.to_bytes() == d.to_bytes()
+        # separators as letters
+        d = DFA.from_table(['q0','q1'],',-\\a','q0',{'q1'},[['q1','q1','q1','q0'],[None,'q0',None,'q1']])
+        e = DFA.from_dot(d.draw('d',directory + os.sep,view = False,format = 'dot'))
+        assert e.to_bytes() == d.to_bytes()
+
+def test_partial_draw():
+    d = random_automata.random_dfa(300,'ab',seed = 3)
+    G = render.automaton_graph('d',d.Q(),d.q0(),d.finish_states(),
+                               ((q,p,letter) for q,moves in d.deltas().items() for letter,p in moves),depth = 2)
+    nodes = [line for line in G.body if '->' not in line and 'shape' in line and 'start' not in line]
+    assert 1 < len(nodes) <= 7
+    assert any('dashed' in line for line in nodes)
+    n = NFA()
+    n.regex_to_NFA('(a|b)*abb')
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = n.draw('n',directory + os.sep,view = False,format = 'dot',around = n.q0())
+        with open(file_name) as f:
+            source = f.read()
+        assert f'{n.q0()} [label={n.q0()}' in source
+
+def test_PDA_draw():
+    p = random_automata.random_pda(3,seed = 4)
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = p.draw('p',directory + os.sep,view = False,format = 'dot')
+        assert os.path.exists(file_name)
+
+def test_default_save_path():
+    assert os.path.basename(default_save_path) == 'picture' and '\\' not in default_save_path.replace(os.sep,'/')
+    assert os.path.isdir(os.path.dirname(default_save_path))
+
+def test_sinks():
+    d = random_automata.random_dfa(4,seed = 5)
+    buffer = render.BufferSink()
+    assert d.draw('d',format = 'dot',view = False,sink = buffer) == 'd'
+    format,data = buffer.pictures['d']
+    assert format == 'dot' and data.startswith(b'digraph d {')
+    called = []
+    d.draw('e',format = 'dot',sink = render.CallbackSink(lambda name,format,data: called.append(name) or len(data)))
+    assert called == ['e']
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = d.draw('d',directory,view = False,format = 'dot')
+        assert file_name == os.path.join(directory,'d.gv')
+
+def test_render_batch():
+    graphs = [(f'd{i}',random_automata.random_dfa(5,seed = i).graph(f'd{i}')) for i in range(0,3)]
+    buffer = render.BufferSink()
+    assert render.render_batch(graphs,format = 'dot',sink = buffer) == ['d0','d1','d2']
+    assert buffer.pictures['d2'][1] == graphs[2][1].source.encode()
+
+def test_all():
+    test_letters_label()
+    test_draw_dot()
+    test_partial_draw()
+    test_PDA_draw()
+    test_default_save_path()
+    test_sinks()
+    test_render_batch()
+
+if __name__ == '__main__':
+    test_all()
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from automata.DFA import DFA
+from automata.NFA import NFA
+from automata.PDA import PDA_F,PDA_E
+from automata.myException import AutomatonFormatException
+from automata import random_automata
+
+def test_DFA_round_trip():
+    d = random_automata.random_dfa(20,'abc',seed = 3)
+    e = DFA.from_bytes(d.to_bytes())
+    assert set(e.Q()) == set(d.Q()) and e.q0() == d.q0()
+    assert e.alphabet() == d.alphabet() and e.finish_states() == d.finish_states()
+    assert {q:set(m) for q,m in e.deltas().items()} == {q:set(m) for q,m in d.deltas().items()}
+    assert e.to_bytes() == d.to_bytes()
+    for s in random_automata.random_strings('abc',200,8,seed = 0):
+        assert e.run(s) == d.run(s)
+
+def test_NFA_round_trip():
+    a = random_automata.random_nfa(12,'ab',epsilon_density = 0.5,seed = 4)
+    b = NFA.from_bytes(a.to_bytes())
+    assert b.to_bytes() == a.to_bytes()
+    for s in random_automata.random_strings('ab',200,8,seed = 1):
+        assert b.run(s) == a.run(s)
+
+def test_PDA_round_trip():
+    for accept,cls in (('final',PDA_F),('empty',PDA_E)):
+        p = random_automata.random_pda(4,accept = accept,seed = 5)
+        q = cls.from_bytes(p.to_bytes())
+        assert q.to_bytes() == p.to_bytes()
+        for s in random_automata.random_strings('ab',50,5,seed = 2):
+            assert q.run(s) == p.run(s)
+
+def test_save_load():
+    d = random_automata.random_dfa(8,seed = 6)
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory,'d.autm')
+        d.save(file_name)
+        assert DFA.load(file_name).to_bytes() == d.to_bytes()
+
+def test_bad_data():
+    d = random_automata.random_dfa(3,seed = 7)
+    for data in (b'',b'XXXX' + d.to_bytes()[4:],d.to_bytes()[:-4]):
+        try:
+            DFA.from_bytes(data)
+            assert False
+        except AutomatonFormatException:
+            pass
+    # a DFA is not an NFA
+    try:
+        NFA.from_bytes(d.to_bytes())
+        assert False
+    except AutomatonFormatException:
+        pass
+
+def test_complement_copy():
+    d = DFA()
+    d.set_alphabet({'a','b'})
+    d.add_states(['q0','q1'])
+    d.set_q0('q0')
+    d.set_finish_states({'q1'})
+    d.add_delta('q0','a','q1')
+    before = d.to_bytes()
+    c = d.complement()
+    assert d.to_bytes() == before
+    assert c.run('') == True and c.run('a') == False and c.run('ab') == True
+
+def test_all():
+    test_DFA_round_trip()
+    test_NFA_round_trip()
+    test_PDA_round_trip()
+    test_save_load()
+    test_bad_data()
+    test_complement_copy()
+
+if __name__ == '__main__':
+    test_all()
@@ -0,0 +1,115 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from automata.DFA import DFA
+from automata.NFA import NFA
+from automata import symbolic
+from automata import random_automata
+from container.bdd import BDD
+
+def test_bdd():
+    m = BDD()
+    x,y,z = m.var(0),m.var(1),m.var(2)
+    f = m.or_(m.and_(x,y),z)
+    assert m.and_(f,m.not_(f)) == 0 and m.or_(f,m.not_(f)) == 1
+    assert m.xor(x,x) == 0 and m.or_(m.and_(x,y),m.and_(y,x)) == m.and_(y,x)
+    assert m.exists(f,[2]) == 1 and m.exists(m.and_(x,y),[0]) == y
+    assert m.and_exists(x,m.and_(m.not_(x),y),[0]) == 0
+    assert m.and_exists(m.or_(x,y),z,[1]) == z
+    assert m.rename(m.and_(x,z),{0:1}) == m.and_(y,z)
+    assert m.sat_count(f,[0,1,2]) == 5
+    assignment = m.sat_one(f)
+    assert assignment is not None and m.and_(m.cube(assignment),f) == m.cube(assignment)
+    # deeper than the recursion limit
+    n = sys.getrecursionlimit() + 500
+    chain = m.and_all(m.var(i) for i in range(0,n))
+    assert m.or_(chain,m.var(n)) != chain and m.sat_count(chain,range(0,n)) == 1
+    assert m.exists(chain,range(0,n,2)) == m.and_all(m.var(i) for i in range(1,n,2))
+    assert m.and_exists(chain,m.not_(m.var(n-1)),[n-1]) == 0
+    assert m.rename(chain,{n-1:n}) == m.and_(m.exists(chain,[n-1]),m.var(n))
+
+def live_states(a):
+    live = set(a.finish_states())
+    changed = True
+    while changed:
+        changed = False
+        for q,ms in a.deltas().items():
+            if q not in live and any(p in live for letter,p in ms):
+                live.add(q)
+                changed = True
+    return live
+
+def explicit_reachable(automata):
+    # explicit BFS over the completed product, states that cannot accept merged into the dead state None
+    alphabet = sorted(set().union(*(a.alphabet() for a in automata)))
+    lives = [live_states(a) for a in automata]
+    moves = [{(q,letter):p for q,ms in a.deltas().items() for letter,p in ms if p in live}
+             for a,live in zip(automata,lives)]
+    start = tuple(a.q0() if a.q0() in live else None for a,live in zip(automata,lives))
+    seen = {start}
+    st = [start]
+    while len(st) != 0:
+        state = st.pop()
+        for letter in alphabet:
+            p = tuple(move.get((q,letter)) for q,move in zip(state,moves))
+            if p not in seen:
+                seen.add(p)
+                st.append(p)
+    return len(seen)
+
+def test_product():
+    for seed in range(0,20):
+        a = random_automata.random_dfa(5,'ab',seed = seed)
+        b = random_automata.random_dfa(4,'abc',seed = seed + 100)
+        word = symbolic.find_word([a,b])
+        assert (word is None) == a.intersection(b).is_empty()
+        if word is not None:
+            assert a.run(word) and b.run(word)
+        word = symbolic.find_word([a,b],accept = 'any')
+        assert word is None or a.run(word) or b.run(word)
+        assert symbolic.reachable_count([a,b]) == explicit_reachable([a,b])
+
+def test_equal():
+    for seed in range(0,20):
+        a = random_automata.random_dfa(4,'ab',seed = seed)
+        b = random_automata.random_dfa(4,'ab',seed = seed + 50)
+        word = symbolic.distinguishing_word(a,b)
+        assert (word is None) == a.is_equal(b)
+        if word is not None:
+            assert a.run(word) != b.run(word)
+        assert symbolic.is_equal(a,a.minimize(new_copy = True))
+    n = NFA()
+    n.regex_to_NFA('(a|b)*abb')
+    m = NFA()
+    m.regex_to_NFA('(a|b)*bb')
+    assert symbolic.find_word([n,m]) == 'abb'
+    assert symbolic.distinguishing_word(n,m) == 'bb'
+    assert symbolic.is_equal(n,n.to_DFA())
+
+def test_many():
+    # 'a' count multiple of 2, 3, 5 and 7: the product has 210 states, the shortest word 210 a's
+    dfas = []
+    for p in (2,3,5,7):
+        states = [f'r{i}' for i in range(0,p)]
+        dfas.append(DFA.from_table(states,'ab','r0',{'r0'},[[states[(i+1)%p],states[i]] for i in range(0,p)]))
+    assert symbolic.find_word(dfas) == ''
+    dfas[0] = DFA.from_table(['r0','r1'],'ab','r0',{'r1'},[['r1','r0'],['r0','r1']])
+    assert symbolic.find_word(dfas) == 'a'*105
+    assert symbolic.reachable_count(dfas) == 210
+
+def test_dead_start():
+    # the start tuple is dead: found without exploring the product
+    dfas = [random_automata.random_dfa(20,'ab',seed = seed) for seed in range(0,5)]
+    dfas.append(DFA.from_table(['q0','q1'],'ab','q0',set(),[['q1','q0'],['q0','q1']]))
+    assert symbolic.is_empty(dfas) == True
+    assert symbolic.reachable_count(dfas[-1:]) == 1
+
+def test_all():
+    test_bdd()
+    test_product()
+    test_equal()
+    test_many()
+    test_dead_start()
+
+if __name__ == '__main__':
+    test_all()
@@ -0,0 +1,85 @@
+import io
+import os
+import sys
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from automata.NFA import NFA
+from automata.CFG import CFG,LL_1_parser,LALR_1_parser
+from automata.tracing import Trace
+
+def test_DFA_NFA_trace():
+    n = NFA()
+    n.regex_to_NFA('(a|b)*abb')
+    d = n.to_DFA()
+    trace = Trace()
+    assert d.run('aabb',trace = trace) == True
+    steps = list(trace)
+    assert [step.symbol for step in steps] == ['a','a','b','b']
+    assert [step.index for step in steps] == [0,1,2,3]
+    assert steps[0].state_before == d.q0()
+    assert all(steps[i].state_after == steps[i+1].state_before for i in range(0,3))
+    assert steps[-1].state_after in d.finish_states()
+
+    # ring buffer keeps the last steps
+    last = Trace(maxlen = 2)
+    assert d.run('abababa',trace = last) == False
+    assert [step.index for step in last] == [5,6]
+
+    # generator
+    assert [step.symbol for step in d.steps('ab')] == ['a','b']
+    called = []
+    assert n.run('babb',trace = Trace(callback = called.append)) == True
+    assert len(called) == 4 and isinstance(called[0].state_after,frozenset)
+    assert [step.symbol for step in n.steps('ab')] == ['a','b']
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        assert d.run('abb') == True
+    assert output.getvalue() == ''
+    with contextlib.redirect_stdout(output):
+        assert d.run('abb',verbose = True) == True
+    assert 'Read   : a' in output.getvalue()
+
+def test_parser_trace():
+    g = CFG()
+    g.set_variables({'S'})
+    g.set_terminals({'a','b'})
+    g.set_start_variable('S')
+    g.add_production('S',['a','S','b'])
+    g.add_production('S',[g.epsilon()])
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        ll_1 = LL_1_parser(g)
+        ll_1.construct_LL_1_analysis_table()
+    # the table is logged, not printed
+    assert output.getvalue() == ''
+    trace = Trace()
+    assert ll_1.parse('aabb',trace = trace) == True
+    assert trace.steps[0].state_before == 'S' and trace.steps[0].action.startswith('output')
+    assert [step.action for step in trace].count("match 'a'") == 2
+    assert trace.steps[-1].stack == (g.end_symbol(),)
+    assert ll_1.parse('aab',trace = trace) == False
+    assert trace.steps[-1].action == 'error'
+
+    g = CFG()
+    g.set_variables({'E','T'})
+    g.set_terminals({'+','i'})
+    g.set_start_variable('E')
+    g.add_production('E',['E','+','T'])
+    g.add_production('E',['T'])
+    g.add_production('T',['i'])
+    lalr_1 = LALR_1_parser(g)
+    lalr_1.construct_LALR_1_analysis_table()
+    trace = Trace()
+    assert lalr_1.parse('i+i',trace = trace) == True
+    actions = [step.action for step in trace]
+    assert actions[0].startswith('shift') and actions[-1] == 'accept'
+    assert [step.action.split()[0] for step in lalr_1.parse_steps('i+')][-1] == 'error'
+    assert lalr_1.parse('i+') == False
+
+def test_all():
+    test_DFA_NFA_trace()
+    test_parser_trace()
+
+if __name__ == '__main__':
+    test_all()